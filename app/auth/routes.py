@@ -1,6 +1,5 @@
 from fastapi import APIRouter, HTTPException, status
 from datetime import datetime, timedelta, timezone
-from jose import jwt, JWTError
 from app.config import settings
 from app.constants import ACCESS_TOKEN_EXPIRE_MINUTES, JWT_TOKEN_TYPE, JWT_ALGORITHM
 from app.global_utils import get_response
@@ -12,6 +11,9 @@ router = APIRouter()
 
 @router.post("/token")
 def get_token(payload: TokenRequest):
+    # Imported on first use, like in app.auth.security
+    import jwt
+
     try:
         if (
             payload.client_id != settings.CLIENT_ID
@@ -40,8 +42,8 @@ def get_token(payload: TokenRequest):
     except HTTPException as e:
         logger.error(f"HTTPException: {str(e)}")
         raise e
-    except JWTError as e:
-        logger.error(f"JWTError: {str(e)}")
+    except jwt.PyJWTError as e:
+        logger.error(f"PyJWTError: {str(e)}")
         return get_response(
             message="Token generation failed",
             status=status.HTTP_400_BAD_REQUEST,
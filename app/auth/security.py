@@ -1,23 +1,47 @@
+import hashlib
+from collections import OrderedDict
+from time import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-import jwt
 from app.config import settings
-from app.global_utils import get_response
 from app.logger import logger
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
+# sha256(token) -> (claims, exp); only tokens whose signature already verified
+_verified_tokens = OrderedDict()
 
-def verify_token(token: str = Depends(oauth2_scheme)):
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        return get_response(
-            data=payload,
-            message="Token verified successfully",
-            status=status.HTTP_200_OK,
-            error=False,
-            code="TOKEN_VERIFIED",
+
+def _remember(key: bytes, claims: dict):
+    exp = claims.get("exp")
+    _verified_tokens[key] = (claims, float(exp) if exp is not None else float("inf"))
+    while len(_verified_tokens) > settings.TOKEN_CACHE_MAX_ENTRIES:
+        _verified_tokens.popitem(last=False)
+
+
+async def verify_token(token: str = Depends(oauth2_scheme)) -> dict:
+    """
+    Return the token's claims. Repeat callers are answered from a bounded cache
+    until the token's `exp`; async so the cache is only touched from the event loop.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    cached = _verified_tokens.get(key)
+    if cached is not None:
+        claims, exp = cached
+        if time() < exp:
+            _verified_tokens.move_to_end(key)
+            return claims
+        del _verified_tokens[key]
+        logger.error("Token has expired")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired"
         )
+
+    # Imported on first use: PyJWT loads cryptography, which dominates cold start
+    import jwt
+
+    try:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
     except jwt.ExpiredSignatureError:
         logger.error("Token has expired")
         raise HTTPException(
@@ -28,3 +52,6 @@ def verify_token(token: str = Depends(oauth2_scheme)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
+
+    _remember(key, claims)
+    return claims
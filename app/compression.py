@@ -0,0 +1,133 @@
+# app/compression.py
+import gzip
+from functools import lru_cache
+from importlib.util import find_spec
+from starlette.datastructures import MutableHeaders
+from app.config import settings
+
+
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+# The optional codecs are imported on first use; only their presence is checked here
+def _brotli(body: bytes) -> bytes:
+    import brotli
+
+    return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+
+def _zstd(body: bytes) -> bytes:
+    import zstandard
+
+    return zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compress(
+        body
+    )
+
+
+# In order of preference when the client accepts several with the same q
+ENCODERS = {}
+if find_spec("zstandard") is not None:
+    ENCODERS["zstd"] = _zstd
+if find_spec("brotli") is not None:
+    ENCODERS["br"] = _brotli
+ENCODERS["gzip"] = _gzip
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding: str):
+    """
+    Pick the best supported encoding for an Accept-Encoding value, or None.
+    """
+    if not accept_encoding:
+        return None
+    offered = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in ENCODERS:
+        q = offered.get(encoding, offered.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    return ENCODERS[encoding](body)
+
+
+def weaken_etag(etag: str) -> str:
+    # A compressed body is a different representation; a strong tag would lie
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """
+    Compress complete response bodies of at least COMPRESSION_MIN_SIZE bytes.
+    Streamed bodies and responses that already carry a Content-Encoding (such
+    as pre-compressed cached payloads) pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate(accept)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            response_start, start = start, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=response_start["headers"])
+            content_type = headers.get("content-type", "")
+            if (
+                message.get("more_body", False)
+                or len(body) < settings.COMPRESSION_MIN_SIZE
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(response_start)
+                await send(message)
+                return
+
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers:
+                headers["ETag"] = weaken_etag(headers["etag"])
+            await send(response_start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,8 +1,15 @@
 import os
+from functools import lru_cache
+from typing import List, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
 
+@lru_cache(maxsize=None)
+def _in_docker() -> bool:
+    return os.path.exists("/.dockerenv")
+
+
 class Settings(BaseSettings):
     API_KEY: str
     CLIENT_ID: str
@@ -16,17 +23,134 @@ class Settings(BaseSettings):
         "host.docker.internal", env="DATABASE_HOST_DOCKER"
     )
     DATABASE_PORT: int = Field(3306, env="DATABASE_PORT")
+    # Full SQLAlchemy URL, e.g. sqlite:///./news.db; replaces the MySQL settings above
+    DATABASE_URL_OVERRIDE: Optional[str] = None
+
+    # Connection pool (pool size, overflow and timeout do not apply to SQLite)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Serve read-only routes (/news/search) from an async engine instead of the
+    # threadpool; needs aiomysql or aiosqlite
+    DB_ASYNC_ENABLED: bool = False
+
+    # Create missing tables during startup; turn off where migrations own the schema
+    DB_CREATE_TABLES: bool = True
+
+    # Log a warning when startup takes longer than this many milliseconds (0 disables)
+    STARTUP_BUDGET_MS: float = 0
+
+    # Verified JWTs kept in memory until they expire
+    TOKEN_CACHE_MAX_ENTRIES: int = 4096
+
+    # Shared NewsAPI client
+    NEWS_API_BASE_URL: str = "https://newsapi.org/v2"
+    NEWS_API_MAX_CONNECTIONS: int = 100
+    NEWS_API_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    NEWS_API_KEEPALIVE_EXPIRY: float = 30.0
+    NEWS_API_CONNECT_TIMEOUT: float = 5.0
+    NEWS_API_READ_TIMEOUT: float = 10.0
+    # Total seconds for one call, body included, and for all calls of a request
+    NEWS_API_DEADLINE: float = 15.0
+    NEWS_API_REQUEST_DEADLINE: float = 20.0
+
+    # Per-endpoint circuit breaker: open once FAILURE_RATE of the last WINDOW
+    # calls failed (with at least MIN_CALLS seen), probe again after OPEN_SECONDS
+    NEWS_BREAKER_FAILURE_RATE: float = 0.5
+    NEWS_BREAKER_MIN_CALLS: int = 10
+    NEWS_BREAKER_WINDOW: int = 20
+    NEWS_BREAKER_OPEN_SECONDS: float = 30.0
+    NEWS_BREAKER_PROBES: int = 1
+
+    # Upstream response cache, TTLs in seconds (0 disables caching for the endpoint)
+    NEWS_CACHE_MAX_ENTRIES: int = 1024
+    NEWS_CACHE_TTL_EVERYTHING: float = 300.0
+    NEWS_CACHE_TTL_HEADLINES: float = 120.0
+    NEWS_CACHE_STALE_TTL: float = 600.0
+
+    # Cache shared by the workers on top of the in-process one: "memory" (not
+    # shared), "sqlite" (a WAL database file on this host) or "redis" (needs the
+    # redis package). Shared entries are kept SHARED_RETAIN seconds past their
+    # stale TTL as a fallback while NewsAPI is unavailable
+    NEWS_CACHE_BACKEND: str = "memory"
+    NEWS_CACHE_SQLITE_PATH: str = "news-cache.db"
+    NEWS_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    NEWS_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    NEWS_CACHE_SHARED_RETAIN: float = 86400.0
+
+    # Near-duplicate detection at ingest: an article whose title and description
+    # SimHash is at most MAX_DISTANCE bits from one published within WINDOW_HOURS
+    # of it is not stored (-1 disables)
+    NEWS_DEDUP_MAX_DISTANCE: int = 3
+    NEWS_DEDUP_WINDOW_HOURS: float = 72.0
+
+    # NewsAPI request budget per process; 0 disables a window. Lower priorities
+    # must leave this fraction of every window for the classes above them
+    NEWS_QUOTA_PER_DAY: int = 1000
+    NEWS_QUOTA_PER_MINUTE: int = 0
+    NEWS_QUOTA_RESERVE_INTERACTIVE: float = 0.2
+    NEWS_QUOTA_RESERVE_WARMUP: float = 0.5
+
+    # Response compression (brotli and zstd are used when installed)
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    # Defaults for POST /news/save-latest
+    NEWS_INGEST_QUERY: str = "apple"
+    NEWS_INGEST_BATCH_SIZE: int = 3
+
+    # GET /news/?read_through=true
+    NEWS_READ_THROUGH_PAGE_SIZE: int = 100
+    NEWS_READ_THROUGH_MAX_DAYS: int = 31
+    NEWS_READ_THROUGH_MAX_PAGES: int = 5
+    NEWS_READ_THROUGH_CONCURRENCY: int = 4
+
+    # GET /news/export: rows fetched from the cursor per streamed chunk
+    NEWS_EXPORT_BATCH_SIZE: int = 1000
+
+    # POST /news/batch: queries per request and how many reach NewsAPI at once
+    NEWS_BATCH_MAX_ITEMS: int = 20
+    NEWS_BATCH_CONCURRENCY: int = 4
+
+    # Background ingestion; feed lists are JSON arrays in the environment
+    NEWS_SCHEDULER_ENABLED: bool = False
+    NEWS_SCHEDULER_QUERIES: List[str] = []
+    NEWS_SCHEDULER_COUNTRIES: List[str] = []
+    NEWS_SCHEDULER_SOURCES: List[str] = []
+    NEWS_SCHEDULER_INTERVAL: float = 900.0
+    NEWS_SCHEDULER_JITTER: float = 60.0
+    NEWS_SCHEDULER_CONCURRENCY: int = 2
+    NEWS_SCHEDULER_PAGE_SIZE: int = 100
+    NEWS_SCHEDULER_MAX_PAGES: int = 5
 
     @property
     def DATABASE_URL(self):
+        if self.DATABASE_URL_OVERRIDE:
+            return self.DATABASE_URL_OVERRIDE
         host = self.DATABASE_HOST
-        if os.path.exists("/.dockerenv"):
+        if _in_docker():
             host = self.DATABASE_HOST_DOCKER
         return (
             f"mysql+pymysql://{self.DATABASE_USER}:{self.DATABASE_PASSWORD}"
             f"@{host}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
         )
 
+    @property
+    def ASYNC_DATABASE_URL(self):
+        url = self.DATABASE_URL
+        for sync_prefix, async_prefix in (
+            ("mysql+pymysql://", "mysql+aiomysql://"),
+            ("sqlite://", "sqlite+aiosqlite://"),
+        ):
+            if url.startswith(sync_prefix):
+                return async_prefix + url[len(sync_prefix) :]
+        return url
+
     class Config:
         env_file = ".env"
 
@@ -2,5 +2,10 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 JWT_ALGORITHM = "HS256"
 JWT_TOKEN_TYPE = "Bearer"
 
-NEWS_API_URL_EVERYTHING = "https://newsapi.org/v2/everything"
-NEWS_API_TOP_HEADLINES = "https://newsapi.org/v2/top-headlines"
+# Paths relative to settings.NEWS_API_BASE_URL
+NEWS_API_URL_EVERYTHING = "/everything"
+NEWS_API_TOP_HEADLINES = "/top-headlines"
+
+# Responses are per client, so never shared caches. NewsAPI responses get a
+# max-age of their cache TTL, see global_utils.private_cache_control
+CACHE_CONTROL_ALL_NEWS = "private, no-cache"
@@ -1,11 +1,66 @@
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if make_url(url).get_backend_name() == "sqlite":
+        if not is_async:
+            # Sessions are handed to the threadpool
+            options["connect_args"] = {"check_same_thread": False}
+        return options
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return options
+
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Created on first use so the async driver is only needed when enabled
+_async_engine = None
+_AsyncSessionLocal = None
+
+
+def get_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        url = settings.ASYNC_DATABASE_URL
+        _async_engine = create_async_engine(url, **engine_options(url, is_async=True))
+        _AsyncSessionLocal = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+
+async def dispose_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _AsyncSessionLocal = None
+
+
+def init_db(bind=None):
+    """
+    Create missing tables. Runs at startup rather than on import, so importing
+    the app does not need a reachable database.
+    """
+    import app.models  # noqa: F401  registers the tables on Base.metadata
+
+    Base.metadata.create_all(bind=bind or engine)
+
 
 def get_db():
     db = SessionLocal()
@@ -13,3 +68,39 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_session_factory():
+    """
+    The session factory, for routes that only sometimes touch the database:
+    unlike get_db, resolving it costs no threadpool round trip.
+    """
+    return SessionLocal
+
+
+async def get_async_db():
+    """
+    Async counterpart of get_db for routes that should not hold a threadpool
+    slot while waiting on the database.
+    """
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db():
+    """
+    Session for read-only routes: an AsyncSession when DB_ASYNC_ENABLED, so the
+    route awaits the database without holding a threadpool slot, otherwise a
+    sync Session for the route to use from the threadpool.
+    """
+    if settings.DB_ASYNC_ENABLED:
+        async for db in get_async_db():
+            yield db
+        return
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        # Returning the connection rolls back, a round trip to the server
+        await run_in_threadpool(db.close)
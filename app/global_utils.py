@@ -1,16 +1,53 @@
-from fastapi.responses import JSONResponse
+import hashlib
+import orjson
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+# Built once; every response carries the same CORS and content-type headers
+STATIC_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "*",
+    "Access-Control-Allow-Methods": "*",
+    "Content-Type": "application/json",
+}
+_STATIC_RAW_HEADERS = [
+    (k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in STATIC_HEADERS.items()
+]
+
+
+class EnvelopeResponse(Response):
+    """
+    JSON response rendered with orjson (datetimes serialize natively) and the
+    precomputed static headers.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            # Pre-rendered envelope bytes, e.g. a cached upstream payload
+            return content
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+    def init_headers(self, headers=None):
+        raw_headers = list(_STATIC_RAW_HEADERS)
+        raw_headers.append((b"content-length", str(len(self.body)).encode("latin-1")))
+        if headers:
+            raw_headers.extend(
+                (k.lower().encode("latin-1"), v.encode("latin-1"))
+                for k, v in headers.items()
+            )
+        self.raw_headers = raw_headers
 
 
 def get_response(
-    message: str, status: int = 400, error: bool = True, code="GENERIC", data=None
+    message: str,
+    status: int = 400,
+    error: bool = True,
+    code="GENERIC",
+    data=None,
+    headers=None,
 ):
-    header = {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Headers": "*",
-        "Access-Control-Allow-Methods": "*",
-        "Content-Type": "application/json",
-    }
-
     response_data = {
         "message": message,
         "error": error,
@@ -18,8 +55,65 @@ def get_response(
         "data": data,
     }
 
-    return JSONResponse(
-        content=response_data,
-        status_code=status,
-        headers=header,
-    )
+    return EnvelopeResponse(content=response_data, status_code=status, headers=headers)
+
+
+def envelope_prefix(message: str, error: bool = False, code="GENERIC") -> bytes:
+    """
+    Everything in the envelope up to and including `"data":`.
+    """
+    head = orjson.dumps({"message": message, "error": error, "code": code})
+    return head[:-1] + b',"data":'
+
+
+ENVELOPE_SUFFIX = b"}"
+
+
+def get_stream_response(
+    message: str, chunks, status: int = 200, error: bool = False, code="GENERIC"
+):
+    """
+    Stream the envelope around `chunks`, an async iterator of encoded JSON bytes.
+    """
+
+    async def body():
+        yield envelope_prefix(message, error, code)
+        async for chunk in chunks:
+            yield chunk
+        yield ENVELOPE_SUFFIX
+
+    return StreamingResponse(body(), status_code=status, headers=STATIC_HEADERS)
+
+
+def make_etag(*parts) -> str:
+    """
+    Strong ETag over `parts`, which must have a stable repr.
+    """
+    return '"' + hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    If-None-Match check; uses the weak comparison RFC 9110 requires for it.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def get_not_modified_response(etag: str, cache_control: str) -> Response:
+    headers = {k: v for k, v in STATIC_HEADERS.items() if k != "Content-Type"}
+    headers["ETag"] = etag
+    headers["Cache-Control"] = cache_control
+    return Response(status_code=304, headers=headers)
+
+
+def private_cache_control(max_age: float) -> str:
+    return f"private, max-age={int(max_age)}"
+
+
+def validator_headers(etag: str, cache_control: str) -> dict:
+    return {"ETag": etag, "Cache-Control": cache_control}
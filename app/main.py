@@ -1,22 +1,62 @@
 # app/main.py
+from app import startup  # first, so its clock starts before the other imports
+import asyncio
 from fastapi import FastAPI
 from app.auth.routes import router as auth_router
 from app.news.routes import router as news_router
-from app.database import Base, engine
+from app.compression import CompressionMiddleware
+from app.config import settings
+from app.database import SessionLocal, dispose_async_engine, get_async_engine, init_db
+from app.global_utils import EnvelopeResponse
 from app.logger import logger
+from app.metrics import MetricsMiddleware, router as metrics_router
+from app.news import upstream
+from app.news.scheduler import IngestScheduler, configured_feeds
 from contextlib import asynccontextmanager
-
-Base.metadata.create_all(bind=engine)
+from fastapi.concurrency import run_in_threadpool
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("FastAPI app is starting up...")
+    with startup.phase("upstream_client"):
+        await upstream.start_client()
+    with startup.phase("shared_cache"):
+        await upstream.start_cache()
+    if settings.DB_CREATE_TABLES:
+        with startup.phase("create_tables"):
+            await run_in_threadpool(init_db)
+    if settings.DB_ASYNC_ENABLED:
+        with startup.phase("async_engine"):
+            get_async_engine()
+    scheduler = None
+    if settings.NEWS_SCHEDULER_ENABLED:
+        with startup.phase("scheduler"):
+            scheduler = IngestScheduler(configured_feeds(), SessionLocal)
+            scheduler.start()
+    startup.log_report(settings.STARTUP_BUDGET_MS)
+    # Warm the lazily imported modules off the event loop so the first request
+    # that needs them does not pay for the import
+    asyncio.get_running_loop().run_in_executor(None, startup.preload)
     yield
     logger.info("FastAPI app is shutting down...")
+    if scheduler is not None:
+        await scheduler.stop()
+    await upstream.response_cache.close()
+    await upstream.close_client()
+    await dispose_async_engine()
+
 
+app = FastAPI(
+    title="News API App", lifespan=lifespan, default_response_class=EnvelopeResponse
+)
 
-app = FastAPI(title="News API App", lifespan=lifespan)
+app.add_middleware(CompressionMiddleware)
+# Added last so it is outermost and times compression too
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth_router)
 app.include_router(news_router)
+app.include_router(metrics_router)
+
+startup.imported()
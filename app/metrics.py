@@ -0,0 +1,311 @@
+# app/metrics.py
+import time
+from bisect import bisect_left
+import anyio.to_thread
+import httpx
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.database import engine
+
+# Seconds; covers cache hits through slow upstream calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names, values) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+class _HistogramChild:
+    __slots__ = ("labels", "bounds", "counts", "sum")
+
+    def __init__(self, labels: str, bounds: tuple):
+        self.labels = labels
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class _CounterChild:
+    __slots__ = ("labels", "value")
+
+    def __init__(self, labels: str):
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class _Metric:
+    """
+    A labelled metric. Children are created, and their label text rendered, the
+    first time a label combination is seen; after that `labels()` is two dict
+    lookups, so recording allocates nothing.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._children = {}
+
+    def labels(self, first, second=None):
+        children = self._children.get(first)
+        if children is None:
+            children = self._children[first] = {}
+        child = children.get(second)
+        if child is None:
+            values = (first,) if second is None else (first, second)
+            child = children[second] = self._new_child(
+                _label_text(self.label_names, values)
+            )
+        return child
+
+    def children(self):
+        for children in self._children.values():
+            yield from children.values()
+
+    def clear(self):
+        self._children.clear()
+
+    def render(self, lines: list):
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        self._render_children(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self, labels: str):
+        return _CounterChild(labels)
+
+    def _render_children(self, lines: list):
+        for child in self.children():
+            lines.append(f"{self.name}{{{child.labels}}} {child.value}")
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, label_names, buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(float(b) for b in buckets)
+        self._bucket_labels = [f'le="{b:g}"' for b in self.buckets] + ['le="+Inf"']
+
+    def _new_child(self, labels: str):
+        return _HistogramChild(labels, self.buckets)
+
+    def _render_children(self, lines: list):
+        for child in self.children():
+            cumulative = 0
+            for le, count in zip(self._bucket_labels, child.counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{{{child.labels},{le}}} {cumulative}")
+            lines.append(f"{self.name}_sum{{{child.labels}}} {child.sum!r}")
+            lines.append(f"{self.name}_count{{{child.labels}}} {cumulative}")
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve a request, by route template and status code.",
+    ("route", "status"),
+)
+newsapi_request_duration = Histogram(
+    "newsapi_request_duration_seconds",
+    "Time until NewsAPI answered with a status, by endpoint.",
+    ("endpoint",),
+)
+newsapi_responses = Counter(
+    "newsapi_responses_total",
+    "NewsAPI responses by endpoint and HTTP status code.",
+    ("endpoint", "status"),
+)
+newsapi_errors = Counter(
+    "newsapi_errors_total",
+    "Failed NewsAPI calls by endpoint and reason (timeout, transport, status, "
+    "invalid_response, quota, rate_limited, circuit_open, deadline).",
+    ("endpoint", "reason"),
+)
+
+REGISTRY = (
+    http_request_duration,
+    newsapi_request_duration,
+    newsapi_responses,
+    newsapi_errors,
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def record_upstream_error(endpoint: str, error: Exception):
+    if isinstance(error, httpx.TimeoutException):
+        reason = "timeout"
+    elif isinstance(error, httpx.HTTPStatusError):
+        reason = "status"
+    elif isinstance(error, httpx.HTTPError):
+        reason = "transport"
+    else:
+        reason = getattr(error, "reason", "invalid_response")
+    newsapi_errors.labels(endpoint, reason).inc()
+
+
+class MetricsMiddleware:
+    """
+    Time every HTTP request and record it under its route template, so path
+    parameters do not blow up the number of series. Requests that match no
+    route share a single label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            http_request_duration.labels(path, status_code).observe(
+                time.perf_counter() - started
+            )
+
+
+def _gauge(lines: list, name: str, help_text: str, value):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} gauge")
+    lines.append(f"{name} {value}")
+
+
+def _render_pool(lines: list):
+    pool = engine.pool
+    if hasattr(pool, "checkedout"):
+        _gauge(lines, "db_pool_checked_out", "Connections in use.", pool.checkedout())
+    if hasattr(pool, "overflow"):
+        # Negative while the pool has not yet opened pool_size connections
+        _gauge(
+            lines,
+            "db_pool_overflow",
+            "Connections opened beyond pool_size.",
+            max(pool.overflow(), 0),
+        )
+    if hasattr(pool, "size"):
+        _gauge(lines, "db_pool_size", "Configured pool_size.", pool.size())
+
+
+def _render_threadpool(lines: list):
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    _gauge(
+        lines,
+        "threadpool_busy",
+        "Worker threads running sync endpoints and blocking calls.",
+        limiter.borrowed_tokens,
+    )
+    _gauge(lines, "threadpool_limit", "Worker thread limit.", limiter.total_tokens)
+    _gauge(
+        lines,
+        "threadpool_waiting",
+        "Tasks queued for a free worker thread.",
+        limiter.statistics().tasks_waiting,
+    )
+
+
+def _render_upstream(lines: list):
+    # Imported here: upstream records into this module
+    from app.news import upstream
+
+    stats = upstream.response_cache.stats()
+    for key in ("hits", "stale_hits", "misses", "evictions"):
+        name = f"news_cache_{key}_total"
+        lines.append(f"# HELP {name} Upstream response cache {key.replace('_', ' ')}.")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {stats[key]}")
+    _gauge(lines, "news_cache_entries", "Entries in the response cache.", stats["size"])
+    # Only present with a shared cache backend
+    for key in (key for key in stats if key.startswith("shared_")):
+        name = f"news_cache_{key}_total"
+        lines.append(f"# HELP {name} Shared cache {key[7:]} seen by this worker.")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {stats[key]}")
+
+    name = "newsapi_circuit_state"
+    lines.append(f"# HELP {name} NewsAPI circuit: 0 closed, 1 half-open, 2 open.")
+    lines.append(f"# TYPE {name} gauge")
+    for endpoint, breaker in upstream.breakers.items():
+        state = CIRCUIT_STATES[breaker.state]
+        lines.append(f'{name}{{endpoint="{_escape(endpoint)}"}} {state}')
+
+    quota = upstream.quota.stats()
+    if quota["remaining"] is not None:
+        _gauge(
+            lines,
+            "newsapi_quota_remaining",
+            "NewsAPI requests left in the tightest window.",
+            quota["remaining"],
+        )
+    for key in ("granted", "denied"):
+        name = f"newsapi_quota_{key}_total"
+        lines.append(f"# HELP {name} NewsAPI budget requests {key}, by priority.")
+        lines.append(f"# TYPE {name} counter")
+        for priority, count in quota[key].items():
+            lines.append(f'{name}{{priority="{priority}"}} {count}')
+
+
+def _render_startup(lines: list):
+    from app.startup import phases
+
+    if not phases:
+        return
+    name = "app_startup_phase_seconds"
+    lines.append(f"# HELP {name} Time spent in each startup phase of this process.")
+    lines.append(f"# TYPE {name} gauge")
+    for phase, seconds in phases.items():
+        lines.append(f'{name}{{phase="{phase}"}} {seconds!r}')
+
+
+def render() -> str:
+    """
+    The current metrics in the Prometheus text exposition format. Gauges are
+    read at scrape time, so they cost nothing between scrapes.
+    """
+    lines = []
+    for metric in REGISTRY:
+        metric.render(lines)
+    _render_pool(lines)
+    _render_threadpool(lines)
+    _render_upstream(lines)
+    _render_startup(lines)
+    lines.append("")
+    return "\n".join(lines)
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,13 +1,111 @@
 # app/models.py
-from sqlalchemy import Column, String, Integer, DateTime, Text
+from sqlalchemy import DDL, BINARY, BigInteger, Column, String, Integer, Date, DateTime, Text
+from sqlalchemy import Index, event
+from sqlalchemy import ForeignKey, UniqueConstraint
 from app.database import Base
 
 
+def _default_url_hash(context):
+    # Imported here: app.news.dedup queries News
+    from app.news.dedup import url_hash
+
+    url = context.get_current_parameters().get("url")
+    return url_hash(url) if url else None
+
+
 class News(Base):
     __tablename__ = "news"
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255))
     description = Column(Text)
-    url = Column(String(255), unique=True)
+    url = Column(String(255))
     published_at = Column(DateTime)
+    # Digest of the normalized url (app/news/dedup.py). Deduplicates on a
+    # 16-byte key instead of a unique index over the 255-character url
+    url_hash = Column(BINARY(16), unique=True, default=_default_url_hash)
+    # SimHash of title and description for near-duplicate detection; NULL for
+    # texts too short to compare
+    simhash = Column(BigInteger)
+
+    __table_args__ = (
+        # Keyset pagination on /news/all seeks on (published_at, id)
+        Index("ix_news_published_at_id", "published_at", "id"),
+    )
+
+
+# Full-text index over title and description for /news/search. MySQL keeps a
+# FULLTEXT index in sync by itself; SQLite gets an external-content FTS5 table
+# kept in sync by triggers.
+event.listen(
+    News.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE news ADD FULLTEXT INDEX ft_news_title_description "
+        "(title, description)"
+    ).execute_if(dialect="mysql"),
+)
+for statement in (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5("
+    "title, description, content='news', content_rowid='id')",
+    "CREATE TRIGGER news_fts_ai AFTER INSERT ON news BEGIN "
+    "INSERT INTO news_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER news_fts_ad AFTER DELETE ON news BEGIN "
+    "INSERT INTO news_fts(news_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER news_fts_au AFTER UPDATE ON news BEGIN "
+    "INSERT INTO news_fts(news_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO news_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+):
+    event.listen(
+        News.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    News.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS news_fts").execute_if(dialect="sqlite"),
+)
+
+
+class FeedWatermark(Base):
+    __tablename__ = "feed_watermarks"
+
+    feed = Column(String(255), primary_key=True)
+    published_at = Column(DateTime, nullable=False)
+    # Articles published between these may still be missing: a cycle ran out of
+    # pages before reaching the previous watermark. NULL when there is no gap.
+    gap_from = Column(DateTime, nullable=True)
+    gap_to = Column(DateTime, nullable=True)
+
+
+class IngestedWindow(Base):
+    """
+    A (query, day) window of /everything whose articles are stored in News,
+    so read-through requests can answer it from the database.
+    """
+
+    __tablename__ = "ingested_windows"
+
+    id = Column(Integer, primary_key=True)
+    query = Column(String(255), nullable=False)
+    day = Column(Date, nullable=False)
+    total_results = Column(Integer)
+    fetched_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("query", "day", name="uq_ingested_windows_query_day"),
+    )
+
+
+class WindowArticle(Base):
+    __tablename__ = "window_articles"
+
+    window_id = Column(
+        Integer, ForeignKey("ingested_windows.id", ondelete="CASCADE"), primary_key=True
+    )
+    news_id = Column(
+        Integer, ForeignKey("news.id", ondelete="CASCADE"), primary_key=True
+    )
@@ -0,0 +1,157 @@
+# app/news/batch.py
+import asyncio
+import math
+import anyio
+import orjson
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+from app.constants import NEWS_API_TOP_HEADLINES, NEWS_API_URL_EVERYTHING
+from app.logger import logger
+from app.news import upstream
+from app.news.pagination import InvalidCursor
+from app.news.search import InvalidQuery, search_news
+
+# query type -> (success code, message, upstream failure code)
+_OUTCOMES = {
+    "everything": ("NEWS_FETCHED", "News articles fetched successfully", "NEWS_FETCH_FAILED"),
+    "headlines": ("TOP_HEADLINES_FETCHED", "Top headlines fetched", "HEADLINES_FETCH_FAILED"),
+    "search": ("SEARCH_RESULTS_FETCHED", "Search results fetched successfully", None),
+}
+
+
+def upstream_request(query) -> tuple:
+    """
+    `(path, params)` of an upstream query: the same as its single-query route
+    sends, so both share response cache entries.
+    """
+    if query.type == "everything":
+        params = {
+            "q": query.q,
+            "sortBy": "popularity",
+            "from": query.from_date.isoformat(),
+            "to": query.to_date.isoformat(),
+        }
+        if query.page:
+            params["page"] = query.page
+        if query.page_size:
+            params["pageSize"] = query.page_size
+        return NEWS_API_URL_EVERYTHING, params
+    if query.country and query.source:
+        params = {"source": query.source.lower(), "country": query.country.lower()}
+    elif query.country:
+        params = {"country": query.country.lower()}
+    else:
+        params = {"sources": query.source.lower()}
+    return NEWS_API_TOP_HEADLINES, params
+
+
+def _item(index: int, message: str, error: bool, code: str, data=None, raw=None) -> bytes:
+    """
+    One encoded result. `raw` is already-encoded JSON, such as a cached upstream
+    body, spliced in as `data` without decoding it.
+    """
+    head = orjson.dumps({"index": index, "message": message, "error": error, "code": code})
+    return head[:-1] + b',"data":' + (orjson.dumps(data) if raw is None else raw) + b"}"
+
+
+class BatchResolver:
+    """
+    Resolves the queries of one batch request. Upstream queries go through
+    `upstream.fetch_cached`, so the response cache, request coalescing and quota
+    apply as for single requests, at most `concurrency` at a time. Search
+    queries share one session, opened from `session_factory` by the first of
+    them, and so run one at a time. Call `close` when done.
+    """
+
+    def __init__(self, session_factory, concurrency: int):
+        self.session_factory = session_factory
+        self.db = None
+        self._slots = asyncio.Semaphore(concurrency)
+        self._db_lock = asyncio.Lock()
+
+    async def _run(self, query) -> tuple:
+        if query.type == "search":
+            async with self._db_lock:
+                if self.db is None:
+                    self.db = self.session_factory()
+                articles, next_cursor = await run_in_threadpool(
+                    search_news, self.db, query.q, query.cursor, query.page_size
+                )
+            data = {
+                "page_size": query.page_size,
+                "next_cursor": next_cursor,
+                "articles": articles,
+            }
+            return data, None
+        async with self._slots:
+            payload = await upstream.fetch_cached(*upstream_request(query))
+        return None, payload.body
+
+    async def close(self):
+        if self.db is not None:
+            await run_in_threadpool(self.db.close)
+            self.db = None
+
+    async def resolve(self, index: int, query) -> bytes:
+        """
+        The encoded result of `query`; failures become error items rather
+        than failing the batch.
+        """
+        code, message, failure_code = _OUTCOMES[query.type]
+        try:
+            data, raw = await self._run(query)
+            return _item(index, message, False, code, data, raw)
+        except upstream.QuotaExceeded as e:
+            logger.error(f"QuotaExceeded: {str(e)}")
+            return _item(
+                index,
+                "NewsAPI request budget exhausted, try again later",
+                True,
+                "NEWS_QUOTA_EXCEEDED",
+                {"retry_after": math.ceil(e.retry_after)},
+            )
+        except upstream.UpstreamError as e:
+            logger.error(f"UpstreamError: {str(e)}")
+            return _item(index, "Failed to fetch news articles", True, failure_code)
+        except InvalidQuery as e:
+            logger.error(f"InvalidQuery: {str(e)}")
+            return _item(index, str(e), True, "INVALID_QUERY")
+        except InvalidCursor as e:
+            logger.error(f"InvalidCursor: {str(e)}")
+            return _item(index, "Invalid cursor", True, "INVALID_CURSOR")
+        except SQLAlchemyError as e:
+            logger.error(f"SQLAlchemyError: {str(e)}")
+            async with self._db_lock:
+                await run_in_threadpool(self.db.rollback)
+            return _item(index, "Database error occurred", True, "DB_ERROR")
+        except Exception as e:
+            logger.error(f"Unexpected error: {str(e)}")
+            return _item(index, "An unexpected error occurred", True, "UNEXPECTED_ERROR")
+
+    async def resolve_all(self, queries: list) -> list:
+        """
+        Encoded results in the order of `queries`.
+        """
+        return await asyncio.gather(
+            *(self.resolve(index, query) for index, query in enumerate(queries))
+        )
+
+    async def as_completed(self, queries: list):
+        """
+        Yield an NDJSON line per result as soon as it is ready. When the client
+        disconnects, the queries still running are cancelled.
+        """
+        tasks = [
+            asyncio.ensure_future(self.resolve(index, query))
+            for index, query in enumerate(queries)
+        ]
+        try:
+            for done in asyncio.as_completed(tasks):
+                yield await done + b"\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+            # A search may still be running on a worker thread with the session
+            with anyio.CancelScope(shield=True):
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await self.close()
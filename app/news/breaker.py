@@ -0,0 +1,88 @@
+# app/news/breaker.py
+from collections import deque
+from time import monotonic
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker for one upstream endpoint.
+
+    Closed: outcomes of the last `window` calls are kept; once at least
+    `min_calls` are recorded and the failure share reaches `failure_rate`, the
+    circuit opens. Open: calls are refused for `open_seconds`. Half-open: up to
+    `probes` calls go through; a success closes the circuit, a failure opens it
+    again.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float,
+        min_calls: int,
+        window: int,
+        open_seconds: float,
+        probes: int = 1,
+    ):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.probes = probes
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = 0
+
+    def allow(self) -> float:
+        """
+        Claim a call slot. Returns 0 when the call may go ahead, otherwise the
+        seconds until the circuit lets a probe through. Every allowed call must
+        be followed by `record`.
+        """
+        if self.state == OPEN:
+            wait = self._opened_at + self.open_seconds - monotonic()
+            if wait > 0:
+                return wait
+            self.state = HALF_OPEN
+            self._probing = 0
+        if self.state == HALF_OPEN:
+            if self._probing >= self.probes:
+                return self.open_seconds
+            self._probing += 1
+        return 0.0
+
+    def record(self, success):
+        """
+        Report the outcome of an allowed call; None releases the slot without
+        an outcome, e.g. when the caller was cancelled.
+        """
+        if self.state == HALF_OPEN:
+            self._probing = max(self._probing - 1, 0)
+            if success is True:
+                self._close()
+            elif success is False:
+                self._open()
+            return
+        if success is None or self.state == OPEN:
+            return
+        if len(self._outcomes) == self._outcomes.maxlen:
+            self._failures -= not self._outcomes[0]
+        self._outcomes.append(success)
+        self._failures += not success
+        if (
+            len(self._outcomes) >= self.min_calls
+            and self._failures >= self.failure_rate * len(self._outcomes)
+        ):
+            self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = monotonic()
+
+    def _close(self):
+        self.state = CLOSED
+        self._outcomes.clear()
+        self._failures = 0
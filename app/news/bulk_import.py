@@ -0,0 +1,134 @@
+# app/news/bulk_import.py
+import queue
+import threading
+import time
+from typing import NamedTuple
+import orjson
+from sqlalchemy.engine import Engine
+from app.news.dedup import add_hashes, drop_near_duplicates
+from app.news.ingest import insert_ignoring_duplicates, near_duplicate_filter, parse_article
+
+_DONE = object()
+
+
+class ImportStats(NamedTuple):
+    lines: int
+    inserted: int
+    skipped: int
+    seconds: float
+    near_duplicates: int = 0
+
+    @property
+    def rate(self) -> float:
+        return self.lines / self.seconds if self.seconds else 0.0
+
+
+def _parse_line(line: bytes):
+    record = orjson.loads(line)
+    # Rows from /news/export use column names; accept them next to NewsAPI articles
+    if "publishedAt" not in record and "published_at" in record:
+        record["publishedAt"] = record["published_at"]
+    row = parse_article(record)
+    return None if row is None else add_hashes(row)
+
+
+def _parse_batches(
+    lines, batch_size: int, batches: queue.Queue, counters: dict, stopped
+):
+    """
+    Producer: decode lines into News rows and hand them over `batch_size` at a
+    time. `put` blocks while the queue is full, which bounds memory.
+    """
+    try:
+        batch = {}
+        for line in lines:
+            if stopped.is_set():
+                return
+            if not line.strip():
+                continue
+            counters["lines"] += 1
+            try:
+                row = _parse_line(line)
+            except (ValueError, TypeError, AttributeError):
+                row = None
+            if row is None:
+                counters["skipped"] += 1
+                continue
+            batch.setdefault(row["url_hash"], row)
+            if len(batch) >= batch_size:
+                batches.put(list(batch.values()))
+                batch = {}
+        if batch:
+            batches.put(list(batch.values()))
+        batches.put(_DONE)
+    except BaseException as e:
+        batches.put(e)
+
+
+def import_ndjson(
+    lines,
+    engine: Engine,
+    batch_size: int = 5000,
+    queue_size: int = 4,
+    progress=None,
+    progress_interval: float = 2.0,
+) -> ImportStats:
+    """
+    Stream NDJSON articles from `lines` (an iterable of bytes) into News.
+
+    A parser thread decodes lines while this thread runs one multi-row
+    insert-ignore per batch, each in its own transaction, so a crash keeps what
+    was already committed and a rerun skips it. At most `queue_size` parsed
+    batches wait in memory. `progress` is called with an ImportStats roughly
+    every `progress_interval` seconds. Near-duplicates of stored or earlier
+    articles are counted and left out. On MySQL `inserted` also counts
+    duplicate urls, since ON DUPLICATE KEY reports them as affected rows.
+    """
+    counters = {"lines": 0, "skipped": 0}
+    batches = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+    parser = threading.Thread(
+        target=_parse_batches,
+        args=(lines, batch_size, batches, counters, stopped),
+        name="ndjson-parser",
+        daemon=True,
+    )
+    statement = insert_ignoring_duplicates(engine.dialect.name)
+    max_distance, window = near_duplicate_filter()
+    inserted = near_duplicates = 0
+    started = last_report = time.monotonic()
+
+    def stats() -> ImportStats:
+        return ImportStats(
+            counters["lines"],
+            inserted,
+            counters["skipped"],
+            time.monotonic() - started,
+            near_duplicates,
+        )
+
+    parser.start()
+    try:
+        while True:
+            batch = batches.get()
+            if batch is _DONE:
+                break
+            if isinstance(batch, BaseException):
+                raise batch
+            with engine.begin() as connection:
+                batch, dropped = drop_near_duplicates(connection, batch, max_distance, window)
+                near_duplicates += len(dropped)
+                if batch:
+                    inserted += max(connection.execute(statement, batch).rowcount, 0)
+            if progress is not None and time.monotonic() - last_report >= progress_interval:
+                last_report = time.monotonic()
+                progress(stats())
+    finally:
+        # On failure, unblock a parser waiting on a full queue so it can exit
+        stopped.set()
+        while parser.is_alive():
+            try:
+                batches.get(timeout=0.1)
+            except queue.Empty:
+                pass
+    return stats()
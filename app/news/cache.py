@@ -0,0 +1,187 @@
+# app/news/cache.py
+import asyncio
+from collections import OrderedDict
+from time import monotonic, time
+from urllib.parse import urlencode
+from app.logger import logger
+
+
+def make_key(path: str, params: dict) -> tuple:
+    """
+    Normalize upstream parameters into a cache key. The API key is never part of it.
+    """
+    return (
+        path,
+        tuple(
+            sorted(
+                (k, str(v).strip())
+                for k, v in params.items()
+                if k != "apiKey" and v is not None
+            )
+        ),
+    )
+
+
+def key_text(key) -> str:
+    """
+    The string form of a cache key, used by the shared cache.
+    """
+    if isinstance(key, str):
+        return key
+    path, params = key
+    return f"{path}?{urlencode(params)}"
+
+
+class ResponseCache:
+    """
+    In-process TTL cache with LRU eviction and stale-while-revalidate.
+
+    An entry is fresh for `ttl` seconds, then served stale for `stale_ttl` more
+    seconds while a single background task refreshes it. Expired entries stay
+    until evicted or replaced, so `peek` can still hand them out as a last resort.
+
+    With a `shared` cache (see shared_cache.py), local misses and refreshes go
+    through it, so the workers of a deployment fetch each key once between them.
+    Local entries then expire with the shared entry they were copied from.
+    """
+
+    def __init__(self, max_entries: int, stale_ttl: float, shared=None):
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self.shared = shared
+        self._entries = OrderedDict()
+        self._refreshing = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Return `(value, is_stale)` or None, which includes expired entries.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, fresh_until, stale_until = entry
+        now = monotonic()
+        if now >= stale_until:
+            return None
+        self._entries.move_to_end(key)
+        return value, now >= fresh_until
+
+    def peek(self, key):
+        """
+        Return the stored value however old it is, or None.
+        """
+        entry = self._entries.get(key)
+        return None if entry is None else entry[0]
+
+    async def peek_shared(self, key):
+        """
+        Like `peek`, falling back to the shared cache.
+        """
+        value = self.peek(key)
+        if value is None and self.shared is not None:
+            value = await self.shared.peek(key_text(key))
+        return value
+
+    def set(self, key, value, ttl: float):
+        if ttl <= 0:
+            return
+        now = monotonic()
+        self._store(key, value, now + ttl, now + ttl + self.stale_ttl)
+
+    def _store(self, key, value, fresh_until: float, stale_until: float):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (value, fresh_until, stale_until)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _adopt(self, key, entry):
+        # Shared entries carry wall-clock bounds; store them on the local clock
+        offset = monotonic() - time()
+        self._store(key, entry.value, entry.fresh_until + offset, entry.stale_until + offset)
+
+    async def get_or_fetch(self, key, ttl: float, fetch, refresh=None):
+        """
+        Serve `key` from the cache, calling the `fetch` coroutine function on a miss.
+        Stale entries are returned immediately and refreshed in the background
+        with `refresh`, which defaults to `fetch`.
+        """
+        cached = self.get(key) if ttl > 0 else None
+        if cached is not None:
+            value, is_stale = cached
+            if is_stale:
+                self.stale_hits += 1
+                self._schedule_refresh(key, ttl, refresh or fetch)
+            else:
+                self.hits += 1
+            return value
+
+        self.misses += 1
+        if self.shared is None or ttl <= 0:
+            value = await fetch()
+            self.set(key, value, ttl)
+            return value
+
+        entry = await self.shared.get_or_fetch(key_text(key), ttl, fetch)
+        self._adopt(key, entry)
+        if not entry.is_fresh(time()):
+            self._schedule_refresh(key, ttl, refresh or fetch)
+        return entry.value
+
+    def _schedule_refresh(self, key, ttl: float, fetch):
+        if key in self._refreshing:
+            return
+        self._refreshing[key] = asyncio.create_task(self._refresh(key, ttl, fetch))
+
+    async def _refresh(self, key, ttl: float, fetch):
+        try:
+            if self.shared is None:
+                self.set(key, await fetch(), ttl)
+            else:
+                # Another worker may have refreshed it already
+                entry = await self.shared.get_or_fetch(
+                    key_text(key), ttl, fetch, accept_stale=False
+                )
+                self._adopt(key, entry)
+        except Exception as e:
+            # Keep serving the stale copy until it runs out
+            logger.error(f"Cache refresh failed: {str(e)}")
+        finally:
+            self._refreshing.pop(key, None)
+
+    def stats(self) -> dict:
+        stats = {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "refreshing": len(self._refreshing),
+        }
+        if self.shared is not None:
+            stats.update(self.shared.stats())
+        return stats
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.stale_hits = self.misses = self.evictions = 0
+
+    async def close(self):
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refreshing.clear()
+        if self.shared is not None:
+            await self.shared.close()
+            self.shared = None
@@ -0,0 +1,251 @@
+# app/news/dedup.py
+import hashlib
+import re
+from collections import Counter
+from datetime import timedelta
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from sqlalchemy import and_, bindparam, or_, select, update
+from app.models import News
+
+# Query parameters that only track the referrer and never change the article
+_TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ocid", "cmpid", "cmp"}
+_DEFAULT_PORTS = {80, 443}
+
+_WORD = re.compile(r"\w+")
+
+# Texts shorter than this give fingerprints too noisy to compare
+MIN_WORDS = 8
+# Keeps every per-bit counter below 2**16, see _spread
+_MAX_WORDS = 4096
+
+_BITS = 64
+_MASK = (1 << _BITS) - 1
+_LANE = 16
+
+# Beyond this many separate date ranges, one query covers the whole batch
+_MAX_RANGES = 32
+
+
+def normalize_url(url: str) -> str:
+    """
+    The url without what does not identify the article: scheme, "www.", default
+    port, trailing slash, fragment and tracking parameters. Remaining query
+    parameters are sorted.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").removeprefix("www.")
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port not in _DEFAULT_PORTS:
+        host = f"{host}:{port}"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.startswith("utm_") and key not in _TRACKING_PARAMS
+    )
+    normalized = host + (parts.path.rstrip("/") or "/")
+    return normalized + "?" + urlencode(query) if query else normalized
+
+
+def url_hash(url: str) -> bytes:
+    """
+    16-byte digest of the normalized url, stored in the fixed-width unique
+    News.url_hash column.
+    """
+    return hashlib.blake2b(normalize_url(url).encode(), digest_size=16).digest()
+
+
+def _spread_table(position: int) -> list:
+    # Byte value -> its 8 bits moved into the 16-bit lanes of bits position*8..+7
+    return [
+        sum(1 << ((position * 8 + bit) * _LANE) for bit in range(8) if byte >> bit & 1)
+        for byte in range(256)
+    ]
+
+
+_SPREAD = [_spread_table(position) for position in range(_BITS // 8)]
+
+
+def _spread(value: int) -> int:
+    """
+    One 16-bit lane per bit of `value`, holding that bit. Summing spread hashes
+    counts the set bits of every position at once, instead of a Python loop
+    over 64 bits per feature.
+    """
+    spread = 0
+    for table in _SPREAD:
+        spread |= table[value & 0xFF]
+        value >>= 8
+    return spread
+
+
+def simhash(title: Optional[str], description: Optional[str]) -> Optional[int]:
+    """
+    64-bit SimHash over the word bigrams of title and description, as a signed
+    integer for a BIGINT column. Near-identical texts get fingerprints a few
+    bits apart. None when the text is too short to compare.
+    """
+    words = _WORD.findall(f"{title or ''} {description or ''}".lower())[:_MAX_WORDS]
+    if len(words) < MIN_WORDS:
+        return None
+    features = Counter(zip(words, words[1:]))
+    counts = 0
+    for (first, second), weight in features.items():
+        digest = hashlib.blake2b(f"{first} {second}".encode(), digest_size=8).digest()
+        counts += _spread(int.from_bytes(digest, "big")) * weight
+    half = sum(features.values()) / 2
+    fingerprint = 0
+    for bit in range(_BITS):
+        if (counts >> (bit * _LANE)) & 0xFFFF > half:
+            fingerprint |= 1 << bit
+    return fingerprint - (1 << _BITS) if fingerprint >> (_BITS - 1) else fingerprint
+
+
+def distance(a: int, b: int) -> int:
+    """
+    Number of differing bits between two fingerprints.
+    """
+    return ((a ^ b) & _MASK).bit_count()
+
+
+def add_hashes(row: dict) -> dict:
+    """
+    Fill in the url_hash and simhash columns of a parsed News row.
+    """
+    row["url_hash"] = url_hash(row["url"])
+    row["simhash"] = simhash(row["title"], row["description"])
+    return row
+
+
+class _BandIndex:
+    """
+    Fingerprints keyed by each of `max_distance + 1` bands of their bits. Two
+    fingerprints at most `max_distance` bits apart agree on at least one band,
+    so a lookup only compares the few fingerprints sharing a band.
+    """
+
+    def __init__(self, max_distance: int):
+        self.max_distance = max_distance
+        count = max_distance + 1
+        width = _BITS // count
+        # The last band takes the bits left over by the integer division
+        self._bands = [
+            (i * width, (1 << (width if i < count - 1 else _BITS - i * width)) - 1, {})
+            for i in range(count)
+        ]
+
+    def add(self, fingerprint: int):
+        value = fingerprint & _MASK
+        for shift, mask, index in self._bands:
+            index.setdefault(value >> shift & mask, []).append(fingerprint)
+
+    def matches(self, fingerprint: int) -> bool:
+        value = fingerprint & _MASK
+        return any(
+            distance(fingerprint, candidate) <= self.max_distance
+            for shift, mask, index in self._bands
+            for candidate in index.get(value >> shift & mask, ())
+        )
+
+
+def _date_ranges(rows: list, window: timedelta) -> list:
+    """
+    Merged `published_at ± window` ranges around the rows.
+    """
+    ranges = []
+    for published_at in sorted(row["published_at"].replace(tzinfo=None) for row in rows):
+        start, end = published_at - window, published_at + window
+        if ranges and start <= ranges[-1][1]:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+    if len(ranges) > _MAX_RANGES:
+        return [[ranges[0][0], ranges[-1][1]]]
+    return ranges
+
+
+def drop_near_duplicates(db, rows: list, max_distance: int, window: timedelta):
+    """
+    Split `rows` into `(kept, dropped)`. A row is dropped when its simhash is
+    within `max_distance` bits of a stored article published within
+    `window` of the batch's rows, or of a row kept before it in the batch.
+    Stored candidates come from one query over the published_at index. `db` is
+    a Session or Connection.
+    """
+    fingerprinted = [row for row in rows if row.get("simhash") is not None]
+    if max_distance < 0 or not fingerprinted:
+        return rows, []
+
+    index = _BandIndex(max_distance)
+    ranges = _date_ranges(fingerprinted, window)
+    stored = db.execute(
+        select(News.simhash).where(
+            News.simhash.isnot(None),
+            or_(
+                *(
+                    and_(News.published_at >= start, News.published_at <= end)
+                    for start, end in ranges
+                )
+            ),
+        )
+    )
+    for (fingerprint,) in stored:
+        index.add(fingerprint)
+
+    kept, dropped = [], []
+    for row in rows:
+        fingerprint = row.get("simhash")
+        if fingerprint is not None and index.matches(fingerprint):
+            dropped.append(row)
+            continue
+        if fingerprint is not None:
+            index.add(fingerprint)
+        kept.append(row)
+    return kept, dropped
+
+
+def backfill_hashes(engine, batch_size: int = 1000) -> int:
+    """
+    Fill url_hash and simhash for rows stored before those columns existed.
+    A row whose normalized url another row already has keeps a NULL url_hash.
+    Returns the number of rows updated.
+    """
+    updated, last_id = 0, 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(
+                select(News.id, News.url, News.title, News.description)
+                .where(News.id > last_id, News.url_hash.is_(None))
+                .order_by(News.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return updated
+            last_id = rows[-1].id
+            hashes = {}
+            for row in rows:
+                if row.url:
+                    hashes.setdefault(url_hash(row.url), row)
+            taken = set(
+                connection.scalars(select(News.url_hash).where(News.url_hash.in_(hashes)))
+            )
+            values = [
+                {
+                    "row_id": row.id,
+                    "url_hash": key,
+                    "simhash": simhash(row.title, row.description),
+                }
+                for key, row in hashes.items()
+                if key not in taken
+            ]
+            if values:
+                connection.execute(
+                    update(News)
+                    .where(News.id == bindparam("row_id"))
+                    .values(url_hash=bindparam("url_hash"), simhash=bindparam("simhash")),
+                    values,
+                )
+            updated += len(values)
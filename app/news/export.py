@@ -0,0 +1,91 @@
+# app/news/export.py
+import csv
+import io
+from datetime import datetime
+from typing import Optional
+import anyio
+import orjson
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models import News
+
+EXPORT_COLUMNS = (News.id, News.title, News.description, News.url, News.published_at)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+
+
+def _ndjson(batch) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(EXPORT_FIELDS, row))) + b"\n" for row in batch)
+
+
+def _csv(batch) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for id_, title, description, url, published_at in batch:
+        writer.writerow(
+            (
+                id_,
+                title,
+                description,
+                url,
+                published_at.isoformat() if published_at else "",
+            )
+        )
+    return buffer.getvalue().encode()
+
+
+# format -> (media type, batch encoder, leading chunk)
+FORMATS = {
+    "ndjson": ("application/x-ndjson", _ndjson, b""),
+    "csv": ("text/csv; charset=utf-8", _csv, (",".join(EXPORT_FIELDS) + "\r\n").encode()),
+}
+
+
+def open_export(
+    db: Session,
+    fmt: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = 1000,
+):
+    """
+    Run the export query and return a generator of encoded chunks, one per
+    `batch_size` rows. Rows come from a server-side cursor as plain tuples, so
+    memory stays flat however large the table is. The query runs here rather
+    than on the first chunk, so database errors surface before the response starts.
+    """
+    statement = select(*EXPORT_COLUMNS).order_by(News.published_at, News.id)
+    if start is not None:
+        statement = statement.where(News.published_at >= start)
+    if end is not None:
+        statement = statement.where(News.published_at < end)
+    result = db.execute(statement, execution_options={"yield_per": batch_size})
+    _, encode, head = FORMATS[fmt]
+
+    def chunks():
+        try:
+            if head:
+                yield head
+            for batch in result.partitions():
+                yield encode(batch)
+        finally:
+            result.close()
+
+    return chunks()
+
+
+async def iterate_export(chunks):
+    """
+    Drive a blocking chunk generator from worker threads. When the client
+    disconnects the streaming task is cancelled and the generator is closed
+    straight away, releasing the cursor instead of waiting for garbage collection.
+    """
+    try:
+        while True:
+            chunk = await run_in_threadpool(next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        with anyio.CancelScope(shield=True):
+            await run_in_threadpool(chunks.close)
@@ -0,0 +1,83 @@
+# app/news/ingest.py
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import News
+from app.news.dedup import add_hashes, drop_near_duplicates
+
+
+def parse_article(article: dict):
+    """
+    Map a NewsAPI article onto News columns. Returns None when it cannot be stored.
+    """
+    url = article.get("url")
+    published_at = article.get("publishedAt")
+    if not url or not published_at:
+        return None
+    return {
+        "title": article.get("title"),
+        "description": article.get("description"),
+        "url": url,
+        "published_at": datetime.fromisoformat(published_at.replace("Z", "+00:00")),
+    }
+
+
+def insert_ignoring_duplicates(dialect_name: str):
+    """
+    Multi-row INSERT that skips rows whose url_hash already exists, so
+    concurrent ingests racing on the same article do not fail the whole batch.
+    """
+    if dialect_name == "mysql":
+        stmt = mysql.insert(News)
+        return stmt.on_duplicate_key_update(url_hash=stmt.inserted.url_hash)
+    if dialect_name == "sqlite":
+        return sqlite.insert(News).on_conflict_do_nothing(index_elements=["url_hash"])
+    return insert(News)
+
+
+def near_duplicate_filter():
+    """
+    `(max_distance, window)` arguments for drop_near_duplicates from the settings.
+    """
+    window = timedelta(hours=settings.NEWS_DEDUP_WINDOW_HOURS)
+    return settings.NEWS_DEDUP_MAX_DISTANCE, window
+
+
+def save_articles(db: Session, articles: list, keep_near_duplicates: bool = False) -> list:
+    """
+    Store new articles in at most three round trips regardless of batch size:
+    one `url_hash IN (...)` lookup, one query for near-duplicate candidates and
+    one bulk insert. Returns the rows that were inserted. Where the backend has
+    no INSERT ... RETURNING (MySQL), that list may also include rows a concurrent
+    ingest stored first. With `keep_near_duplicates`, only url duplicates are
+    skipped.
+    """
+    rows = {}
+    for article in articles:
+        row = parse_article(article)
+        if row is not None:
+            add_hashes(row)
+            rows.setdefault(row["url_hash"], row)
+    if not rows:
+        return []
+
+    with db.begin():
+        existing = set(
+            db.scalars(select(News.url_hash).where(News.url_hash.in_(rows.keys())))
+        )
+        new_rows = [row for key, row in rows.items() if key not in existing]
+        if not keep_near_duplicates:
+            new_rows, _ = drop_near_duplicates(db, new_rows, *near_duplicate_filter())
+        if not new_rows:
+            return []
+        dialect = db.get_bind().dialect
+        stmt = insert_ignoring_duplicates(dialect.name)
+        if not dialect.insert_executemany_returning:
+            db.execute(stmt, new_rows)
+            return new_rows
+        # Rows skipped by the conflict clause are not returned
+        inserted = set(db.scalars(stmt.returning(News.url_hash), new_rows))
+
+    return [row for row in new_rows if row["url_hash"] in inserted]
@@ -0,0 +1,50 @@
+# app/news/listing.py
+from typing import Optional
+from app.models import News
+
+# Fields /news/all can return, in their default order
+LISTING_COLUMNS = {
+    column.key: column
+    for column in (News.id, News.title, News.description, News.url, News.published_at)
+}
+
+# Selected even when not requested: keyset pagination needs the last row's position
+_POSITION_FIELDS = ("published_at", "id")
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def parse_fields(fields: Optional[str]) -> tuple:
+    """
+    Field names from a comma-separated `fields=` value, in the order given.
+    None or "" selects every field.
+    """
+    if not fields:
+        return tuple(LISTING_COLUMNS)
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in LISTING_COLUMNS]
+    if unknown or not names:
+        raise InvalidFields(
+            f"Unknown fields: {', '.join(unknown)}; "
+            f"choose from {', '.join(LISTING_COLUMNS)}"
+        )
+    return names
+
+
+def listing_columns(names: tuple) -> list:
+    """
+    Columns to select for `names`: the requested ones first, then any position
+    column keyset pagination needs.
+    """
+    extra = [name for name in _POSITION_FIELDS if name not in names]
+    return [LISTING_COLUMNS[name] for name in (*names, *extra)]
+
+
+def project(names: tuple, rows) -> list:
+    """
+    Plain row tuples to article dicts with just the requested fields. zip stops
+    at the last requested column, which drops the trailing position columns.
+    """
+    return [dict(zip(names, row)) for row in rows]
@@ -0,0 +1,83 @@
+# app/news/pagination.py
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+from app.models import News
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def _decode(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+
+def encode_cursor(published_at: datetime, news_id: int) -> str:
+    return _encode([published_at.isoformat(), news_id])
+
+
+def decode_cursor(cursor: str):
+    """
+    Return the `(published_at, id)` position encoded in `cursor`, or None for "".
+    """
+    if not cursor:
+        return None
+    try:
+        published_at, news_id = _decode(cursor)
+        return datetime.fromisoformat(published_at), int(news_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def encode_search_cursor(score: float, news_id: int) -> str:
+    return _encode([score, news_id])
+
+
+def decode_search_cursor(cursor: str):
+    """
+    Return the `(score, id)` position of a /news/search cursor, or None for "".
+    """
+    if not cursor:
+        return None
+    try:
+        score, news_id = _decode(cursor)
+        return float(score), int(news_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def keyset_page(query, cursor: str, page_size: int):
+    """
+    Fetch the page after `cursor` ordered by `(published_at, id)` descending.
+    Seeks through ix_news_published_at_id instead of scanning an OFFSET.
+    Returns `(rows, next_cursor)`; `next_cursor` is None on the last page.
+    """
+    position = decode_cursor(cursor)
+    query = query.filter(News.published_at.isnot(None))
+    if position is not None:
+        published_at, news_id = position
+        # Equivalent to (published_at, id) < position, written with a leading
+        # range on published_at so the planner seeks the index and needs no sort
+        query = query.filter(
+            and_(
+                News.published_at <= published_at,
+                or_(News.published_at < published_at, News.id < news_id),
+            )
+        )
+    rows = (
+        query.order_by(News.published_at.desc(), News.id.desc())
+        .limit(page_size + 1)
+        .all()
+    )
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(rows[-1].published_at, rows[-1].id)
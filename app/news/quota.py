@@ -0,0 +1,124 @@
+# app/news/quota.py
+from email.utils import parsedate_to_datetime
+from time import monotonic, time
+from typing import Optional
+
+# Priority classes, most important first. Ingestion keeps the app's data
+# flowing, interactive calls answer users, warmup only refreshes the cache.
+INGESTION = "ingestion"
+INTERACTIVE = "interactive"
+WARMUP = "warmup"
+
+DEFAULT_RETRY_AFTER = 60.0
+
+
+class TokenBucket:
+    """
+    `capacity` tokens refilled continuously over `window` seconds.
+    """
+
+    def __init__(self, capacity: float, window: float):
+        self.capacity = capacity
+        self.rate = capacity / window
+        self.tokens = capacity
+        self.updated = monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, floor: float) -> float:
+        # Seconds until one token can be taken without dropping below `floor`
+        deficit = floor + 1 - self.tokens
+        return max(deficit, 0) / self.rate
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP-date).
+    """
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time(), 0.0)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+class QuotaManager:
+    """
+    Budget for NewsAPI requests: one token bucket per time window, all of which
+    must have a token for a call to go out. Lower priorities have to leave a
+    reserve (a fraction of each bucket) untouched, so a burst of interactive
+    traffic cannot starve ingestion and cache warmup gives way to both. A 429
+    from NewsAPI blocks every call until its Retry-After has passed.
+    """
+
+    def __init__(self, limits: list, reserves: dict):
+        self.buckets = [
+            TokenBucket(capacity, window) for capacity, window in limits if capacity > 0
+        ]
+        self.reserves = reserves
+        self.blocked_until = 0.0
+        self.granted = {}
+        self.denied = {}
+
+    def try_acquire(self, priority: str) -> float:
+        """
+        Take a token for `priority`. Returns 0 on success, otherwise the number
+        of seconds after which a retry may succeed.
+        """
+        now = monotonic()
+        if now < self.blocked_until:
+            return self._deny(priority, self.blocked_until - now)
+        reserve = self.reserves.get(priority, 0.0)
+        wait = 0.0
+        for bucket in self.buckets:
+            bucket.refill(now)
+            wait = max(wait, bucket.wait_time(reserve * bucket.capacity))
+        if wait > 0:
+            return self._deny(priority, wait)
+        for bucket in self.buckets:
+            bucket.tokens -= 1
+        self.granted[priority] = self.granted.get(priority, 0) + 1
+        return 0.0
+
+    def _deny(self, priority: str, wait: float) -> float:
+        self.denied[priority] = self.denied.get(priority, 0) + 1
+        return wait
+
+    def block(self, seconds: float):
+        """
+        Stop all calls for `seconds`, e.g. after NewsAPI answered 429.
+        """
+        self.blocked_until = max(self.blocked_until, monotonic() + seconds)
+
+    def reset(self):
+        now = monotonic()
+        for bucket in self.buckets:
+            bucket.tokens = bucket.capacity
+            bucket.updated = now
+        self.blocked_until = 0.0
+        self.granted.clear()
+        self.denied.clear()
+
+    def remaining(self) -> Optional[float]:
+        if not self.buckets:
+            return None
+        now = monotonic()
+        for bucket in self.buckets:
+            bucket.refill(now)
+        return min(bucket.tokens for bucket in self.buckets)
+
+    def stats(self) -> dict:
+        remaining = self.remaining()
+        return {
+            "remaining": None if remaining is None else int(remaining),
+            "blocked_for": max(self.blocked_until - monotonic(), 0.0),
+            "granted": dict(self.granted),
+            "denied": dict(self.denied),
+        }
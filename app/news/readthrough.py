@@ -0,0 +1,166 @@
+# app/news/readthrough.py
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.constants import NEWS_API_URL_EVERYTHING
+from app.models import IngestedWindow, News, WindowArticle
+from app.news import upstream
+from app.news.dedup import url_hash
+from app.news.ingest import save_articles
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _day_params(q: str, day: date) -> dict:
+    return {
+        "q": q,
+        "from": day.isoformat(),
+        "to": day.isoformat(),
+        "sortBy": "publishedAt",
+        "pageSize": settings.NEWS_READ_THROUGH_PAGE_SIZE,
+    }
+
+
+def _stored_articles(db: Session, query: str, days: list) -> dict:
+    """
+    Map each ingested day in `days` to `(total_results, articles)`.
+    """
+    with db.begin():
+        rows = db.execute(
+            select(
+                IngestedWindow.day,
+                IngestedWindow.total_results,
+                News.title,
+                News.description,
+                News.url,
+                News.published_at,
+            )
+            .select_from(IngestedWindow)
+            .outerjoin(WindowArticle, WindowArticle.window_id == IngestedWindow.id)
+            .outerjoin(News, News.id == WindowArticle.news_id)
+            .where(IngestedWindow.query == query, IngestedWindow.day.in_(days))
+        ).all()
+    stored = {}
+    for day, total_results, title, description, url, published_at in rows:
+        _, articles = stored.setdefault(day, (total_results, []))
+        if url is not None:
+            articles.append(
+                {
+                    "title": title,
+                    "description": description,
+                    "url": url,
+                    "publishedAt": published_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                }
+            )
+    return {
+        day: (len(articles) if total is None else total, articles)
+        for day, (total, articles) in stored.items()
+    }
+
+
+def _record_window(db: Session, query: str, day: date, total_results: int, articles: list):
+    """
+    Store a fully fetched historical day and mark its window as ingested.
+    Near-duplicates are kept, so the day is served later as upstream returned it.
+    """
+    save_articles(db, articles, keep_near_duplicates=True)
+    hashes = [url_hash(a["url"]) for a in articles if a.get("url")]
+    try:
+        with db.begin():
+            window = IngestedWindow(
+                query=query,
+                day=day,
+                total_results=total_results,
+                fetched_at=datetime.now(timezone.utc).replace(tzinfo=None),
+            )
+            db.add(window)
+            db.flush()
+            news_ids = db.scalars(
+                select(News.id).where(News.url_hash.in_(hashes))
+            ).all()
+            if news_ids:
+                db.execute(
+                    WindowArticle.__table__.insert(),
+                    [{"window_id": window.id, "news_id": i} for i in news_ids],
+                )
+    except IntegrityError:
+        # A concurrent request recorded the same window first
+        pass
+
+
+async def _fetch_day(q: str, day: date, slots: asyncio.Semaphore) -> tuple:
+    """
+    `(total_results, articles)` of one day from upstream, paging until every
+    result is in or NEWS_READ_THROUGH_MAX_PAGES pages were fetched.
+    """
+    params = _day_params(q, day)
+    async with slots:
+        payload = await upstream.fetch_cached(NEWS_API_URL_EVERYTHING, params)
+        total_results = payload.data.get("totalResults") or 0
+        articles = list(payload.data.get("articles", []))
+        page = 1
+        while len(articles) < total_results and page < settings.NEWS_READ_THROUGH_MAX_PAGES:
+            page += 1
+            payload = await upstream.fetch_cached(
+                NEWS_API_URL_EVERYTHING, {**params, "page": page}
+            )
+            batch = payload.data.get("articles", [])
+            if not batch:
+                break
+            articles += batch
+    return total_results, articles
+
+
+def _published_at(article: dict) -> str:
+    return article.get("publishedAt") or ""
+
+
+async def read_through(db: Session, q: str, from_date: date, to_date: date) -> dict:
+    """
+    Answer an /everything date range day by day: days already ingested come
+    from the database, the rest from upstream, at most
+    NEWS_READ_THROUGH_CONCURRENCY days at a time. Past days are written back
+    once every one of their results was fetched; today is never recorded
+    because it is still changing. `totalResults` adds up the upstream counts.
+    """
+    query = _normalize(q)
+    days = [
+        from_date + timedelta(days=i) for i in range((to_date - from_date).days + 1)
+    ]
+    stored = await run_in_threadpool(_stored_articles, db, query, days)
+    missing = [day for day in days if day not in stored]
+
+    slots = asyncio.Semaphore(settings.NEWS_READ_THROUGH_CONCURRENCY)
+    fetched = await asyncio.gather(*(_fetch_day(q, day, slots) for day in missing))
+
+    today = datetime.now(timezone.utc).date()
+    for day, (total_results, day_articles) in zip(missing, fetched):
+        if day < today and len(day_articles) >= total_results:
+            await run_in_threadpool(
+                _record_window, db, query, day, total_results, day_articles
+            )
+
+    results = [stored[day] for day in days if day in stored] + fetched
+    articles, seen = [], set()
+    for _, batch in results:
+        for article in batch:
+            if article.get("url") not in seen:
+                seen.add(article.get("url"))
+                articles.append(article)
+    articles.sort(key=_published_at, reverse=True)
+
+    return {
+        "status": "ok",
+        "totalResults": sum(total_results for total_results, _ in results),
+        "articles": articles,
+        "sources": {
+            "database": [day.isoformat() for day in days if day in stored],
+            "upstream": [day.isoformat() for day in missing],
+        },
+    }
@@ -1,38 +1,146 @@
 # app/news/routes.py
-import requests
+import math
 from datetime import date, datetime
-from fastapi import APIRouter, Depends, Query, status, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request, status, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from app.auth.security import verify_token
 from app.config import settings
-from app.global_utils import get_response
-from app.constants import NEWS_API_URL_EVERYTHING, NEWS_API_TOP_HEADLINES
+from app.compression import negotiate, weaken_etag
+from app.global_utils import (
+    ENVELOPE_SUFFIX,
+    STATIC_HEADERS,
+    EnvelopeResponse,
+    envelope_prefix,
+    etag_matches,
+    get_not_modified_response,
+    get_response,
+    get_stream_response,
+    make_etag,
+    private_cache_control,
+    validator_headers,
+)
+from app.constants import (
+    CACHE_CONTROL_ALL_NEWS,
+    NEWS_API_URL_EVERYTHING,
+    NEWS_API_TOP_HEADLINES,
+)
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db, get_session_factory
 from app.models import News
 from sqlalchemy.exc import SQLAlchemyError
 from app.logger import logger
+from app.news import upstream
+from app.news.batch import BatchResolver
+from app.news.export import FORMATS, iterate_export, open_export
+from app.news.ingest import save_articles
+from app.news.listing import (
+    LISTING_COLUMNS,
+    InvalidFields,
+    listing_columns,
+    parse_fields,
+    project,
+)
+from app.news.pagination import InvalidCursor, keyset_page
+from app.news.quota import INGESTION
+from app.news.readthrough import read_through
+from app.news.schemas import BatchRequest
+from app.news.search import InvalidQuery, search_news, search_news_async
 
 
-router = APIRouter(prefix="/news", dependencies=[Depends(verify_token)])
+async def upstream_deadline():
+    # Async so the deadline is set in the endpoint's own context
+    with upstream.deadline(settings.NEWS_API_REQUEST_DEADLINE):
+        yield
+
+
+router = APIRouter(
+    prefix="/news", dependencies=[Depends(verify_token), Depends(upstream_deadline)]
+)
+
+
+def _quota_exceeded_response(e: upstream.QuotaExceeded):
+    logger.error(f"QuotaExceeded: {str(e)}")
+    return get_response(
+        message="NewsAPI request budget exhausted, try again later",
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        error=True,
+        code="NEWS_QUOTA_EXCEEDED",
+        headers={"Retry-After": str(math.ceil(e.retry_after))},
+    )
+
+
+async def _forward(
+    request: Request,
+    path: str,
+    params: dict,
+    message: str,
+    code: str,
+):
+    """
+    Wrap an upstream body in the envelope without decoding it: from the cache
+    when the endpoint has a TTL, otherwise streamed through as it arrives.
+    Cached bodies carry an ETag and answer a matching If-None-Match with 304;
+    clients may reuse them for as long as the cache TTL.
+    """
+    ttl = upstream.CACHE_TTLS.get(path, 0)
+    if ttl > 0:
+        cache_control = private_cache_control(ttl)
+        payload = await upstream.fetch_cached(path, params)
+        encoding = None
+        if len(payload.body) >= settings.COMPRESSION_MIN_SIZE:
+            encoding = negotiate(request.headers.get("accept-encoding"))
+        etag = payload.etag if encoding is None else weaken_etag(payload.etag)
+        # Clients send back the weak tag; etag_matches strips W/ from theirs only
+        if etag_matches(request, payload.etag):
+            return get_not_modified_response(etag, cache_control)
+        headers = validator_headers(etag, cache_control)
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+            headers["Vary"] = "Accept-Encoding"
+        return EnvelopeResponse(
+            content=payload.envelope(envelope_prefix(message, False, code), encoding),
+            status_code=status.HTTP_200_OK,
+            headers=headers,
+        )
+    chunks = await upstream.stream(path, params)
+    return get_stream_response(
+        message=message,
+        chunks=chunks,
+        status=status.HTTP_200_OK,
+        error=False,
+        code=code,
+    )
 
 
 @router.get("/")
-def get_news(
+async def get_news(
+    request: Request,
     q: str = Query(default="apple", description="Search term for the news"),
     page=None,
     page_size=None,
     from_date: date = Query(default=date.today(), alias="from"),
     to_date: date = Query(default=date.today(), alias="to"),
+    read_through: bool = Query(
+        default=False,
+        description="Answer days already ingested from the database and fetch "
+        "only the missing days from the News API",
+    ),
+    session_factory=Depends(get_session_factory),
 ):
     """
     Get news articles from the News API.
     """
+    if read_through:
+        return await _get_news_read_through(session_factory, q, from_date, to_date)
+
     params = {
         "q": q,
         "sortBy": "popularity",
         "from": from_date.isoformat(),
         "to": to_date.isoformat(),
-        "apiKey": settings.API_KEY,
     }
 
     if page:
@@ -41,17 +149,60 @@ def get_news(
         params["pageSize"] = int(page_size)
 
     try:
-        response = requests.get(NEWS_API_URL_EVERYTHING, params=params)
-        response.raise_for_status()
+        return await _forward(
+            request,
+            NEWS_API_URL_EVERYTHING,
+            params,
+            message="News articles fetched successfully",
+            code="NEWS_FETCHED",
+        )
+    except upstream.QuotaExceeded as e:
+        return _quota_exceeded_response(e)
+    except upstream.UpstreamError as e:
+        logger.error(f"UpstreamError: {str(e)}")
+        return get_response(
+            data={},
+            message="Failed to fetch news articles",
+            status=status.HTTP_400_BAD_REQUEST,
+            error=True,
+            code="NEWS_FETCH_FAILED",
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        return get_response(
+            data={},
+            message="An unexpected error occurred",
+            status=status.HTTP_400_BAD_REQUEST,
+            error=True,
+            code="UNEXPECTED_ERROR",
+        )
+
+
+async def _get_news_read_through(session_factory, q: str, from_date: date, to_date: date):
+    days = (to_date - from_date).days + 1
+    if not 1 <= days <= settings.NEWS_READ_THROUGH_MAX_DAYS:
+        return get_response(
+            message=f"Date range must cover 1 to "
+            f"{settings.NEWS_READ_THROUGH_MAX_DAYS} days",
+            status=status.HTTP_400_BAD_REQUEST,
+            error=True,
+            code="INVALID_DATE_RANGE",
+        )
+    # Opened here rather than as a dependency, so plain GET /news/ stays off the
+    # threadpool
+    db = session_factory()
+    try:
         return get_response(
-            data=response.json(),
+            data=await read_through(db, q, from_date, to_date),
             message="News articles fetched successfully",
             status=status.HTTP_200_OK,
             error=False,
             code="NEWS_FETCHED",
         )
-    except requests.exceptions.RequestException as e:
-        logger.error(f"RequestException: {str(e)}")
+    except upstream.QuotaExceeded as e:
+        return _quota_exceeded_response(e)
+    except upstream.UpstreamError as e:
+        logger.error(f"UpstreamError: {str(e)}")
         return get_response(
             data={},
             message="Failed to fetch news articles",
@@ -59,6 +210,15 @@ def get_news(
             error=True,
             code="NEWS_FETCH_FAILED",
         )
+    except SQLAlchemyError as e:
+        logger.error(f"SQLAlchemyError: {str(e)}")
+        db.rollback()
+        return get_response(
+            message="Database error occurred",
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error=True,
+            code="DB_ERROR",
+        )
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         return get_response(
@@ -68,22 +228,28 @@ def get_news(
             error=True,
             code="UNEXPECTED_ERROR",
         )
+    finally:
+        await run_in_threadpool(db.close)
 
 
 @router.post("/save-latest")
-def save_latest_news(db: Session = Depends(get_db)):
-    url = NEWS_API_URL_EVERYTHING
+async def save_latest_news(
+    q: Optional[str] = Query(default=None, description="Defaults to NEWS_INGEST_QUERY"),
+    batch_size: Optional[int] = Query(
+        default=None, ge=1, le=100, description="Defaults to NEWS_INGEST_BATCH_SIZE"
+    ),
+    db: Session = Depends(get_db),
+):
+    batch_size = batch_size or settings.NEWS_INGEST_BATCH_SIZE
     params = {
-        "q": "apple",
+        "q": q or settings.NEWS_INGEST_QUERY,
         "sortBy": "publishedAt",
-        "pageSize": 3,  # Only fetch top 3
-        "apiKey": settings.API_KEY,
+        "pageSize": batch_size,
     }
 
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        articles = response.json().get("articles", [])[:3]
+        payload = await upstream.fetch(NEWS_API_URL_EVERYTHING, params, INGESTION)
+        articles = payload.data.get("articles", [])[:batch_size]
 
         if not articles:
             logger.error("No articles found")
@@ -91,41 +257,28 @@ def save_latest_news(db: Session = Depends(get_db)):
                 status_code=status.HTTP_404_NOT_FOUND, detail="No articles found"
             )
 
-        saved_articles = []
-
-        with db.begin():
-            for article in articles:
-                existing = db.query(News).filter(News.url == article["url"]).first()
-                if existing:
-                    continue
-                news = News(
-                    title=article.get("title"),
-                    description=article.get("description"),
-                    url=article.get("url"),
-                    published_at=datetime.fromisoformat(
-                        article.get("publishedAt").replace("Z", "+00:00")
-                    ),
-                )
-                db.add(news)
-                saved_articles.append(news)
+        # The session is synchronous, so keep it off the event loop
+        saved_articles = await run_in_threadpool(save_articles, db, articles)
 
         return get_response(
-            message="Top 3 articles saved successfully",
+            message=f"Top {batch_size} articles saved successfully",
             status=status.HTTP_200_OK,
             error=False,
             code="ARTICLES_SAVED",
             data=[
                 {
-                    "title": a.title,
-                    "url": a.url,
-                    "published_at": a.published_at.isoformat(),
+                    "title": a["title"],
+                    "url": a["url"],
+                    "published_at": a["published_at"],
                 }
                 for a in saved_articles
             ],
         )
 
-    except requests.exceptions.RequestException as e:
-        logger.error(f"RequestException: {str(e)}")
+    except upstream.QuotaExceeded as e:
+        return _quota_exceeded_response(e)
+    except upstream.UpstreamError as e:
+        logger.error(f"UpstreamError: {str(e)}")
         raise HTTPException(status_code=400, detail="Failed to fetch news")
     except SQLAlchemyError as e:
         logger.error(f"SQLAlchemyError: {str(e)}")
@@ -147,14 +300,59 @@ def save_latest_news(db: Session = Depends(get_db)):
         )
 
 
+def _all_news_etag(db: Session, *page_params) -> str:
+    # New rows raise max(id) and newer articles raise max(published_at); both are
+    # index lookups, so this stays cheap however large the table is
+    latest = db.execute(select(func.max(News.published_at), func.max(News.id))).one()
+    return make_etag(tuple(latest), page_params)
+
+
 @router.get("/all")
-def get_all_news(page: int = 1, page_size: int = 10, db: Session = Depends(get_db)):
+def get_all_news(
+    request: Request,
+    page: int = Query(default=1, ge=1),
+    page_size: int = Query(default=10, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Keyset pagination: pass an empty value for the first page, "
+        "then the returned next_cursor",
+    ),
+    fields: Optional[str] = Query(
+        default=None,
+        description="Comma-separated article fields to return, e.g. id,title,url; "
+        "defaults to all of " + ",".join(LISTING_COLUMNS),
+    ),
+    db: Session = Depends(get_db),
+):
     try:
+        names = parse_fields(fields)
+        etag = _all_news_etag(db, page, page_size, cursor, names)
+        if etag_matches(request, etag):
+            return get_not_modified_response(etag, CACHE_CONTROL_ALL_NEWS)
+        headers = validator_headers(etag, CACHE_CONTROL_ALL_NEWS)
+
+        # Plain row tuples of the needed columns: no ORM instances to build
+        columns = listing_columns(names)
+        if cursor is not None:
+            rows, next_cursor = keyset_page(db.query(*columns), cursor, page_size)
+            return get_response(
+                message="Fetched news articles successfully",
+                status=status.HTTP_200_OK,
+                error=False,
+                code="ALL_NEWS_FETCHED",
+                headers=headers,
+                data={
+                    "page_size": page_size,
+                    "next_cursor": next_cursor,
+                    "articles": project(names, rows),
+                },
+            )
+
         offset = (page - 1) * page_size
-        total = db.query(News).count()
-        news_list = (
-            db.query(News)
-            .order_by(News.published_at.desc())
+        total = db.query(func.count(News.id)).scalar()
+        rows = (
+            db.query(*columns)
+            .order_by(News.published_at.desc(), News.id.desc())
             .offset(offset)
             .limit(page_size)
             .all()
@@ -165,22 +363,30 @@ def get_all_news(page: int = 1, page_size: int = 10, db: Session = Depends(get_d
             status=status.HTTP_200_OK,
             error=False,
             code="ALL_NEWS_FETCHED",
+            headers=headers,
             data={
                 "total": total,
                 "page": page,
                 "page_size": page_size,
-                "articles": [
-                    {
-                        "id": news.id,
-                        "title": news.title,
-                        "description": news.description,
-                        "url": news.url,
-                        "published_at": news.published_at.isoformat(),
-                    }
-                    for news in news_list
-                ],
+                "articles": project(names, rows),
             },
         )
+    except InvalidCursor as e:
+        logger.error(f"InvalidCursor: {str(e)}")
+        return get_response(
+            message="Invalid cursor",
+            status=status.HTTP_400_BAD_REQUEST,
+            error=True,
+            code="INVALID_CURSOR",
+        )
+    except InvalidFields as e:
+        logger.error(f"InvalidFields: {str(e)}")
+        return get_response(
+            message=str(e),
+            status=status.HTTP_400_BAD_REQUEST,
+            error=True,
+            code="INVALID_FIELDS",
+        )
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         return get_response(
@@ -191,28 +397,193 @@ def get_all_news(page: int = 1, page_size: int = 10, db: Session = Depends(get_d
         )
 
 
+@router.get("/search")
+async def search_stored_news(
+    q: str = Query(..., min_length=1, description="Full-text query"),
+    page_size: int = Query(default=10, ge=1, le=100),
+    cursor: str = Query(default="", description="next_cursor of the previous page"),
+    db=Depends(get_read_db),
+):
+    """
+    Search articles stored in the database by title and description.
+    """
+    try:
+        if isinstance(db, Session):
+            articles, next_cursor = await run_in_threadpool(
+                search_news, db, q, cursor, page_size
+            )
+        else:
+            articles, next_cursor = await search_news_async(db, q, cursor, page_size)
+        return get_response(
+            message="Search results fetched successfully",
+            status=status.HTTP_200_OK,
+            error=False,
+            code="SEARCH_RESULTS_FETCHED",
+            data={
+                "page_size": page_size,
+                "next_cursor": next_cursor,
+                "articles": articles,
+            },
+        )
+    except InvalidQuery as e:
+        logger.error(f"InvalidQuery: {str(e)}")
+        return get_response(
+            message=str(e),
+            status=status.HTTP_400_BAD_REQUEST,
+            error=True,
+            code="INVALID_QUERY",
+        )
+    except InvalidCursor as e:
+        logger.error(f"InvalidCursor: {str(e)}")
+        return get_response(
+            message="Invalid cursor",
+            status=status.HTTP_400_BAD_REQUEST,
+            error=True,
+            code="INVALID_CURSOR",
+        )
+    except SQLAlchemyError as e:
+        logger.error(f"SQLAlchemyError: {str(e)}")
+        return get_response(
+            message="Database error occurred",
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error=True,
+            code="DB_ERROR",
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        return get_response(
+            message="An unexpected error occurred",
+            status=status.HTTP_400_BAD_REQUEST,
+            error=True,
+            code="UNEXPECTED_ERROR",
+        )
+
+
+@router.get("/export")
+async def export_news(
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+    from_time: Optional[datetime] = Query(
+        default=None, alias="from", description="Earliest published_at, inclusive"
+    ),
+    to_time: Optional[datetime] = Query(
+        default=None, alias="to", description="Latest published_at, exclusive"
+    ),
+    db: Session = Depends(get_db),
+):
+    """
+    Stream every stored article, or those published in [from, to), as NDJSON or CSV.
+    """
+    try:
+        chunks = await run_in_threadpool(
+            open_export,
+            db,
+            format,
+            from_time,
+            to_time,
+            settings.NEWS_EXPORT_BATCH_SIZE,
+        )
+    except SQLAlchemyError as e:
+        logger.error(f"SQLAlchemyError: {str(e)}")
+        return get_response(
+            message="Database error occurred",
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error=True,
+            code="DB_ERROR",
+        )
+
+    media_type = FORMATS[format][0]
+    return StreamingResponse(
+        iterate_export(chunks),
+        status_code=status.HTTP_200_OK,
+        headers={
+            **STATIC_HEADERS,
+            "Content-Type": media_type,
+            "Content-Disposition": f'attachment; filename="news.{format}"',
+        },
+    )
+
+
+@router.post("/batch")
+async def get_news_batch(
+    batch: BatchRequest,
+    stream: bool = Query(
+        default=False,
+        description="Stream one NDJSON line per query as soon as it completes",
+    ),
+    session_factory=Depends(get_session_factory),
+):
+    """
+    Resolve several NewsAPI and search queries concurrently. Each query gets its
+    own result with its index, code and data; a failing query does not fail
+    the others.
+    """
+    if len(batch.queries) > settings.NEWS_BATCH_MAX_ITEMS:
+        return get_response(
+            message=f"A batch can hold at most {settings.NEWS_BATCH_MAX_ITEMS} queries",
+            status=status.HTTP_400_BAD_REQUEST,
+            error=True,
+            code="BATCH_TOO_LARGE",
+        )
+
+    resolver = BatchResolver(session_factory, settings.NEWS_BATCH_CONCURRENCY)
+    if stream:
+        return StreamingResponse(
+            resolver.as_completed(batch.queries),
+            status_code=status.HTTP_200_OK,
+            headers={**STATIC_HEADERS, "Content-Type": "application/x-ndjson"},
+        )
+    try:
+        items = await resolver.resolve_all(batch.queries)
+    finally:
+        await resolver.close()
+    return EnvelopeResponse(
+        content=envelope_prefix("Batch resolved", False, "BATCH_RESOLVED")
+        + b"["
+        + b",".join(items)
+        + b"]"
+        + ENVELOPE_SUFFIX,
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Hit/miss/eviction counters of the upstream response cache.
+    """
+    return get_response(
+        message="Cache stats fetched successfully",
+        status=status.HTTP_200_OK,
+        error=False,
+        code="CACHE_STATS_FETCHED",
+        data={
+            **upstream.response_cache.stats(),
+            "coalesced": upstream.inflight.coalesced,
+        },
+    )
+
+
 @router.get("/headlines/country/{country_code}")
-def get_headlines_by_country(country_code: str, db: Session = Depends(get_db)):
+async def get_headlines_by_country(request: Request, country_code: str):
     """
     Get news articles from the News API.
     """
     params = {
         "country": country_code.lower(),
-        "apiKey": settings.API_KEY,
     }
 
     try:
-        response = requests.get(NEWS_API_TOP_HEADLINES, params=params)
-        response.raise_for_status()
-        return get_response(
-            data=response.json(),
+        return await _forward(
+            request,
+            NEWS_API_TOP_HEADLINES,
+            params,
             message=f"Top headlines for country: {country_code.lower()}",
-            status=status.HTTP_200_OK,
-            error=False,
             code="TOP_HEADLINES_FETCHED",
         )
-    except requests.exceptions.RequestException as e:
-        logger.error(f"RequestException: {str(e)}")
+    except upstream.QuotaExceeded as e:
+        return _quota_exceeded_response(e)
+    except upstream.UpstreamError as e:
+        logger.error(f"UpstreamError: {str(e)}")
         return get_response(
             message="Failed to fetch news articles",
             status=status.HTTP_400_BAD_REQUEST,
@@ -230,27 +601,26 @@ def get_headlines_by_country(country_code: str, db: Session = Depends(get_db)):
 
 
 @router.get("/headlines/source/{source_id}")
-def get_headlines_by_source(source_id: str, db: Session = Depends(get_db)):
+async def get_headlines_by_source(request: Request, source_id: str):
     """
     Get news articles from the News API.
     """
     params = {
         "sources": source_id.lower(),
-        "apiKey": settings.API_KEY,
     }
 
     try:
-        response = requests.get(NEWS_API_TOP_HEADLINES, params=params)
-        response.raise_for_status()
-        return get_response(
-            data=response.json(),
+        return await _forward(
+            request,
+            NEWS_API_TOP_HEADLINES,
+            params,
             message=f"Top headlines for source: {source_id.lower()}",
-            status=status.HTTP_200_OK,
-            error=False,
             code="TOP_HEADLINES_FETCHED",
         )
-    except requests.exceptions.RequestException as e:
-        logger.error(f"RequestException: {str(e)}")
+    except upstream.QuotaExceeded as e:
+        return _quota_exceeded_response(e)
+    except upstream.UpstreamError as e:
+        logger.error(f"UpstreamError: {str(e)}")
         return get_response(
             message="Failed to fetch news articles",
             status=status.HTTP_400_BAD_REQUEST,
@@ -268,28 +638,27 @@ def get_headlines_by_source(source_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/headlines/filter")
-def get_headlines_filter(source: str, country: str):
+async def get_headlines_filter(request: Request, source: str, country: str):
     """
     Get news articles from the News API.
     """
     params = {
         "source": source.lower(),
         "country": country.lower(),
-        "apiKey": settings.API_KEY,
     }
 
     try:
-        response = requests.get(NEWS_API_TOP_HEADLINES, params=params)
-        response.raise_for_status()
-        return get_response(
-            data=response.json(),
+        return await _forward(
+            request,
+            NEWS_API_TOP_HEADLINES,
+            params,
             message=f"Top headlines for country: {country.lower()}, source: {source.lower()}",
-            status=status.HTTP_200_OK,
-            error=False,
             code="TOP_HEADLINES_FETCHED",
         )
-    except requests.exceptions.RequestException as e:
-        logger.error(f"RequestException: {str(e)}")
+    except upstream.QuotaExceeded as e:
+        return _quota_exceeded_response(e)
+    except upstream.UpstreamError as e:
+        logger.error(f"UpstreamError: {str(e)}")
         return get_response(
             message="Failed to fetch news articles",
             status=status.HTTP_400_BAD_REQUEST,
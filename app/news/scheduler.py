@@ -0,0 +1,187 @@
+# app/news/scheduler.py
+import asyncio
+import random
+from datetime import datetime
+from typing import NamedTuple
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+from app.constants import NEWS_API_URL_EVERYTHING, NEWS_API_TOP_HEADLINES
+from app.logger import logger
+from app.models import FeedWatermark
+from app.news import upstream
+from app.news.ingest import parse_article, save_articles
+from app.news.quota import INGESTION
+
+
+class Feed(NamedTuple):
+    name: str
+    path: str
+    params: dict
+
+
+def configured_feeds() -> list:
+    feeds = [
+        Feed(f"q:{q}", NEWS_API_URL_EVERYTHING, {"q": q, "sortBy": "publishedAt"})
+        for q in settings.NEWS_SCHEDULER_QUERIES
+    ]
+    feeds += [
+        Feed(f"country:{c.lower()}", NEWS_API_TOP_HEADLINES, {"country": c.lower()})
+        for c in settings.NEWS_SCHEDULER_COUNTRIES
+    ]
+    feeds += [
+        Feed(f"sources:{s.lower()}", NEWS_API_TOP_HEADLINES, {"sources": s.lower()})
+        for s in settings.NEWS_SCHEDULER_SOURCES
+    ]
+    return feeds
+
+
+class IngestScheduler:
+    """
+    Periodically pulls each feed into News. Every feed runs on its own jittered
+    loop, at most `concurrency` pulls run at once, and each feed keeps a
+    high-watermark on publishedAt so a cycle only asks for newer articles.
+    """
+
+    def __init__(
+        self,
+        feeds: list,
+        session_factory,
+        interval: float = settings.NEWS_SCHEDULER_INTERVAL,
+        jitter: float = settings.NEWS_SCHEDULER_JITTER,
+        concurrency: int = settings.NEWS_SCHEDULER_CONCURRENCY,
+        page_size: int = settings.NEWS_SCHEDULER_PAGE_SIZE,
+        max_pages: int = settings.NEWS_SCHEDULER_MAX_PAGES,
+    ):
+        self.feeds = feeds
+        self.session_factory = session_factory
+        self.interval = interval
+        self.jitter = jitter
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks = []
+
+    def start(self):
+        self._tasks = [
+            asyncio.create_task(self._run_feed(feed), name=f"ingest {feed.name}")
+            for feed in self.feeds
+        ]
+        logger.info(f"Ingestion scheduler started with {len(self.feeds)} feeds")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Ingestion scheduler stopped")
+
+    async def _run_feed(self, feed: Feed):
+        # Spread the first pulls so feeds do not hit NewsAPI in lockstep
+        await asyncio.sleep(random.uniform(0, self.jitter))
+        while True:
+            try:
+                await self.ingest_feed(feed)
+            except Exception as e:
+                logger.error(f"Ingestion of {feed.name} failed: {str(e)}")
+            await asyncio.sleep(self.interval + random.uniform(0, self.jitter))
+
+    async def ingest_feed(self, feed: Feed) -> int:
+        """
+        Pull the articles of `feed` newer than its watermark. Pages are fetched
+        newest first until one reaches the watermark, so a burst of more than
+        `page_size` articles between cycles is not skipped; at most `max_pages`
+        pages per cycle. When they run out first, the range still missing is
+        kept as the feed's gap and later /everything cycles page through it,
+        from the oldest article fetched, until it is closed. Returns rows saved.
+        """
+        async with self._semaphore:
+            mark = await run_in_threadpool(self._load_watermark, feed.name)
+            watermark = mark.published_at if mark else None
+            gap = (mark.gap_from, mark.gap_to) if mark and mark.gap_from else None
+
+            articles, latest, oldest, complete = await self._fetch_pages(feed, watermark)
+            if not complete:
+                logger.warning(
+                    f"Ingestion of {feed.name} stopped after {self.max_pages} pages "
+                    f"without reaching {watermark.isoformat()}"
+                )
+                # top-headlines has no date filter to page through a gap with
+                if feed.path == NEWS_API_URL_EVERYTHING:
+                    gap = (gap[0] if gap else watermark, oldest)
+            elif gap is not None:
+                gap_articles, _, gap_oldest, closed = await self._fetch_pages(feed, *gap)
+                articles += gap_articles
+                gap = None if closed else (gap[0], gap_oldest)
+
+            if not articles and (mark is None or gap == (mark.gap_from, mark.gap_to)):
+                return 0
+            return await run_in_threadpool(
+                self._store, feed.name, articles, latest or watermark, gap
+            )
+
+    async def _fetch_pages(self, feed: Feed, since, until=None) -> tuple:
+        """
+        `(articles, newest, oldest, complete)` of `feed` published from `since`
+        up to `until`, newest first. `complete` is False when `max_pages` pages
+        were fetched without reaching `since`.
+        """
+        params = {**feed.params, "pageSize": self.page_size}
+        if since is not None and feed.path == NEWS_API_URL_EVERYTHING:
+            params["from"] = since.isoformat()
+            if until is not None:
+                params["to"] = until.isoformat()
+
+        articles = []
+        newest = oldest = None
+        # Without a watermark there is no gap to close; one page starts the feed
+        pages = 1 if since is None else self.max_pages
+        for page in range(1, pages + 1):
+            if page > 1:
+                params["page"] = page
+            payload = await upstream.fetch(feed.path, params, INGESTION)
+            page_articles = payload.data.get("articles", [])
+            reached = False
+            for article in page_articles:
+                row = parse_article(article)
+                if row is None:
+                    continue
+                published_at = row["published_at"].replace(tzinfo=None)
+                # `from` is inclusive and top-headlines has no date filter at
+                # all; equal timestamps are kept and left to the url dedup
+                if since is not None and published_at <= since:
+                    reached = True
+                    if published_at < since:
+                        continue
+                articles.append(article)
+                if newest is None or published_at > newest:
+                    newest = published_at
+                if oldest is None or published_at < oldest:
+                    oldest = published_at
+            if reached or len(page_articles) < self.page_size:
+                return articles, newest, oldest, True
+        return articles, newest, oldest, since is None
+
+    def _load_watermark(self, feed_name: str):
+        db = self.session_factory()
+        try:
+            row = db.get(FeedWatermark, feed_name)
+            if row is not None:
+                db.expunge(row)
+            return row
+        finally:
+            db.close()
+
+    def _store(self, feed_name: str, articles: list, latest: datetime, gap) -> int:
+        db = self.session_factory()
+        try:
+            saved = save_articles(db, articles)
+            gap_from, gap_to = gap or (None, None)
+            with db.begin():
+                db.merge(
+                    FeedWatermark(
+                        feed=feed_name, published_at=latest, gap_from=gap_from, gap_to=gap_to
+                    )
+                )
+            return len(saved)
+        finally:
+            db.close()
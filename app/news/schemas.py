@@ -0,0 +1,40 @@
+from datetime import date
+from typing import Annotated, List, Literal, Optional, Union
+from pydantic import BaseModel, Field, model_validator
+
+
+class EverythingQuery(BaseModel):
+    type: Literal["everything"]
+    q: str = "apple"
+    from_date: date = Field(default_factory=date.today, alias="from")
+    to_date: date = Field(default_factory=date.today, alias="to")
+    page: Optional[int] = Field(default=None, ge=1)
+    page_size: Optional[int] = Field(default=None, ge=1, le=100)
+
+
+class HeadlinesQuery(BaseModel):
+    type: Literal["headlines"]
+    country: Optional[str] = None
+    source: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_filter(self):
+        if not (self.country or self.source):
+            raise ValueError("country or source is required")
+        return self
+
+
+class SearchQuery(BaseModel):
+    type: Literal["search"]
+    q: str = Field(min_length=1)
+    page_size: int = Field(default=10, ge=1, le=100)
+    cursor: str = ""
+
+
+BatchQuery = Annotated[
+    Union[EverythingQuery, HeadlinesQuery, SearchQuery], Field(discriminator="type")
+]
+
+
+class BatchRequest(BaseModel):
+    queries: List[BatchQuery] = Field(min_length=1)
@@ -0,0 +1,83 @@
+# app/news/search.py
+from sqlalchemy import DateTime, Float, text
+from sqlalchemy.orm import Session
+from app.news.pagination import decode_search_cursor, encode_search_cursor
+
+# Both dialects rank in a derived table so the keyset filter can use the score.
+# Higher score is more relevant; ties are broken by id.
+_RANKED = {
+    "sqlite": (
+        "SELECT news.id, news.title, news.description, news.url, "
+        "news.published_at, -bm25(news_fts) AS score "
+        "FROM news_fts JOIN news ON news.id = news_fts.rowid "
+        "WHERE news_fts MATCH :query"
+    ),
+    "mysql": (
+        "SELECT id, title, description, url, published_at, "
+        "MATCH(title, description) AGAINST (:query IN NATURAL LANGUAGE MODE) AS score "
+        "FROM news "
+        "WHERE MATCH(title, description) AGAINST (:query IN NATURAL LANGUAGE MODE)"
+    ),
+}
+
+
+class InvalidQuery(ValueError):
+    pass
+
+
+def _fts5_query(query: str) -> str:
+    # Quote every term so user input is never parsed as FTS5 syntax
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def _search_statement(dialect: str, query: str, cursor: str, page_size: int):
+    # A blank query would reach FTS5 as an empty MATCH, which is a syntax error
+    if not query.split():
+        raise InvalidQuery("Search query has no words")
+    if dialect not in _RANKED:
+        raise ValueError(f"Full-text search is not supported on {dialect}")
+
+    params = {
+        "query": _fts5_query(query) if dialect == "sqlite" else query,
+        "limit": page_size + 1,
+    }
+    where = ""
+    position = decode_search_cursor(cursor)
+    if position is not None:
+        params["score"], params["id"] = position
+        where = "WHERE score < :score OR (score = :score AND id > :id) "
+
+    stmt = text(
+        f"SELECT * FROM ({_RANKED[dialect]}) AS ranked {where}"
+        "ORDER BY score DESC, id ASC LIMIT :limit"
+    ).columns(published_at=DateTime, score=Float)
+    return stmt, params
+
+
+def _search_page(result, page_size: int):
+    rows = [dict(row) for row in result.mappings()]
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_search_cursor(rows[-1]["score"], rows[-1]["id"])
+
+
+def search_news(db: Session, query: str, cursor: str, page_size: int):
+    """
+    Full-text search over News title and description, most relevant first.
+    Returns `(rows, next_cursor)` with keyset pagination on `(score, id)`.
+    """
+    stmt, params = _search_statement(
+        db.get_bind().dialect.name, query, cursor, page_size
+    )
+    return _search_page(db.execute(stmt, params), page_size)
+
+
+async def search_news_async(db, query: str, cursor: str, page_size: int):
+    """
+    `search_news` on an AsyncSession.
+    """
+    stmt, params = _search_statement(
+        db.get_bind().dialect.name, query, cursor, page_size
+    )
+    return _search_page(await db.execute(stmt, params), page_size)
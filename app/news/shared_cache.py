@@ -0,0 +1,365 @@
+# app/news/shared_cache.py
+import asyncio
+import os
+import sqlite3
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, time
+from typing import NamedTuple, Optional
+from app.logger import logger
+
+# Seconds between checks while another worker is fetching the same key
+POLL_INTERVAL = 0.05
+
+_HEADER = struct.Struct("!dd")
+
+
+class Entry(NamedTuple):
+    """
+    A shared cache value with its wall-clock freshness bounds; workers do not
+    share a monotonic clock.
+    """
+
+    value: object
+    fresh_until: float
+    stale_until: float
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.fresh_until
+
+    def is_usable(self, now: float) -> bool:
+        return now < self.stale_until
+
+
+class SQLiteBackend:
+    """
+    Cache table in a SQLite database in WAL mode, shared by every worker on the
+    host. Calls run on one dedicated thread per worker, so a slow write never
+    blocks the event loop or takes a slot from the request threadpool. Once the
+    stored values exceed `max_bytes`, the entries that expire soonest go first.
+    """
+
+    def __init__(self, path: str, max_bytes: int, busy_timeout: float = 5.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.busy_timeout = busy_timeout
+        self.evictions = 0
+        self._db = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="news-cache")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS news_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, fresh_until REAL NOT NULL, "
+                "stale_until REAL NOT NULL, expires_at REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS news_cache_expires_at ON news_cache (expires_at)"
+            )
+            self._db = db
+        return self._db
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _get(self, key: str) -> Optional[Entry]:
+        row = (
+            self._connect()
+            .execute(
+                "SELECT value, fresh_until, stale_until FROM news_cache "
+                "WHERE key = ? AND expires_at > ?",
+                (key, time()),
+            )
+            .fetchone()
+        )
+        return None if row is None else Entry(*row)
+
+    def _set(self, key: str, entry: Entry, expires_at: float):
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            value, fresh_until, stale_until = entry
+            db.execute(
+                "INSERT OR REPLACE INTO news_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value, fresh_until, stale_until, expires_at, len(value)),
+            )
+            self._evict(db)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _evict(self, db: sqlite3.Connection):
+        evicted = db.execute(
+            "DELETE FROM news_cache WHERE expires_at <= ?", (time(),)
+        ).rowcount
+        (total,) = db.execute("SELECT total(size) FROM news_cache").fetchone()
+        if total > self.max_bytes:
+            # Keep the longest-lived entries that fit in the budget
+            evicted += db.execute(
+                "DELETE FROM news_cache WHERE key IN (SELECT key FROM ("
+                "SELECT key, sum(size) OVER (ORDER BY expires_at DESC, key) AS kept "
+                "FROM news_cache) WHERE kept > ?)",
+                (self.max_bytes,),
+            ).rowcount
+        self.evictions += evicted
+
+    def _get_or_set(self, key: str, value: bytes, ttl: float) -> bytes:
+        db = self._connect()
+        now = time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute(
+                "SELECT value FROM news_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                db.execute(
+                    "INSERT OR REPLACE INTO news_cache VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, value, now + ttl, now + ttl, now + ttl, len(value)),
+                )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return value if row is None else row[0]
+
+    def _exists(self, key: str) -> bool:
+        row = (
+            self._connect()
+            .execute(
+                "SELECT 1 FROM news_cache WHERE key = ? AND expires_at > ?",
+                (key, time()),
+            )
+            .fetchone()
+        )
+        return row is not None
+
+    def _delete(self, key: str):
+        self._connect().execute("DELETE FROM news_cache WHERE key = ?", (key,))
+
+    async def get(self, key: str) -> Optional[Entry]:
+        return await self._run(self._get, key)
+
+    async def set(self, key: str, entry: Entry, expires_at: float):
+        await self._run(self._set, key, entry, expires_at)
+
+    async def get_or_set(self, key: str, value: bytes, ttl: float) -> bytes:
+        """
+        Store `value` for `ttl` seconds unless the key holds a live value, and
+        return whichever value the key holds afterwards.
+        """
+        return await self._run(self._get_or_set, key, value, ttl)
+
+    async def exists(self, key: str) -> bool:
+        return await self._run(self._exists, key)
+
+    async def delete(self, key: str):
+        await self._run(self._delete, key)
+
+    async def close(self):
+        if self._db is not None:
+            await self._run(self._db.close)
+            self._db = None
+        self._executor.shutdown(wait=False)
+
+
+class RedisBackend:
+    """
+    Cache entries as Redis strings with the freshness bounds packed in front of
+    the value. `client` is a `redis.asyncio` client or anything with the same
+    get/set/exists/delete coroutines. Keys get Redis TTLs; bound the size with the
+    server's `maxmemory` and an LRU policy.
+    """
+
+    def __init__(self, client, prefix: str = "news-cache:"):
+        self.client = client
+        self.prefix = prefix
+        self.evictions = 0
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        # Optional dependency, only needed with NEWS_CACHE_BACKEND=redis
+        import redis.asyncio
+
+        return cls(redis.asyncio.from_url(url))
+
+    async def get(self, key: str) -> Optional[Entry]:
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        fresh_until, stale_until = _HEADER.unpack_from(raw)
+        return Entry(raw[_HEADER.size:], fresh_until, stale_until)
+
+    async def set(self, key: str, entry: Entry, expires_at: float):
+        raw = _HEADER.pack(entry.fresh_until, entry.stale_until) + entry.value
+        await self.client.set(self.prefix + key, raw, px=_millis(expires_at - time()))
+
+    async def get_or_set(self, key: str, value: bytes, ttl: float) -> bytes:
+        for _ in range(2):
+            if await self.client.set(self.prefix + key, value, nx=True, px=_millis(ttl)):
+                return value
+            current = await self.client.get(self.prefix + key)
+            if current is not None:
+                return current
+            # Expired between the two commands; try to claim it again
+        return value
+
+    async def exists(self, key: str) -> bool:
+        return bool(await self.client.exists(self.prefix + key))
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    async def close(self):
+        close = getattr(self.client, "aclose", None) or self.client.close
+        await close()
+
+
+def _millis(seconds: float) -> int:
+    return max(int(seconds * 1000), 1)
+
+
+class SharedCache:
+    """
+    Cache layer shared by the workers of a deployment through `backend`.
+
+    A miss takes a short lease on the key so only one worker fetches it while
+    the others wait for the result, for at most `lease_seconds`. Entries are
+    fresh for their TTL, usable while stale for `stale_ttl` more seconds and
+    kept for `retain` seconds after that, for `peek`. Backend errors are logged
+    and treated as misses: the shared cache never fails a request on its own.
+    """
+
+    def __init__(
+        self,
+        backend,
+        stale_ttl: float,
+        retain: float,
+        lease_seconds: float,
+        encode=bytes,
+        decode=bytes,
+    ):
+        self.backend = backend
+        self.stale_ttl = stale_ttl
+        self.retain = retain
+        self.lease_seconds = lease_seconds
+        self.encode = encode
+        self.decode = decode
+        self._owner = f"{os.getpid()}:{id(self)}".encode()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.errors = 0
+
+    async def _call(self, method: str, *args):
+        try:
+            return await getattr(self.backend, method)(*args)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Shared cache {method} failed: {str(e)}")
+            return None
+
+    async def lookup(self, key: str) -> Optional[Entry]:
+        entry = await self._call("get", key)
+        if entry is None:
+            return None
+        return entry._replace(value=self.decode(entry.value))
+
+    async def peek(self, key: str):
+        """
+        Return the stored value however old it is, or None.
+        """
+        entry = await self.lookup(key)
+        return None if entry is None else entry.value
+
+    async def store(self, key: str, value, ttl: float) -> Entry:
+        now = time()
+        entry = Entry(value, now + ttl, now + ttl + self.stale_ttl)
+        await self._call(
+            "set",
+            key,
+            entry._replace(value=self.encode(value)),
+            entry.stale_until + self.retain,
+        )
+        return entry
+
+    async def get_or_fetch(self, key: str, ttl: float, fetch, accept_stale=True) -> Entry:
+        """
+        Return the shared entry for `key`, calling the `fetch` coroutine function
+        when there is none, or only a stale one and `accept_stale` is false.
+        """
+        entry = await self.lookup(key)
+        if entry is not None:
+            usable = entry.is_usable if accept_stale else entry.is_fresh
+            if usable(time()):
+                self.hits += 1
+                return entry
+        self.misses += 1
+
+        lease = f"lease:{key}"
+        owner = await self._call("get_or_set", lease, self._owner, self.lease_seconds)
+        if owner is not None and owner != self._owner:
+            # Another worker is fetching this key; wait for its result
+            self.waits += 1
+            deadline = monotonic() + self.lease_seconds
+            while monotonic() < deadline:
+                await asyncio.sleep(POLL_INTERVAL)
+                entry = await self.lookup(key)
+                if entry is not None and entry.is_fresh(time()):
+                    return entry
+                if not await self._call("exists", lease):
+                    break  # the fetch failed or the lease ran out
+
+        try:
+            return await self.store(key, await fetch(), ttl)
+        finally:
+            if owner == self._owner:
+                await self._call("delete", lease)
+
+    def stats(self) -> dict:
+        return {
+            "shared_hits": self.hits,
+            "shared_misses": self.misses,
+            "shared_waits": self.waits,
+            "shared_errors": self.errors,
+            "shared_evictions": self.backend.evictions,
+        }
+
+    async def close(self):
+        await self._call("close")
+
+
+def create_shared_cache(settings, encode=bytes, decode=bytes) -> Optional[SharedCache]:
+    """
+    The shared cache configured by NEWS_CACHE_BACKEND, or None for "memory".
+    """
+    kind = settings.NEWS_CACHE_BACKEND
+    if kind == "memory":
+        return None
+    if kind == "sqlite":
+        backend = SQLiteBackend(
+            settings.NEWS_CACHE_SQLITE_PATH, settings.NEWS_CACHE_MAX_BYTES
+        )
+    elif kind == "redis":
+        backend = RedisBackend.from_url(settings.NEWS_CACHE_REDIS_URL)
+    else:
+        raise ValueError(f"Unknown NEWS_CACHE_BACKEND {kind!r}")
+    return SharedCache(
+        backend,
+        stale_ttl=settings.NEWS_CACHE_STALE_TTL,
+        retain=settings.NEWS_CACHE_SHARED_RETAIN,
+        lease_seconds=settings.NEWS_API_DEADLINE,
+        encode=encode,
+        decode=decode,
+    )
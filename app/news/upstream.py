@@ -0,0 +1,369 @@
+# app/news/upstream.py
+import asyncio
+import hashlib
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+import httpx
+from app import metrics
+from app.compression import compress
+from app.config import settings
+from app.constants import NEWS_API_URL_EVERYTHING, NEWS_API_TOP_HEADLINES
+from app.global_utils import ENVELOPE_SUFFIX
+from app.news.breaker import CircuitBreaker
+from app.news.cache import ResponseCache, make_key
+from app.news.quota import INTERACTIVE, WARMUP, QuotaManager, parse_retry_after
+from app.news.shared_cache import create_shared_cache
+from app.news.singleflight import SingleFlight
+
+_client = None
+
+response_cache = ResponseCache(
+    max_entries=settings.NEWS_CACHE_MAX_ENTRIES,
+    stale_ttl=settings.NEWS_CACHE_STALE_TTL,
+)
+inflight = SingleFlight()
+quota = QuotaManager(
+    limits=[
+        (settings.NEWS_QUOTA_PER_DAY, 86400),
+        (settings.NEWS_QUOTA_PER_MINUTE, 60),
+    ],
+    reserves={
+        INTERACTIVE: settings.NEWS_QUOTA_RESERVE_INTERACTIVE,
+        WARMUP: settings.NEWS_QUOTA_RESERVE_WARMUP,
+    },
+)
+
+
+def new_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_rate=settings.NEWS_BREAKER_FAILURE_RATE,
+        min_calls=settings.NEWS_BREAKER_MIN_CALLS,
+        window=settings.NEWS_BREAKER_WINDOW,
+        open_seconds=settings.NEWS_BREAKER_OPEN_SECONDS,
+        probes=settings.NEWS_BREAKER_PROBES,
+    )
+
+
+# One circuit per NewsAPI endpoint
+breakers = {
+    path: new_breaker() for path in (NEWS_API_URL_EVERYTHING, NEWS_API_TOP_HEADLINES)
+}
+
+# Loop time by which every NewsAPI call of the current request must be done
+_request_deadline = ContextVar("newsapi_request_deadline", default=None)
+
+CACHE_TTLS = {
+    NEWS_API_URL_EVERYTHING: settings.NEWS_CACHE_TTL_EVERYTHING,
+    NEWS_API_TOP_HEADLINES: settings.NEWS_CACHE_TTL_HEADLINES,
+}
+
+
+class UpstreamError(Exception):
+    """Raised when a NewsAPI call fails: transport error, timeout or non-2xx status."""
+
+    reason = "invalid_response"
+
+
+class QuotaExceeded(UpstreamError):
+    """
+    Raised instead of calling NewsAPI when the request budget for the caller's
+    priority is spent, or while a 429 from NewsAPI is being honored.
+    """
+
+    reason = "quota"
+
+    def __init__(self, retry_after: float, reason: str = "quota"):
+        super().__init__(f"NewsAPI quota exhausted, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class CircuitOpen(UpstreamError):
+    """Raised without calling NewsAPI while the endpoint's circuit is open."""
+
+    reason = "circuit_open"
+
+
+class DeadlineExceeded(UpstreamError):
+    """Raised when a call runs past its own or the request's deadline."""
+
+    reason = "deadline"
+
+
+class Payload:
+    """
+    A successful NewsAPI body. Keeps the raw bytes and decodes them at most once.
+    Cached instances are shared between requests, so treat `data` as read-only.
+    """
+
+    __slots__ = ("body", "_data", "_etag", "_encoded")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self._data = None
+        self._etag = None
+        self._encoded = {}
+
+    @property
+    def etag(self) -> str:
+        if self._etag is None:
+            digest = hashlib.blake2b(self.body, digest_size=16).hexdigest()
+            self._etag = f'"{digest}"'
+        return self._etag
+
+    def envelope(self, prefix: bytes, encoding=None) -> bytes:
+        """
+        The response envelope around this body, optionally compressed. Compressed
+        variants are kept, so a cached payload is compressed once per encoding
+        rather than on every hit.
+        """
+        if encoding is None:
+            return prefix + self.body + ENVELOPE_SUFFIX
+        key = (prefix, encoding)
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            encoded = compress(prefix + self.body + ENVELOPE_SUFFIX, encoding)
+            self._encoded[key] = encoded
+        return encoded
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = json.loads(self.body)
+        return self._data
+
+
+def create_client(transport=None) -> httpx.AsyncClient:
+    """
+    Build the pooled NewsAPI client. `transport` is only passed by tests.
+    """
+    return httpx.AsyncClient(
+        base_url=settings.NEWS_API_BASE_URL,
+        limits=httpx.Limits(
+            max_connections=settings.NEWS_API_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.NEWS_API_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.NEWS_API_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            settings.NEWS_API_READ_TIMEOUT, connect=settings.NEWS_API_CONNECT_TIMEOUT
+        ),
+        transport=transport,
+    )
+
+
+async def start_cache():
+    """
+    Attach the shared cache configured by NEWS_CACHE_BACKEND, if any.
+    """
+    if response_cache.shared is None:
+        response_cache.shared = create_shared_cache(
+            settings, encode=lambda payload: payload.body, decode=Payload
+        )
+
+
+async def start_client(transport=None):
+    global _client
+    if _client is None:
+        _client = create_client(transport)
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    if _client is None:
+        raise RuntimeError("NewsAPI client has not been started")
+    return _client
+
+
+@contextmanager
+def deadline(seconds: float):
+    """
+    Cap the total time spent on NewsAPI calls made inside the block.
+    """
+    token = _request_deadline.set(asyncio.get_running_loop().time() + seconds)
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+def _call_deadline() -> float:
+    when = asyncio.get_running_loop().time() + settings.NEWS_API_DEADLINE
+    shared = _request_deadline.get()
+    return when if shared is None else min(when, shared)
+
+
+def _admit(path: str, priority: str, when: float) -> CircuitBreaker:
+    """
+    Let a call through or raise. The breaker goes first, so calls refused by an
+    open circuit spend no budget.
+    """
+    breaker = breakers.get(path)
+    if breaker is None:
+        breaker = breakers[path] = new_breaker()
+    try:
+        if when <= asyncio.get_running_loop().time():
+            raise DeadlineExceeded("Request deadline already passed")
+        wait = breaker.allow()
+        if wait:
+            raise CircuitOpen(f"Circuit for {path} is open, retry in {wait:.0f}s")
+        wait = quota.try_acquire(priority)
+        if wait:
+            breaker.record(None)
+            raise QuotaExceeded(wait)
+    except UpstreamError as e:
+        metrics.record_upstream_error(path, e)
+        raise
+    return breaker
+
+
+def _failure(path: str, breaker: CircuitBreaker, error: Exception) -> UpstreamError:
+    """
+    Record a failed call in the metrics and the endpoint's breaker, and return
+    the UpstreamError to raise for it. Transport errors, timeouts, 5xx and
+    malformed responses count against the endpoint; 4xx and 429 do not.
+    """
+    if isinstance(error, TimeoutError):
+        error = DeadlineExceeded("NewsAPI call ran past its deadline")
+    metrics.record_upstream_error(path, error)
+    if isinstance(error, QuotaExceeded):
+        breaker.record(None)
+    elif isinstance(error, httpx.HTTPStatusError):
+        breaker.record(error.response.status_code < 500)
+    else:
+        breaker.record(False)
+    return error if isinstance(error, UpstreamError) else UpstreamError(str(error))
+
+
+def _check(response: httpx.Response):
+    if response.status_code == 429:
+        retry_after = parse_retry_after(response.headers.get("retry-after"))
+        quota.block(retry_after)
+        raise QuotaExceeded(retry_after, reason="rate_limited")
+    response.raise_for_status()
+    content_type = response.headers.get("content-type", "")
+    if not content_type.startswith("application/json"):
+        # The body is forwarded verbatim, so it has to be JSON
+        raise UpstreamError(f"Unexpected content type {content_type!r}")
+
+
+def _observe(path: str, started: float, response: httpx.Response):
+    metrics.newsapi_request_duration.labels(path).observe(time.perf_counter() - started)
+    metrics.newsapi_responses.labels(path, response.status_code).inc()
+
+
+_FAILURES = (httpx.HTTPError, UpstreamError, TimeoutError)
+
+
+async def fetch(path: str, params: dict, priority: str = INTERACTIVE) -> Payload:
+    """
+    GET a NewsAPI endpoint through the shared client, bypassing the cache.
+    The API key is added here so callers never handle it. The whole call,
+    body included, has to finish within the deadline.
+    """
+    when = _call_deadline()
+    breaker = _admit(path, priority, when)
+    started = time.perf_counter()
+    try:
+        async with asyncio.timeout_at(when):
+            response = await get_client().get(
+                path, params={**params, "apiKey": settings.API_KEY}
+            )
+        _observe(path, started, response)
+        _check(response)
+    except _FAILURES as e:
+        error = _failure(path, breaker, e)
+        if error is e:
+            raise
+        raise error from e
+    except asyncio.CancelledError:
+        breaker.record(None)
+        raise
+    breaker.record(True)
+    return Payload(response.content)
+
+
+async def stream(path: str, params: dict, priority: str = INTERACTIVE):
+    """
+    Open a streamed GET and return an async iterator over the decoded body chunks.
+    Status and content type are checked before any chunk is handed out, so
+    failures still surface as UpstreamError; the connection is released once
+    the iterator is exhausted or closed. The deadline covers the body too, so a
+    stalled stream is cut off.
+    """
+    when = _call_deadline()
+    breaker = _admit(path, priority, when)
+    client = get_client()
+    request = client.build_request(
+        "GET", path, params={**params, "apiKey": settings.API_KEY}
+    )
+    started = time.perf_counter()
+    response = None
+    try:
+        async with asyncio.timeout_at(when):
+            response = await client.send(request, stream=True)
+        _observe(path, started, response)
+        _check(response)
+    except _FAILURES as e:
+        if response is not None:
+            await response.aclose()
+        error = _failure(path, breaker, e)
+        if error is e:
+            raise
+        raise error from e
+    except asyncio.CancelledError:
+        breaker.record(None)
+        if response is not None:
+            await response.aclose()
+        raise
+    breaker.record(True)
+
+    async def chunks():
+        body = response.aiter_bytes()
+        try:
+            while True:
+                try:
+                    async with asyncio.timeout_at(when):
+                        chunk = await anext(body, None)
+                except TimeoutError as e:
+                    metrics.record_upstream_error(path, DeadlineExceeded(str(e)))
+                    raise DeadlineExceeded("NewsAPI stream ran past its deadline") from e
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            await response.aclose()
+
+    return chunks()
+
+
+async def fetch_cached(
+    path: str, params: dict, priority: str = INTERACTIVE
+) -> Payload:
+    """
+    Like `fetch`, but served from the response cache using the endpoint's TTL.
+    Misses and background refreshes for the same key share one upstream call.
+    Refreshes only spend warmup budget, and once the budget for `priority` is
+    gone or the circuit is open, an expired copy is served rather than nothing.
+    """
+    key = make_key(path, params)
+    try:
+        return await response_cache.get_or_fetch(
+            key,
+            CACHE_TTLS.get(path, 0),
+            lambda: inflight.do(key, lambda: fetch(path, params, priority)),
+            refresh=lambda: inflight.do(key, lambda: fetch(path, params, WARMUP)),
+        )
+    except (QuotaExceeded, CircuitOpen):
+        payload = await response_cache.peek_shared(key)
+        if payload is None:
+            raise
+        return payload
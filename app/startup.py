@@ -0,0 +1,163 @@
+# app/startup.py
+"""
+Cold-start accounting. app.main imports this module first, so IMPORT_STARTED
+marks the start of the application's own imports; the lifespan then times each
+startup phase.
+
+    python -m app.startup --budget-ms 1500
+
+runs a cold import under `-X importtime` and a fresh process through startup
+and its first request, prints where the time went and exits non-zero when
+time-to-first-request is over the budget.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+IMPORT_STARTED = time.perf_counter()
+
+# Phase name -> seconds, in the order the phases ran
+phases = {}
+
+# Imported lazily by the code that needs them and warmed once the app is up
+PRELOAD_MODULES = ("jwt",)
+
+
+@contextmanager
+def phase(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = time.perf_counter() - started
+
+
+def imported():
+    phases["import"] = time.perf_counter() - IMPORT_STARTED
+
+
+def preload():
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
+
+
+def summary() -> str:
+    total = sum(phases.values())
+    parts = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in phases.items())
+    return f"{total * 1000:.0f} ms ({parts})"
+
+
+def log_report(budget_ms: float):
+    from app.logger import logger
+
+    total_ms = sum(phases.values()) * 1000
+    if budget_ms and total_ms > budget_ms:
+        logger.warning(f"Startup took {summary()}, over the {budget_ms:.0f} ms budget")
+    else:
+        logger.info(f"Startup took {summary()}")
+
+
+def _import_profile(top: int) -> float:
+    """
+    Print the slowest direct imports of app.main from a cold interpreter.
+    Returns the total import time in seconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total, children = 0.0, []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # the header line
+        depth = (len(name) - len(name.lstrip())) // 2
+        seconds = int(cumulative) / 1e6
+        if name.strip() == "app.main":
+            total = seconds
+        elif depth == 1:
+            children.append((seconds, name.strip()))
+    print(f"import app.main: {total * 1000:.0f} ms, slowest direct imports:")
+    for seconds, name in sorted(children, reverse=True)[:top]:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+    return total
+
+
+async def _first_request() -> dict:
+    """
+    Import the app, run its startup and serve one request, timing each step.
+    """
+    started = time.perf_counter()
+    import httpx
+    from app.main import app
+    from app.config import settings
+
+    imported_at = time.perf_counter()
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        ready_at = time.perf_counter()
+        async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+            response = await client.post(
+                "/token",
+                json={
+                    "client_id": settings.CLIENT_ID,
+                    "client_secret": settings.CLIENT_SECRET,
+                },
+            )
+        served_at = time.perf_counter()
+    return {
+        "import": imported_at - started,
+        "startup": ready_at - imported_at,
+        "first_request": served_at - ready_at,
+        "total": served_at - started,
+        "status": response.status_code,
+        "phases": dict(phases),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import and startup time.")
+    parser.add_argument("--top", type=int, default=15, help="direct imports to list")
+    parser.add_argument(
+        "--budget-ms", type=float, default=0, help="fail above this time-to-first-request"
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        timings = asyncio.run(_first_request())
+        print(json.dumps(timings))
+        return
+
+    _import_profile(args.top)
+    # A fresh process, so nothing is imported yet
+    result = subprocess.run(
+        [sys.executable, "-m", "app.startup", "--child"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    print("\nTime to first request (POST /token):")
+    for key in ("import", "startup", "first_request", "total"):
+        print(f"  {key:<14} {timings[key] * 1000:8.1f} ms")
+    for name, seconds in timings["phases"].items():
+        print(f"    phase {name:<18} {seconds * 1000:8.1f} ms")
+
+    total_ms = timings["total"] * 1000
+    if args.budget_ms and total_ms > args.budget_ms:
+        print(f"\nOver budget: {total_ms:.0f} ms > {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Report bytes on the wire and CPU cost of each response encoding.
+
+Uses a NewsAPI-shaped /everything payload and measures, per available encoding,
+the compressed size and the time to compress it once, against the cost of
+serving an already-compressed cached payload.
+
+    python benchmarks/bench_compression.py --articles 100 500
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson  # noqa: E402
+from app.compression import ENCODERS, compress  # noqa: E402
+from app.global_utils import envelope_prefix  # noqa: E402
+from app.news.upstream import Payload  # noqa: E402
+from benchmarks.bench_serialization import make_payload  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--number", type=int, default=50)
+    args = parser.parse_args()
+
+    prefix = envelope_prefix("News articles fetched successfully", False, "NEWS_FETCHED")
+    print(f"{'articles':>8} {'encoding':>9} {'bytes':>10} {'ratio':>7} "
+          f"{'compress ms':>12} {'cached hit us':>14}")
+    for count in args.articles:
+        body = orjson.dumps(make_payload(count))
+        envelope = prefix + body + b"}"
+        print(f"{count:>8} {'identity':>9} {len(envelope):>10} {1:>7.2f} "
+              f"{0:>12.3f} {0:>14.1f}")
+        for encoding in ENCODERS:
+            encoded = compress(envelope, encoding)
+            seconds = min(
+                timeit.repeat(lambda: compress(envelope, encoding), number=args.number,
+                              repeat=3)
+            ) / args.number
+            payload = Payload(body)
+            payload.envelope(prefix, encoding)
+            hit = min(
+                timeit.repeat(lambda: payload.envelope(prefix, encoding), number=10000,
+                              repeat=3)
+            ) / 10000
+            print(f"{count:>8} {encoding:>9} {len(encoded):>10} "
+                  f"{len(envelope) / len(encoded):>7.2f} {seconds * 1000:>12.3f} "
+                  f"{hit * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
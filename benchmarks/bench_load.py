@@ -0,0 +1,402 @@
+"""
+End-to-end load benchmark of every news route and /token.
+
+Starts a local stub NewsAPI (see stub_newsapi.py) and the app under uvicorn,
+seeds the database, then drives each route with concurrent clients for a fixed
+time and reports throughput and p50/p95/p99 latency. Results are written as
+JSON; pass an earlier file to --compare to see the change between commits.
+
+    python benchmarks/bench_load.py --concurrency 32 --duration 10
+    python benchmarks/bench_load.py --database-url mysql+pymysql://u:pw@localhost/bench
+    python benchmarks/bench_load.py --compare benchmarks/results/load-abc1234.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import httpx  # noqa: E402
+from benchmarks.stub_newsapi import StubServer, free_port, synthetic_text  # noqa: E402
+
+CLIENT_ID = "bench_client"
+CLIENT_SECRET = "bench_secret"
+
+APP_ENV = {
+    "API_KEY": "bench",
+    "CLIENT_ID": CLIENT_ID,
+    "CLIENT_SECRET": CLIENT_SECRET,
+    "SECRET_KEY": "benchmark-secret-key-0123456789abcdef",
+    "DATABASE_NAME": "bench",
+    "DATABASE_USER": "bench",
+    # Measure the app, not the request budget
+    "NEWS_QUOTA_PER_DAY": "0",
+    "NEWS_QUOTA_PER_MINUTE": "0",
+    "NEWS_SCHEDULER_ENABLED": "false",
+}
+
+SEED_START = datetime(2025, 1, 1)
+
+
+def scenarios(distinct: int) -> dict:
+    """
+    Route name -> function of the request number returning
+    (method, path, query params, json body). `distinct` bounds how many
+    different upstream queries are used, i.e. the cache hit ratio.
+    """
+    yesterday = date.today() - timedelta(days=1)
+    week_ago = yesterday - timedelta(days=6)
+
+    def topic(i):
+        return f"topic{i % distinct}"
+
+    def batch(i):
+        return {
+            "queries": [
+                {"type": "headlines", "country": f"c{i % distinct}"},
+                {"type": "headlines", "source": f"s{i % distinct}"},
+                {"type": "everything", "q": topic(i)},
+                {"type": "search", "q": f"story {i % 50}"},
+            ]
+        }
+
+    return {
+        "token": lambda i: (
+            "POST",
+            "/token",
+            None,
+            {"client_id": CLIENT_ID, "client_secret": CLIENT_SECRET},
+        ),
+        "news": lambda i: ("GET", "/news/", {"q": topic(i)}, None),
+        "news_read_through": lambda i: (
+            "GET",
+            "/news/",
+            {
+                "q": topic(i),
+                "read_through": "true",
+                "from": week_ago.isoformat(),
+                "to": yesterday.isoformat(),
+            },
+            None,
+        ),
+        "save_latest": lambda i: (
+            "POST",
+            "/news/save-latest",
+            {"q": topic(i), "batch_size": 100},
+            None,
+        ),
+        "all_offset": lambda i: (
+            "GET",
+            "/news/all",
+            {"page": 1 + i % 100, "page_size": 20},
+            None,
+        ),
+        "all_cursor": lambda i: ("GET", "/news/all", {"cursor": "", "page_size": 20}, None),
+        "search": lambda i: ("GET", "/news/search", {"q": f"story {i % 50}"}, None),
+        "export": lambda i: (
+            "GET",
+            "/news/export",
+            {
+                "from": SEED_START.isoformat(),
+                "to": (SEED_START + timedelta(hours=1)).isoformat(),
+            },
+            None,
+        ),
+        "cache_stats": lambda i: ("GET", "/news/cache/stats", None, None),
+        "headlines_country": lambda i: (
+            "GET",
+            f"/news/headlines/country/c{i % distinct}",
+            None,
+            None,
+        ),
+        "headlines_source": lambda i: (
+            "GET",
+            f"/news/headlines/source/s{i % distinct}",
+            None,
+            None,
+        ),
+        "headlines_filter": lambda i: (
+            "GET",
+            "/news/headlines/filter",
+            {"source": f"s{i % distinct}", "country": "us"},
+            None,
+        ),
+        "batch": lambda i: ("POST", "/news/batch", None, batch(i)),
+        "batch_stream": lambda i: ("POST", "/news/batch", {"stream": "true"}, batch(i)),
+    }
+
+
+def seed(database_url: str, rows: int):
+    """
+    Create the tables and bulk-load `rows` articles, one a minute from SEED_START.
+    """
+    os.environ["DATABASE_URL_OVERRIDE"] = database_url
+    for key, value in APP_ENV.items():
+        os.environ.setdefault(key, value)
+    # Imported here so the settings pick up the environment above
+    from sqlalchemy import create_engine
+    from app.database import engine_options, init_db
+    from app.news.bulk_import import import_ndjson
+
+    engine = create_engine(database_url, **engine_options(database_url))
+    init_db(engine)
+    lines = (
+        json.dumps(
+            {
+                "title": f"Seeded story {i}",
+                "description": synthetic_text(f"seed/{i}", 24),
+                "url": f"https://seed.example.com/{i}",
+                "published_at": (SEED_START + timedelta(minutes=i)).isoformat(),
+            }
+        ).encode()
+        for i in range(rows)
+    )
+    stats = import_ndjson(lines, engine)
+    engine.dispose()
+    return stats
+
+
+class AppServer:
+    """
+    The app under uvicorn in a subprocess, logging to a file.
+    """
+
+    def __init__(self, env: dict, workers: int, log_path: str):
+        self.port = free_port()
+        self.env = env
+        self.workers = workers
+        self.log_path = log_path
+        self.process = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        self.log = open(self.log_path, "wb")
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "app.main:app",
+                "--port",
+                str(self.port),
+                "--workers",
+                str(self.workers),
+                "--log-level",
+                "warning",
+            ],
+            cwd=ROOT,
+            env=self.env,
+            stdout=self.log,
+            stderr=subprocess.STDOUT,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                if httpx.get(f"{self.base_url}/openapi.json").status_code == 200:
+                    return self
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.1)
+        self.__exit__()
+        raise RuntimeError(f"App did not start, see {self.log_path}")
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.log.close()
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+async def run_scenario(client, build, concurrency: int, duration: float) -> dict:
+    latencies = []
+    errors = 0
+    counter = iter(range(10**12))
+    stop_at = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < stop_at:
+            method, path, params, body = build(next(counter))
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, params=params, json=body)
+                await response.aread()
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "mean_ms": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+        "p50_ms": 1000 * percentile(latencies, 50),
+        "p95_ms": 1000 * percentile(latencies, 95),
+        "p99_ms": 1000 * percentile(latencies, 99),
+        "max_ms": 1000 * latencies[-1] if latencies else 0.0,
+    }
+
+
+async def run_all(base_url: str, names: list, args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        token = (
+            await client.post(
+                "/token", json={"client_id": CLIENT_ID, "client_secret": CLIENT_SECRET}
+            )
+        ).json()["data"]["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        builds = scenarios(args.distinct)
+        results = {}
+        for name in names:
+            if args.warmup:
+                await run_scenario(client, builds[name], args.concurrency, args.warmup)
+            results[name] = await run_scenario(
+                client, builds[name], args.concurrency, args.duration
+            )
+            print(format_row(name, results[name]), flush=True)
+        return results
+
+
+def format_row(name: str, r: dict) -> str:
+    return (
+        f"{name:<18} {r['requests']:>8} {r['errors']:>6} {r['rps']:>9.1f} "
+        f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}"
+    )
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(previous_path: str, results: dict):
+    with open(previous_path) as f:
+        previous = json.load(f)
+    print(f"\nChange against {previous.get('commit', '?')} ({previous_path}):")
+    print(f"{'route':<18} {'rps':>9} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name, now in results.items():
+        before = previous.get("results", {}).get(name)
+        if not before:
+            continue
+        cells = []
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            change = (now[key] / before[key] - 1) * 100 if before[key] else 0.0
+            cells.append(f"{change:>+7.1f}%")
+        print(f"{name:<18} {' '.join(cells)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--database-url",
+        help="SQLAlchemy URL, e.g. a local MySQL; defaults to a temporary SQLite file",
+    )
+    parser.add_argument("--seed-rows", type=int, default=20000)
+    parser.add_argument("--articles", type=int, default=100, help="per stub response")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="stub delay")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per route")
+    parser.add_argument("--warmup", type=float, default=1.0, help="seconds per route")
+    parser.add_argument("--distinct", type=int, default=20, help="distinct queries")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--routes", nargs="+", choices=sorted(scenarios(1)))
+    parser.add_argument("--output", help="defaults to benchmarks/results/load-<commit>.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="news-bench-")
+    database_url = args.database_url or f"sqlite:///{workdir}/bench.db"
+    names = args.routes or list(scenarios(1))
+
+    seeded = seed(database_url, args.seed_rows)
+    print(f"Seeded {seeded.inserted:,} rows in {seeded.seconds:.1f}s")
+
+    with StubServer(args.articles, args.latency_ms) as stub_server:
+        env = {
+            **os.environ,
+            **APP_ENV,
+            "DATABASE_URL_OVERRIDE": database_url,
+            "NEWS_API_BASE_URL": stub_server.base_url,
+        }
+        with AppServer(env, args.workers, os.path.join(workdir, "app.log")) as app:
+            print(
+                f"{'route':<18} {'requests':>8} {'errors':>6} {'rps':>9} "
+                f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+            )
+            results = asyncio.run(run_all(app.base_url, names, args))
+        upstream_hits = stub_server.hits()
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": database_url.split("://", 1)[0],
+        "config": {
+            key: getattr(args, key)
+            for key in (
+                "seed_rows",
+                "articles",
+                "latency_ms",
+                "concurrency",
+                "duration",
+                "distinct",
+                "workers",
+            )
+        },
+        "upstream_hits": upstream_hits,
+        "results": results,
+    }
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"load-{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
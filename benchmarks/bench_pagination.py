@@ -0,0 +1,101 @@
+"""
+Compare OFFSET and keyset (cursor) pagination on /news/all queries.
+
+Seeds a throwaway SQLite database and times page 1, 100 and 1000 in both modes.
+
+    python benchmarks/bench_pagination.py --rows 200000 --page-size 100
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.models import News  # noqa: E402
+from app.news.pagination import encode_cursor, keyset_page  # noqa: E402
+
+
+def seed(session, rows):
+    base = datetime(2020, 1, 1)
+    batch = 10000
+    for start in range(0, rows, batch):
+        session.execute(
+            insert(News),
+            [
+                {
+                    "title": f"Title {i}",
+                    "description": "Lorem ipsum dolor sit amet " * 4,
+                    "url": f"https://example.com/{i}",
+                    "published_at": base + timedelta(seconds=i * 37 % rows),
+                }
+                for i in range(start, min(start + batch, rows))
+            ],
+        )
+    session.commit()
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def offset_page(session, page, page_size):
+    session.query(News).count()
+    return (
+        session.query(News)
+        .order_by(News.published_at.desc(), News.id.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+        .all()
+    )
+
+
+def cursor_for_page(session, page, page_size):
+    if page == 1:
+        return ""
+    last = offset_page(session, page - 1, page_size)[-1]
+    return encode_cursor(last.published_at, last.id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        print(f"Seeding {args.rows} rows...")
+        seed(session, args.rows)
+
+        print(f"{'page':>6} {'offset ms':>12} {'cursor ms':>12}")
+        for page in (1, 100, 1000):
+            if (page - 1) * args.page_size >= args.rows:
+                continue
+            cursor = cursor_for_page(session, page, args.page_size)
+            offset_ms = timed(
+                lambda: offset_page(session, page, args.page_size), args.repeat
+            )
+            cursor_ms = timed(
+                lambda: keyset_page(session.query(News), cursor, args.page_size),
+                args.repeat,
+            )
+            print(f"{page:>6} {offset_ms:>12.2f} {cursor_ms:>12.2f}")
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
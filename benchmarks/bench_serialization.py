@@ -0,0 +1,99 @@
+"""
+Compare envelope serialization: Starlette's JSONResponse vs EnvelopeResponse.
+
+Builds a NewsAPI-shaped payload of 100 articles and times constructing each
+response class around it.
+
+    python benchmarks/bench_serialization.py --articles 100 --number 2000
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from app.global_utils import EnvelopeResponse  # noqa: E402
+
+HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "*",
+    "Access-Control-Allow-Methods": "*",
+    "Content-Type": "application/json",
+}
+
+
+def make_payload(count):
+    base = datetime(2025, 4, 18, 12, 0, 0)
+    return {
+        "status": "ok",
+        "totalResults": count,
+        "articles": [
+            {
+                "source": {"id": "bbc-news", "name": "BBC News"},
+                "author": "Author",
+                "title": f"Headline number {i} about something newsworthy",
+                "description": "A short description of the article. " * 6,
+                "url": f"https://example.com/articles/{i}",
+                "urlToImage": f"https://example.com/images/{i}.jpg",
+                "publishedAt": base - timedelta(minutes=i),
+                "content": "Body text of the article, truncated by NewsAPI… " * 4,
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def envelope(data):
+    return {"message": "ok", "error": False, "code": "NEWS_FETCHED", "data": data}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=100)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    payload = make_payload(args.articles)
+    # The stdlib encoder cannot handle datetimes, so the old path pre-formats them
+    iso_payload = {
+        **payload,
+        "articles": [
+            {**a, "publishedAt": a["publishedAt"].isoformat()}
+            for a in payload["articles"]
+        ],
+    }
+
+    cases = {
+        "JSONResponse (isoformat + headers dict)": lambda: JSONResponse(
+            content=envelope(
+                {
+                    **payload,
+                    "articles": [
+                        {**a, "publishedAt": a["publishedAt"].isoformat()}
+                        for a in payload["articles"]
+                    ],
+                }
+            ),
+            status_code=200,
+            headers=dict(HEADERS),
+        ),
+        "JSONResponse (pre-formatted)": lambda: JSONResponse(
+            content=envelope(iso_payload), status_code=200, headers=dict(HEADERS)
+        ),
+        "EnvelopeResponse": lambda: EnvelopeResponse(
+            content=envelope(payload), status_code=200
+        ),
+    }
+
+    size = len(EnvelopeResponse(content=envelope(payload)).body)
+    print(f"{args.articles} articles, {size} bytes per body")
+    for name, fn in cases.items():
+        seconds = min(timeit.repeat(fn, number=args.number, repeat=3))
+        print(f"{name:<42} {seconds / args.number * 1e6:>9.1f} us/response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Local stand-in for NewsAPI used by the load benchmark.
+
+Answers /v2/everything and /v2/top-headlines with canned article payloads of a
+configurable size after a configurable delay. Article urls are derived from
+the query, so distinct queries produce distinct rows when the app stores them.
+
+    python benchmarks/stub_newsapi.py --port 9100 --articles 100 --latency-ms 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from urllib.parse import parse_qsl
+
+import httpx
+import orjson
+import uvicorn
+
+
+WORDS = (
+    "market council storm election court budget energy vaccine league launch "
+    "merger strike summit drought tariff satellite museum harbor festival "
+    "pipeline treaty senate airline studio startup factory reactor glacier "
+    "orchestra railway hospital stadium vineyard refinery archive laboratory "
+    "rescue protest record outage recall verdict deal forecast survey audit"
+).split()
+
+
+def synthetic_text(key: str, words: int) -> str:
+    """
+    Deterministic filler of `words` words drawn by `key`, varied enough that
+    synthetic articles do not read as near-duplicates of each other.
+    """
+    return " ".join(random.Random(key).choices(WORDS, k=words)) + "."
+
+
+class StubNewsAPI:
+    """
+    Pure ASGI app. Bodies are rendered once per distinct query and kept.
+    GET /__stats reports how many NewsAPI requests were served.
+    """
+
+    def __init__(self, articles: int = 100, latency_ms: float = 0.0):
+        self.articles = articles
+        self.latency = latency_ms / 1000
+        self.hits = 0
+        self._bodies = {}
+
+    def body(self, query: str) -> bytes:
+        body = self._bodies.get(query)
+        if body is None:
+            base = datetime(2025, 4, 18, 12, 0, 0)
+            slug = "".join(c if c.isalnum() else "-" for c in query) or "all"
+            body = self._bodies[query] = orjson.dumps(
+                {
+                    "status": "ok",
+                    "totalResults": self.articles,
+                    "articles": [
+                        {
+                            "source": {"id": "stub", "name": "Stub News"},
+                            "author": "Benchmark",
+                            "title": f"{query or 'Headline'} story {i}",
+                            "description": synthetic_text(f"{query}/{i}", 36),
+                            "url": f"https://stub.example.com/{slug}/{i}",
+                            "urlToImage": f"https://stub.example.com/{slug}/{i}.jpg",
+                            "publishedAt": (base - timedelta(minutes=i)).strftime(
+                                "%Y-%m-%dT%H:%M:%SZ"
+                            ),
+                            "content": "Body text of the article, truncated… " * 4,
+                        }
+                        for i in range(self.articles)
+                    ],
+                }
+            )
+        return body
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        if scope["path"] == "/__stats":
+            body = orjson.dumps({"hits": self.hits})
+        else:
+            self.hits += 1
+            params = dict(parse_qsl(scope["query_string"].decode()))
+            query = params.get("q") or params.get("country") or params.get("sources") or ""
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            body = self.body(query)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"application/json; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class StubServer:
+    """
+    Run the stub in its own process, so it does not compete with the load
+    generator for the GIL.
+    """
+
+    def __init__(self, articles: int = 100, latency_ms: float = 0.0):
+        self.port = free_port()
+        self.args = ["--articles", str(articles), "--latency-ms", str(latency_ms)]
+        self.process = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v2"
+
+    def hits(self) -> int:
+        return httpx.get(f"http://127.0.0.1:{self.port}/__stats").json()["hits"]
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--port", str(self.port)]
+            + self.args
+        )
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            try:
+                self.hits()
+                return self
+            except httpx.HTTPError:
+                time.sleep(0.05)
+        self.__exit__()
+        raise RuntimeError("Stub NewsAPI did not start")
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--articles", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    stub = StubNewsAPI(args.articles, args.latency_ms)
+    uvicorn.run(stub, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import gzip
+import sys
+from app.database import engine, init_db
+from app.news.bulk_import import import_ndjson
+
+
+# Open a dump for binary line reading; "-" reads stdin and .gz files are decompressed
+def open_dump(path):
+    if path == "-":
+        return sys.stdin.buffer
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb", buffering=1 << 20)
+
+
+# Function to print one progress line
+def report(stats):
+    print(
+        f"{stats.lines:,} lines, {stats.inserted:,} inserted, "
+        f"{stats.skipped:,} skipped, {stats.near_duplicates:,} near-duplicates, "
+        f"{stats.rate:,.0f} rows/s",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Backfill the news table from NDJSON article dumps: NewsAPI "
+        "articles or /news/export rows, one JSON object per line."
+    )
+    parser.add_argument("paths", nargs="+", help="NDJSON files, .gz or - for stdin")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument(
+        "--queue-size", type=int, default=4, help="parsed batches buffered in memory"
+    )
+    args = parser.parse_args()
+
+    # Make sure the tables exist before inserting
+    init_db()
+
+    for path in args.paths:
+        print(f"Importing {path}...", file=sys.stderr)
+        with open_dump(path) as lines:
+            stats = import_ndjson(
+                lines,
+                engine,
+                batch_size=args.batch_size,
+                queue_size=args.queue_size,
+                progress=report,
+            )
+        report(stats)
+
+    print("Import completed successfully.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
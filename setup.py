@@ -67,6 +67,16 @@ def update_env(client_id, client_secret, secret_key):
     print(".env file updated with the new keys.")
 
 
+# Function to create the tables; the app also does this at startup unless
+# DB_CREATE_TABLES is off
+def create_tables():
+    # Imported here so the settings read the .env written above
+    from app.database import init_db
+
+    init_db()
+    print("Tables are ready.")
+
+
 def main():
     print("Starting setup...")
 
@@ -79,6 +89,9 @@ def main():
     # Step 3: Update the .env file with the generated keys
     update_env(client_id, client_secret, secret_key)
 
+    # Step 4: Create the tables
+    create_tables()
+
     print("Setup completed successfully.")
 
 
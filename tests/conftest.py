@@ -1,9 +1,18 @@
-import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.main import app
-from app.database import Base, get_db
+import asyncio
+import os
+
+# The schema is created below on the test database; keep startup off the app's
+os.environ.setdefault("DB_CREATE_TABLES", "false")
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from app.main import app  # noqa: E402
+from app.database import Base, get_db, get_read_db, get_session_factory  # noqa: E402
+from app.news import upstream  # noqa: E402
+from helpers import FakeClock  # noqa: E402
 
 # Use in-memory SQLite for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -26,7 +35,21 @@ def override_get_db():
         db.close()
 
 
+async def override_get_read_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def override_get_session_factory():
+    return TestingSessionLocal
+
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_read_db
+app.dependency_overrides[get_session_factory] = override_get_session_factory
 
 
 @pytest.fixture(scope="module")
@@ -42,3 +65,79 @@ def cleanup_db():
     Base.metadata.drop_all(bind=engine)  # Drop all tables
 
     Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db_session(cleanup_db):
+    # Start from the current schema; other tests may leave a mocked session installed
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    app.dependency_overrides[get_session_factory] = override_get_session_factory
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+
+
+class StubNewsAPI:
+    """
+    Local stand-in for NewsAPI, mounted on the shared client through
+    httpx.MockTransport. Counts hits and can inject latency, statuses and errors.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.requests = []
+        # A dict, or a callable taking the httpx.Request and returning one
+        self.payload = {"status": "ok", "totalResults": 0, "articles": []}
+        self.body = None  # raw bytes sent instead of `payload` when set
+        self.status_code = 200
+        self.error = None
+        self.latency = 0.0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.hits += 1
+        self.requests.append(request)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+        if self.body is not None:
+            return httpx.Response(
+                self.status_code,
+                content=self.body,
+                headers={"content-type": "application/json; charset=utf-8"},
+            )
+        payload = self.payload(request) if callable(self.payload) else self.payload
+        return httpx.Response(self.status_code, json=payload)
+
+
+@pytest.fixture(scope="function")
+def news_api(client, monkeypatch):
+    stub = StubNewsAPI()
+    upstream.response_cache.clear()
+    upstream.quota.reset()
+    monkeypatch.setattr(
+        upstream, "breakers", {path: upstream.new_breaker() for path in upstream.breakers}
+    )
+    monkeypatch.setattr(
+        upstream, "_client", upstream.create_client(httpx.MockTransport(stub.handler))
+    )
+    yield stub
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """
+    Returns `install(module, name="monotonic", now=1000.0)`, which replaces the
+    `name` clock that `module` imported from `time` with a FakeClock for the
+    test and returns the clock.
+    """
+
+    def install(module, name="monotonic", now=1000.0):
+        clock = FakeClock(now)
+        monkeypatch.setattr(module, name, clock)
+        return clock
+
+    return install
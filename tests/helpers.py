@@ -0,0 +1,36 @@
+"""
+Helpers shared by the test modules.
+"""
+from datetime import datetime, timedelta, timezone
+import jwt
+from app.config import settings
+from app.models import News
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def create_token(exp_delta_minutes=15):
+    expire = datetime.now(timezone.utc) + timedelta(minutes=exp_delta_minutes)
+    payload = {"sub": settings.CLIENT_ID, "exp": expire}
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm="HS256")
+
+
+def seed_news(db, count):
+    base = datetime(2024, 1, 1, 12, 0, 0)
+    db.add_all(
+        News(
+            title=f"News {i}",
+            description=f"Description {i}",
+            url=f"http://example.com/seed/{i}",
+            # Pairs of rows share a timestamp to exercise the id tie-breaker
+            published_at=base + timedelta(minutes=i // 2),
+        )
+        for i in range(count)
+    )
+    db.commit()
@@ -1,4 +1,11 @@
+import asyncio
+import time
+import jwt
+import pytest
+from fastapi import HTTPException
+from app.auth import security
 from app.config import settings
+from helpers import create_token
 
 
 def test_token_generation_success(client):
@@ -22,3 +29,53 @@ def test_token_generation_invalid_credentials(client):
 
     assert response.status_code == 401
     assert response.json()["detail"] == "Invalid client credentials"
+
+
+def test_verify_token_caches_verified_claims(monkeypatch):
+    token = create_token()
+    decode_calls = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        decode_calls.append(args)
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting_decode)
+
+    first = asyncio.run(security.verify_token(token))
+    second = asyncio.run(security.verify_token(token))
+
+    assert first == second
+    assert first["sub"] == settings.CLIENT_ID
+    assert len(decode_calls) == 1
+
+
+def test_verify_token_rejects_cached_token_after_expiry(monkeypatch):
+    token = create_token(exp_delta_minutes=1)
+    asyncio.run(security.verify_token(token))
+
+    now = time.time()
+    monkeypatch.setattr(security, "time", lambda: now + 120)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(security.verify_token(token))
+
+    assert exc.value.status_code == 401
+    assert exc.value.detail == "Token has expired"
+
+
+def test_verify_token_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "TOKEN_CACHE_MAX_ENTRIES", 2)
+    security._verified_tokens.clear()
+    for minutes in (10, 11, 12):
+        asyncio.run(security.verify_token(create_token(exp_delta_minutes=minutes)))
+
+    assert len(security._verified_tokens) == 2
+
+
+def test_verify_token_invalid_token_is_not_cached():
+    security._verified_tokens.clear()
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(security.verify_token("this.is.not.a.valid.token"))
+
+    assert exc.value.detail == "Invalid token"
+    assert len(security._verified_tokens) == 0
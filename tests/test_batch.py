@@ -0,0 +1,151 @@
+import asyncio
+import json
+from datetime import datetime
+import httpx
+import pytest
+from app.config import settings
+from app.models import News
+from app.news import upstream
+from helpers import create_token
+
+
+@pytest.fixture
+def headers():
+    return {"Authorization": f"Bearer {create_token()}"}
+
+
+def headlines_payload(request):
+    label = request.url.params.get("country") or request.url.params.get("sources")
+    return {"status": "ok", "totalResults": 1, "articles": [{"title": f"Top {label}"}]}
+
+
+def test_batch_mixes_upstream_and_search(client, news_api, db_session, headers):
+    news_api.payload = headlines_payload
+    db_session.add(
+        News(
+            title="Quantum computing milestone",
+            description="A new quantum processor",
+            url="https://example.com/quantum",
+            published_at=datetime(2025, 4, 18),
+        )
+    )
+    db_session.commit()
+
+    response = client.post(
+        "/news/batch",
+        json={
+            "queries": [
+                {"type": "headlines", "country": "US"},
+                {"type": "search", "q": "quantum"},
+                {"type": "headlines", "source": "bbc-news"},
+                # Same as the first query: answered by the same upstream call
+                {"type": "headlines", "country": "us"},
+            ]
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["code"] == "BATCH_RESOLVED"
+    results = body["data"]
+    assert [item["index"] for item in results] == [0, 1, 2, 3]
+    assert [item["code"] for item in results] == [
+        "TOP_HEADLINES_FETCHED",
+        "SEARCH_RESULTS_FETCHED",
+        "TOP_HEADLINES_FETCHED",
+        "TOP_HEADLINES_FETCHED",
+    ]
+    assert results[0]["data"]["articles"] == [{"title": "Top us"}]
+    assert results[2]["data"]["articles"] == [{"title": "Top bbc-news"}]
+    assert results[3]["data"] == results[0]["data"]
+    assert [a["title"] for a in results[1]["data"]["articles"]] == [
+        "Quantum computing milestone"
+    ]
+    assert news_api.hits == 2
+
+
+def test_batch_reports_errors_per_query(client, news_api, headers):
+    def payload(request):
+        if request.url.params.get("country") == "xx":
+            raise httpx.ConnectError("connection refused")
+        return headlines_payload(request)
+
+    news_api.payload = payload
+
+    response = client.post(
+        "/news/batch",
+        json={
+            "queries": [
+                {"type": "headlines", "country": "xx"},
+                {"type": "everything", "from": "2025-04-18", "to": "2025-04-18"},
+                {"type": "search", "q": "apple", "cursor": "not-a-cursor"},
+                {"type": "search", "q": "  "},
+            ]
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    results = response.json()["data"]
+    assert [(item["error"], item["code"]) for item in results] == [
+        (True, "HEADLINES_FETCH_FAILED"),
+        (False, "NEWS_FETCHED"),
+        (True, "INVALID_CURSOR"),
+        (True, "INVALID_QUERY"),
+    ]
+    assert results[0]["data"] is None
+    params = news_api.requests[-1].url.params
+    assert (params["q"], params["from"], params["sortBy"]) == (
+        "apple",
+        "2025-04-18",
+        "popularity",
+    )
+
+
+def test_batch_bounds_upstream_concurrency(client, news_api, headers, monkeypatch):
+    running, peak = 0, 0
+
+    async def handler(request):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return httpx.Response(200, json=headlines_payload(request))
+
+    monkeypatch.setattr(
+        upstream, "_client", upstream.create_client(httpx.MockTransport(handler))
+    )
+    monkeypatch.setattr(settings, "NEWS_BATCH_CONCURRENCY", 2)
+
+    response = client.post(
+        "/news/batch?stream=true",
+        json={"queries": [{"type": "headlines", "source": f"s{i}"} for i in range(6)]},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(item["index"] for item in lines) == list(range(6))
+    assert {item["code"] for item in lines} == {"TOP_HEADLINES_FETCHED"}
+    assert peak == 2
+
+
+def test_batch_validates_queries(client, headers, monkeypatch):
+    monkeypatch.setattr(settings, "NEWS_BATCH_MAX_ITEMS", 2)
+    query = {"type": "headlines", "country": "us"}
+
+    too_large = client.post("/news/batch", json={"queries": [query] * 3}, headers=headers)
+    unknown = client.post(
+        "/news/batch", json={"queries": [{"type": "sports"}]}, headers=headers
+    )
+    unfiltered = client.post(
+        "/news/batch", json={"queries": [{"type": "headlines"}]}, headers=headers
+    )
+
+    assert too_large.status_code == 400
+    assert too_large.json()["code"] == "BATCH_TOO_LARGE"
+    assert unknown.status_code == 422
+    assert unfiltered.status_code == 422
@@ -0,0 +1,113 @@
+import asyncio
+import time
+import pytest
+from app.config import settings
+from app.constants import NEWS_API_TOP_HEADLINES, NEWS_API_URL_EVERYTHING
+from app.news import breaker as breaker_module, upstream
+from app.news.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from helpers import create_token
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock(breaker_module)
+
+
+def test_opens_once_failure_rate_is_reached(clock):
+    b = CircuitBreaker(failure_rate=0.5, min_calls=4, window=10, open_seconds=30)
+
+    for success in (True, False, True):
+        assert b.allow() == 0
+        b.record(success)
+    assert b.state == CLOSED  # below min_calls
+
+    b.allow()
+    b.record(False)
+    assert b.state == OPEN
+    assert b.allow() == pytest.approx(30)
+
+
+def test_half_open_probe_closes_or_reopens(clock):
+    b = CircuitBreaker(failure_rate=0.5, min_calls=1, window=10, open_seconds=30)
+    b.allow()
+    b.record(False)
+
+    clock.now += 30
+    assert b.allow() == 0
+    assert b.state == HALF_OPEN
+    assert b.allow() > 0  # only one probe at a time
+    b.record(False)
+    assert b.state == OPEN
+
+    clock.now += 30
+    b.allow()
+    b.record(None)  # cancelled probe frees its slot
+    assert b.allow() == 0
+    b.record(True)
+    assert b.state == CLOSED
+
+
+def test_open_circuit_fails_fast_per_endpoint(client, news_api, monkeypatch):
+    monkeypatch.setitem(
+        upstream.breakers,
+        NEWS_API_TOP_HEADLINES,
+        CircuitBreaker(failure_rate=0.5, min_calls=2, window=4, open_seconds=30),
+    )
+    headers = {"Authorization": f"Bearer {create_token()}"}
+    news_api.status_code = 503
+
+    codes = [
+        client.get(f"/news/headlines/country/c{i}", headers=headers).json()["code"]
+        for i in range(4)
+    ]
+
+    assert codes == ["HEADLINES_FETCH_FAILED"] * 4
+    assert news_api.hits == 2
+    assert upstream.breakers[NEWS_API_TOP_HEADLINES].state == OPEN
+
+    # /everything has its own circuit
+    news_api.status_code = 200
+    response = client.get("/news/", params={"q": "tesla"}, headers=headers)
+    assert response.json()["code"] == "NEWS_FETCHED"
+    assert upstream.breakers[NEWS_API_URL_EVERYTHING].state == CLOSED
+
+
+def test_client_errors_do_not_open_the_circuit(client, news_api):
+    headers = {"Authorization": f"Bearer {create_token()}"}
+    news_api.status_code = 400
+
+    for i in range(settings.NEWS_BREAKER_MIN_CALLS + 1):
+        client.get(f"/news/headlines/country/c{i}", headers=headers)
+
+    assert news_api.hits == settings.NEWS_BREAKER_MIN_CALLS + 1
+    assert upstream.breakers[NEWS_API_TOP_HEADLINES].state == CLOSED
+
+
+def test_slow_upstream_is_cut_off_at_the_deadline(client, news_api, monkeypatch):
+    monkeypatch.setattr(settings, "NEWS_API_DEADLINE", 0.05)
+    news_api.latency = 1.0
+
+    started = time.perf_counter()
+    response = client.get(
+        "/news/headlines/country/us",
+        headers={"Authorization": f"Bearer {create_token()}"},
+    )
+
+    assert time.perf_counter() - started < 0.5
+    assert response.json()["code"] == "HEADLINES_FETCH_FAILED"
+
+
+def test_request_deadline_caps_total_upstream_time(news_api):
+    news_api.latency = 0.06
+
+    async def two_calls():
+        with upstream.deadline(0.1):
+            await upstream.fetch(NEWS_API_TOP_HEADLINES, {"country": "us"})
+            await upstream.fetch(NEWS_API_TOP_HEADLINES, {"country": "gb"})
+
+    started = time.perf_counter()
+    with pytest.raises(upstream.DeadlineExceeded):
+        asyncio.run(two_calls())
+
+    assert time.perf_counter() - started < 0.2
+    assert news_api.hits == 2
@@ -0,0 +1,104 @@
+import json
+import threading
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import OperationalError
+from app.models import News
+from app.news.bulk_import import import_ndjson
+
+
+def dump(count, prefix="a"):
+    for i in range(count):
+        yield json.dumps(
+            {
+                "title": f"Title {i}",
+                "description": f"Description {i}",
+                "url": f"http://example.com/{prefix}/{i}",
+                "publishedAt": "2024-01-01T10:00:00Z",
+            }
+        ).encode() + b"\n"
+
+
+def count_news(db):
+    return db.scalar(select(func.count()).select_from(News))
+
+
+def test_import_skips_duplicate_urls_across_batches_and_runs(db_session):
+    engine = db_session.get_bind()
+    lines = list(dump(250)) + list(dump(50))  # second copy repeats urls 0-49
+
+    first = import_ndjson(iter(lines), engine, batch_size=40)
+    second = import_ndjson(iter(lines), engine, batch_size=40)
+
+    assert first.lines == 300
+    assert first.inserted == 250
+    assert second.inserted == 0
+    assert count_news(db_session) == 250
+
+
+def test_import_skips_malformed_lines_and_accepts_export_rows(db_session):
+    lines = [
+        b"not json\n",
+        b"\n",
+        json.dumps({"title": "No url", "publishedAt": "2024-01-01T10:00:00Z"}).encode(),
+        json.dumps(
+            {
+                "id": 7,
+                "title": "Exported",
+                "description": None,
+                "url": "http://example.com/exported",
+                "published_at": "2024-01-01T12:00:00",
+            }
+        ).encode(),
+    ]
+
+    stats = import_ndjson(iter(lines), db_session.get_bind(), batch_size=10)
+
+    assert (stats.lines, stats.inserted, stats.skipped) == (3, 1, 2)
+    assert db_session.scalar(select(News.title)) == "Exported"
+
+
+def test_import_reports_progress(db_session):
+    reports = []
+
+    stats = import_ndjson(
+        dump(100),
+        db_session.get_bind(),
+        batch_size=10,
+        progress=reports.append,
+        progress_interval=0,
+    )
+
+    assert len(reports) == 10
+    assert reports[-1].inserted == stats.inserted == 100
+    assert stats.rate > 0
+
+
+def test_parser_stays_bounded_and_stops_when_insert_fails(db_session, monkeypatch):
+    engine = db_session.get_bind()
+    read = []
+
+    def lines():
+        for line in dump(10_000):
+            read.append(line)
+            yield line
+
+    calls = []
+
+    def fail_second_batch(conn, cursor, statement, parameters, context, executemany):
+        if executemany:
+            calls.append(statement)
+            if len(calls) == 2:
+                raise OperationalError(statement, parameters, Exception("disk full"))
+
+    event.listen(engine, "before_cursor_execute", fail_second_batch)
+    try:
+        with pytest.raises(OperationalError):
+            import_ndjson(lines(), engine, batch_size=100, queue_size=2)
+    finally:
+        event.remove(engine, "before_cursor_execute", fail_second_batch)
+
+    assert not [t for t in threading.enumerate() if t.name == "ndjson-parser"]
+    # Only the batches that fit in the queue were parsed ahead of the failure
+    assert len(read) < 1000
+    assert count_news(db_session) == 100
@@ -0,0 +1,99 @@
+import asyncio
+from app.news import cache
+from app.news.cache import ResponseCache, make_key
+
+
+def counting_fetch(values):
+    calls = {"count": 0}
+
+    async def fetch():
+        calls["count"] += 1
+        return values[calls["count"] - 1]
+
+    return fetch, calls
+
+
+def test_make_key_ignores_api_key_and_order():
+    a = make_key("/everything", {"q": "apple", "from": "2024-01-01", "apiKey": "k1"})
+    b = make_key("/everything", {"from": "2024-01-01", "q": "apple ", "apiKey": "k2"})
+    assert a == b
+    assert "apiKey" not in str(a)
+
+
+def test_lru_eviction():
+    c = ResponseCache(max_entries=2, stale_ttl=0)
+    c.set("a", 1, ttl=60)
+    c.set("b", 2, ttl=60)
+    c.get("a")  # "b" is now least recently used
+    c.set("c", 3, ttl=60)
+
+    assert c.get("b") is None
+    assert c.get("a") == (1, False)
+    assert c.evictions == 1
+
+
+def test_fresh_hit_and_expiry(fake_clock):
+    clock = fake_clock(cache)
+    c = ResponseCache(max_entries=10, stale_ttl=0)
+    fetch, calls = counting_fetch(["v1", "v2"])
+
+    async def run():
+        first = await c.get_or_fetch("k", 30, fetch)
+        second = await c.get_or_fetch("k", 30, fetch)
+        clock.now += 31
+        third = await c.get_or_fetch("k", 30, fetch)
+        return first, second, third
+
+    assert asyncio.run(run()) == ("v1", "v1", "v2")
+    assert calls["count"] == 2
+    assert c.stats()["hits"] == 1
+    assert c.stats()["misses"] == 2
+
+
+def test_stale_while_revalidate(fake_clock):
+    clock = fake_clock(cache)
+    c = ResponseCache(max_entries=10, stale_ttl=60)
+    fetch, calls = counting_fetch(["v1", "v2"])
+
+    async def run():
+        await c.get_or_fetch("k", 30, fetch)
+        clock.now += 45
+        # Stale value is returned without waiting for upstream
+        stale = await c.get_or_fetch("k", 30, fetch)
+        again = await c.get_or_fetch("k", 30, fetch)
+        await asyncio.sleep(0)
+        fresh = await c.get_or_fetch("k", 30, fetch)
+        return stale, again, fresh
+
+    assert asyncio.run(run()) == ("v1", "v1", "v2")
+    # Two stale reads share one background refresh
+    assert calls["count"] == 2
+    assert c.stats()["stale_hits"] == 2
+
+
+def test_failed_refresh_keeps_stale_value(fake_clock):
+    clock = fake_clock(cache)
+    c = ResponseCache(max_entries=10, stale_ttl=60)
+
+    async def failing():
+        raise RuntimeError("upstream down")
+
+    async def run():
+        c.set("k", "v1", ttl=30)
+        clock.now += 45
+        value = await c.get_or_fetch("k", 30, failing)
+        await asyncio.sleep(0)
+        return value, c.get("k")
+
+    assert asyncio.run(run()) == ("v1", ("v1", True))
+
+
+def test_zero_ttl_bypasses_cache():
+    c = ResponseCache(max_entries=10, stale_ttl=60)
+    fetch, calls = counting_fetch(["v1", "v2"])
+
+    async def run():
+        return await c.get_or_fetch("k", 0, fetch), await c.get_or_fetch("k", 0, fetch)
+
+    assert asyncio.run(run()) == ("v1", "v2")
+    assert len(c) == 0
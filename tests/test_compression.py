@@ -0,0 +1,130 @@
+import gzip
+import pytest
+from app import compression
+from app.compression import negotiate
+from app.news import upstream
+from helpers import create_token, seed_news
+
+
+def big_payload(count=50):
+    return {
+        "status": "ok",
+        "totalResults": count,
+        "articles": [
+            {
+                "title": f"Headline {i}",
+                "description": "Some description text. " * 10,
+                "url": f"http://example.com/big/{i}",
+                "publishedAt": "2024-01-01T10:00:00Z",
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def test_negotiate_honours_q_values():
+    assert negotiate("gzip") == "gzip"
+    assert negotiate("identity") is None
+    assert negotiate("") is None
+    assert negotiate("gzip;q=0, *;q=0") is None
+    assert negotiate("*") == next(iter(compression.ENCODERS))
+    assert negotiate("deflate, gzip;q=0.5") == "gzip"
+
+
+def test_negotiate_prefers_brotli_when_available():
+    pytest.importorskip("brotli")
+
+    assert negotiate("gzip, br") in ("br", "zstd")
+    assert negotiate("gzip;q=1.0, br;q=0.5") == "gzip"
+
+
+def test_large_db_responses_are_compressed(client, db_session):
+    seed_news(db_session, 40)
+    headers = {
+        "Authorization": f"Bearer {create_token()}",
+        "Accept-Encoding": "gzip",
+    }
+
+    response = client.get("/news/all?page_size=40", headers=headers)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"].startswith("W/")
+    assert len(response.json()["data"]["articles"]) == 40
+
+    revalidated = client.get(
+        "/news/all?page_size=40",
+        headers={**headers, "If-None-Match": response.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+
+
+def test_compressed_headlines_revalidate(client, news_api):
+    news_api.payload = big_payload()
+    headers = {
+        "Authorization": f"Bearer {create_token()}",
+        "Accept-Encoding": "gzip",
+    }
+
+    response = client.get("/news/headlines/country/us", headers=headers)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].startswith("W/")
+
+    revalidated = client.get(
+        "/news/headlines/country/us",
+        headers={**headers, "If-None-Match": response.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == response.headers["etag"]
+
+
+def test_small_responses_are_not_compressed(client, db_session):
+    response = client.get(
+        "/news/all?page_size=1",
+        headers={"Authorization": f"Bearer {create_token()}", "Accept-Encoding": "gzip"},
+    )
+
+    assert "content-encoding" not in response.headers
+
+
+def test_cached_payload_is_compressed_once(client, news_api, monkeypatch):
+    calls = []
+    real_compress = upstream.compress
+
+    def counting_compress(body, encoding):
+        calls.append(encoding)
+        return real_compress(body, encoding)
+
+    monkeypatch.setattr(upstream, "compress", counting_compress)
+    news_api.payload = big_payload()
+    headers = {
+        "Authorization": f"Bearer {create_token()}",
+        "Accept-Encoding": "gzip",
+    }
+
+    bodies = []
+    for _ in range(3):
+        with client.stream("GET", "/news/headlines/country/us", headers=headers) as r:
+            assert r.headers["content-encoding"] == "gzip"
+            bodies.append(b"".join(r.iter_raw()))
+
+    assert calls == ["gzip"]
+    assert bodies[0] == bodies[1] == bodies[2]
+    assert b'"data":{"status":"ok"' in gzip.decompress(bodies[0])
+    assert news_api.hits == 1
+
+
+def test_uncompressed_clients_get_identity(client, news_api):
+    news_api.payload = big_payload()
+
+    response = client.get(
+        "/news/headlines/country/us",
+        headers={
+            "Authorization": f"Bearer {create_token()}",
+            "Accept-Encoding": "identity",
+        },
+    )
+
+    assert "content-encoding" not in response.headers
+    assert not response.headers["etag"].startswith("W/")
+    assert response.json()["data"]["totalResults"] == 50
@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+from sqlalchemy import select
+from app import database
+from app.config import settings
+from app.models import News
+
+
+def test_engine_options_for_mysql(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 3)
+
+    options = database.engine_options("mysql+pymysql://u:p@localhost:3306/news")
+
+    assert options["pool_size"] == 7
+    assert options["max_overflow"] == 3
+    assert options["pool_timeout"] == settings.DB_POOL_TIMEOUT
+    assert options["pool_recycle"] == settings.DB_POOL_RECYCLE
+    assert options["pool_pre_ping"] is settings.DB_POOL_PRE_PING
+
+
+def test_engine_options_for_sqlite_skip_queue_pool_sizing():
+    options = database.engine_options("sqlite:///./news.db")
+    async_options = database.engine_options("sqlite+aiosqlite:///./news.db", True)
+
+    assert "pool_size" not in options
+    assert options["connect_args"] == {"check_same_thread": False}
+    assert "connect_args" not in async_options
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("mysql+pymysql://u:p@h:3306/db", "mysql+aiomysql://u:p@h:3306/db"),
+        ("sqlite:///./news.db", "sqlite+aiosqlite:///./news.db"),
+    ],
+)
+def test_async_database_url(monkeypatch, url, expected):
+    monkeypatch.setattr(settings, "DATABASE_URL_OVERRIDE", url)
+
+    assert settings.ASYNC_DATABASE_URL == expected
+
+
+def test_get_async_db_against_sqlite(monkeypatch, tmp_path):
+    pytest.importorskip("aiosqlite")
+    pytest.importorskip("greenlet")
+    monkeypatch.setattr(
+        settings, "DATABASE_URL_OVERRIDE", f"sqlite:///{tmp_path}/async.db"
+    )
+    monkeypatch.setattr(database, "_async_engine", None)
+    monkeypatch.setattr(database, "_AsyncSessionLocal", None)
+
+    async def run():
+        async with database.get_async_engine().begin() as conn:
+            await conn.run_sync(database.Base.metadata.create_all)
+
+        sessions = database.get_async_db()
+        db = await sessions.__anext__()
+        db.add(News(title="Async", url="http://example.com/async"))
+        await db.commit()
+        titles = (await db.scalars(select(News.title))).all()
+        await sessions.aclose()
+        await database.dispose_async_engine()
+        return titles
+
+    assert asyncio.run(run()) == ["Async"]
+    assert database._async_engine is None
@@ -0,0 +1,147 @@
+import json
+from sqlalchemy import func, insert, null, select
+from app.models import News
+from app.news.bulk_import import import_ndjson
+from app.news.dedup import backfill_hashes, distance, normalize_url, simhash, url_hash
+from app.news.ingest import save_articles
+
+TITLE = "Google claims it won half of its monopoly case, and will appeal the rest"
+DESCRIPTION = (
+    "Following a federal judge ruling that Google is effectively an unlawful "
+    "monopoly, the search company says that it will partially appeal the decision."
+)
+
+
+def article(url, title=TITLE, description=DESCRIPTION, published="2025-04-18T14:00:00Z"):
+    return {"title": title, "description": description, "url": url, "publishedAt": published}
+
+
+def count_news(db):
+    return db.scalar(select(func.count()).select_from(News))
+
+
+def test_url_variants_share_a_hash():
+    variants = [
+        "https://www.example.com/story/1/",
+        "http://example.com/story/1?utm_source=feed&utm_medium=rss",
+        "https://EXAMPLE.com:443/story/1#comments",
+    ]
+
+    assert {normalize_url(url) for url in variants} == {"example.com/story/1"}
+    assert len({url_hash(url) for url in variants}) == 1
+    assert len(url_hash(variants[0])) == 16
+    assert url_hash("https://example.com/story/2") != url_hash(variants[0])
+    assert normalize_url("https://example.com/s?b=2&a=1") == "example.com/s?a=1&b=2"
+
+
+def test_simhash_distance_tracks_similarity():
+    original = simhash(TITLE, DESCRIPTION)
+    truncated = simhash(TITLE, DESCRIPTION[:-5])
+    unrelated = simhash(
+        "Apple launches a new iPhone with a better camera and battery",
+        "The company announced a phone lineup with improved cameras on Tuesday.",
+    )
+
+    assert distance(original, simhash(TITLE, DESCRIPTION)) == 0
+    assert distance(original, truncated) <= 3
+    assert distance(original, unrelated) > 16
+    assert -(2**63) <= original < 2**63
+    # Too short to compare
+    assert simhash("Title 1", "Description 1") is None
+
+
+def test_save_articles_drops_near_duplicates(db_session):
+    save_articles(db_session, [article("https://a.example.com/google-appeal")])
+
+    saved = save_articles(
+        db_session,
+        [
+            # Same story syndicated under another url with a shorter description
+            article("https://b.example.com/news/123", description=DESCRIPTION[:-5]),
+            # Same url as the stored one, only with tracking parameters
+            article("https://a.example.com/google-appeal/?utm_source=twitter"),
+            article(
+                "https://c.example.com/iphone",
+                title="Apple launches a new iPhone with a better camera and battery",
+                description="The company announced a phone lineup on Tuesday.",
+            ),
+        ],
+    )
+
+    assert [row["url"] for row in saved] == ["https://c.example.com/iphone"]
+    assert count_news(db_session) == 2
+
+
+def test_similar_but_different_stories_are_kept(db_session):
+    description = (
+        "The hurricane made landfall early on Tuesday with strong winds and heavy "
+        "rain, and officials ordered evacuations along the {} coast."
+    )
+    stories = [
+        article(
+            f"https://news.example.com/storm-{state.lower()}",
+            title=f"Storm hits {state} coast",
+            description=description.format(state),
+        )
+        for state in ("Florida", "Texas")
+    ]
+
+    assert len(save_articles(db_session, stories)) == 2
+
+
+def test_keep_near_duplicates_skips_only_url_duplicates(db_session):
+    save_articles(db_session, [article("https://a.example.com/1")])
+
+    saved = save_articles(
+        db_session,
+        [article("https://a.example.com/1/"), article("https://b.example.com/1")],
+        keep_near_duplicates=True,
+    )
+
+    assert [row["url"] for row in saved] == ["https://b.example.com/1"]
+
+
+def test_near_duplicates_outside_the_window_are_kept(db_session):
+    save_articles(db_session, [article("https://a.example.com/1")])
+
+    saved = save_articles(
+        db_session, [article("https://b.example.com/1", published="2025-05-30T09:00:00Z")]
+    )
+
+    assert len(saved) == 1
+
+
+def test_bulk_import_counts_near_duplicates(db_session):
+    lines = [
+        json.dumps(article(f"https://mirror{i}.example.com/story")).encode()
+        for i in range(5)
+    ]
+
+    stats = import_ndjson(iter(lines), db_session.get_bind(), batch_size=2)
+
+    assert stats.inserted == 1
+    assert stats.near_duplicates == 4
+    assert count_news(db_session) == 1
+
+
+def test_backfill_hashes_fills_legacy_rows(db_session):
+    # As stored before the columns existed
+    db_session.execute(
+        insert(News).values(url_hash=null()),
+        [
+            {"url": url, "title": title, "description": description}
+            for url, title, description in (
+                ("https://a.example.com/1", TITLE, DESCRIPTION),
+                ("http://www.a.example.com/1/", TITLE, DESCRIPTION),
+                ("https://a.example.com/2", "Short", None),
+            )
+        ],
+    )
+    db_session.commit()
+
+    assert backfill_hashes(db_session.get_bind(), batch_size=2) == 2
+    rows = db_session.execute(select(News.url_hash, News.simhash).order_by(News.id)).all()
+    assert rows[0] == (url_hash("https://a.example.com/1"), simhash(TITLE, DESCRIPTION))
+    # Same normalized url as the first row
+    assert rows[1] == (None, None)
+    assert rows[2] == (url_hash("https://a.example.com/2"), None)
@@ -0,0 +1,31 @@
+import json
+from datetime import datetime
+from app.global_utils import get_response
+
+
+def test_get_response_envelope_and_headers():
+    response = get_response(
+        message="ok",
+        status=200,
+        error=False,
+        code="DONE",
+        data={"published_at": datetime(2024, 1, 1, 12, 30), 1: "non-str key"},
+    )
+
+    assert response.status_code == 200
+    assert json.loads(response.body) == {
+        "message": "ok",
+        "error": False,
+        "code": "DONE",
+        "data": {"published_at": "2024-01-01T12:30:00", "1": "non-str key"},
+    }
+    assert response.headers["access-control-allow-origin"] == "*"
+    assert response.headers["access-control-allow-methods"] == "*"
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["content-length"] == str(len(response.body))
+
+
+def test_get_response_defaults_to_generic_error():
+    body = json.loads(get_response(message="nope").body)
+
+    assert body == {"message": "nope", "error": True, "code": "GENERIC", "data": None}
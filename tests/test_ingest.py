@@ -0,0 +1,79 @@
+from sqlalchemy import event, func, insert, select
+from app.models import News
+from app.news import ingest
+from app.news.ingest import save_articles
+
+
+def make_articles(count, prefix="a"):
+    return [
+        {
+            "title": f"Title {i}",
+            "description": f"Description {i}",
+            "url": f"http://example.com/{prefix}/{i}",
+            "publishedAt": "2024-01-01T10:00:00Z",
+        }
+        for i in range(count)
+    ]
+
+
+def count_statements(engine, fn):
+    statements = []
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+    return len(statements)
+
+
+def test_round_trips_do_not_grow_with_batch_size(db_session):
+    engine = db_session.get_bind()
+    small = count_statements(
+        engine, lambda: save_articles(db_session, make_articles(3, "s"))
+    )
+    large = count_statements(
+        engine, lambda: save_articles(db_session, make_articles(100, "l"))
+    )
+
+    assert small == large == 2
+    assert db_session.scalar(select(func.count()).select_from(News)) == 103
+
+
+def test_existing_and_repeated_urls_are_skipped(db_session):
+    save_articles(db_session, make_articles(3))
+    articles = make_articles(5) + make_articles(5)
+
+    saved = save_articles(db_session, articles)
+
+    assert [row["url"] for row in saved] == [
+        "http://example.com/a/3",
+        "http://example.com/a/4",
+    ]
+    assert db_session.scalar(select(func.count()).select_from(News)) == 5
+
+
+def test_articles_without_url_or_date_are_ignored(db_session):
+    articles = make_articles(2)
+    articles[0]["url"] = None
+    del articles[1]["publishedAt"]
+
+    assert save_articles(db_session, articles) == []
+
+
+def test_rows_stored_by_a_concurrent_ingest_are_not_returned(db_session, monkeypatch):
+    articles = make_articles(2, "race")
+
+    def racing_filter(db, rows, *args):
+        # Another ingest stores the first article after the url_hash lookup
+        db.execute(insert(News), [dict(rows[0])])
+        return rows, []
+
+    monkeypatch.setattr(ingest, "drop_near_duplicates", racing_filter)
+    saved = save_articles(db_session, articles)
+
+    assert [row["url"] for row in saved] == ["http://example.com/race/1"]
+    assert db_session.scalar(select(func.count()).select_from(News)) == 2
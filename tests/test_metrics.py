@@ -0,0 +1,75 @@
+import httpx
+import pytest
+from app import metrics
+from app.constants import NEWS_API_TOP_HEADLINES
+from helpers import create_token
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    for metric in metrics.REGISTRY:
+        metric.clear()
+
+
+def scrape(client) -> dict:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in response.text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_requests_are_recorded_per_route_template(client, news_api):
+    headers = {"Authorization": f"Bearer {create_token()}"}
+    client.get("/news/headlines/country/us", headers=headers)
+    client.get("/news/headlines/country/gb", headers=headers)
+    client.get("/no-such-route")
+
+    samples = scrape(client)
+
+    route = 'route="/news/headlines/country/{country_code}",status="200"'
+    assert samples[f"http_request_duration_seconds_count{{{route}}}"] == 2
+    assert samples[f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}'] == 2
+    assert (
+        samples['http_request_duration_seconds_count{route="<unmatched>",status="404"}']
+        == 1
+    )
+    endpoint = f'endpoint="{NEWS_API_TOP_HEADLINES}"'
+    assert samples[f"newsapi_request_duration_seconds_count{{{endpoint}}}"] == 2
+    assert samples[f'newsapi_responses_total{{{endpoint},status="200"}}'] == 2
+
+
+def test_upstream_failures_are_counted_by_reason(client, news_api):
+    headers = {"Authorization": f"Bearer {create_token()}"}
+    news_api.status_code = 500
+    client.get("/news/headlines/country/us", headers=headers)
+    news_api.error = httpx.ConnectTimeout("timed out")
+    client.get("/news/headlines/country/fr", headers=headers)
+
+    samples = scrape(client)
+
+    endpoint = f'endpoint="{NEWS_API_TOP_HEADLINES}"'
+    assert samples[f'newsapi_responses_total{{{endpoint},status="500"}}'] == 1
+    assert samples[f'newsapi_errors_total{{{endpoint},reason="status"}}'] == 1
+    assert samples[f'newsapi_errors_total{{{endpoint},reason="timeout"}}'] == 1
+
+
+def test_pool_and_threadpool_gauges_are_exposed(client):
+    samples = scrape(client)
+
+    assert samples["threadpool_limit"] >= 1
+    assert samples["threadpool_busy"] >= 0
+    assert samples["db_pool_checked_out"] >= 0
+    assert "news_cache_hits_total" in samples
+
+
+def test_label_sets_are_built_once():
+    first = metrics.http_request_duration.labels("/news/", 200)
+    first.observe(0.003)
+
+    assert metrics.http_request_duration.labels("/news/", 200) is first
+    assert first.counts[metrics.LATENCY_BUCKETS.index(0.005)] == 1
@@ -1,12 +1,20 @@
+import asyncio
+import csv
+import io
+import json
+import httpx
 import pytest
-from unittest.mock import MagicMock, patch
-import requests
+from unittest.mock import MagicMock
+from sqlalchemy.orm import sessionmaker
 from app.main import app
-from app.database import get_db
+from app.database import get_db, get_read_db, get_session_factory
 from app.models import News
 from datetime import timedelta, datetime, timezone
-from jose import jwt
 from app.config import settings
+from app.constants import NEWS_API_TOP_HEADLINES
+from app.news import upstream
+from app.news.export import iterate_export, open_export
+from helpers import create_token, seed_news
 
 
 def get_token(client):
@@ -18,8 +26,21 @@ def get_token(client):
     return response.json()["data"]["access_token"]
 
 
-def test_save_latest_news(client, cleanup_db):
+def test_save_latest_news(client, news_api, cleanup_db):
     token = get_token(client)
+    news_api.payload = {
+        "status": "ok",
+        "totalResults": 2,
+        "articles": [
+            {
+                "title": f"Apple {i}",
+                "description": f"Description {i}",
+                "url": f"http://example.com/apple/{i}",
+                "publishedAt": f"2024-01-0{i}T10:00:00Z",
+            }
+            for i in range(1, 3)
+        ],
+    }
 
     response = client.post(
         "/news/save-latest", headers={"Authorization": f"Bearer {token}"}
@@ -31,6 +52,7 @@ def test_save_latest_news(client, cleanup_db):
     assert body["error"] is False
     assert len(body["data"]) <= 3
     assert all("title" in a and "url" in a for a in body["data"])
+    assert news_api.requests[0].url.params["apiKey"] == settings.API_KEY
 
 
 @pytest.fixture
@@ -38,34 +60,34 @@ def mock_db_session():
     # Mock the DB session for testing
     mock_session = MagicMock()
 
-    # Mock the query result for count()
-    mock_session.query().count.return_value = 5
-
-    # Mock the query result for fetching news articles
-    mock_news_list = [
-        News(
-            id=1,
-            title="Test News 1",
-            description="Description 1",
-            url="http://example.com/1",
-            published_at=datetime.fromisoformat("2023-01-01T12:00:00"),
+    # Mock the query result for the count
+    mock_session.query().scalar.return_value = 5
+
+    # Mock the row tuples of the selected columns
+    mock_rows = [
+        (
+            1,
+            "Test News 1",
+            "Description 1",
+            "http://example.com/1",
+            datetime.fromisoformat("2023-01-01T12:00:00"),
         ),
-        News(
-            id=2,
-            title="Test News 2",
-            description="Description 2",
-            url="http://example.com/2",
-            published_at=datetime.fromisoformat("2025-04-18T14:01:40"),
+        (
+            2,
+            "Test News 2",
+            "Description 2",
+            "http://example.com/2",
+            datetime.fromisoformat("2025-04-18T14:01:40"),
         ),
-        News(
-            id=3,
-            title="Test News 3",
-            description="Description 3",
-            url="http://example.com/3",
-            published_at=datetime.fromisoformat("2023-03-01T12:00:00"),
+        (
+            3,
+            "Test News 3",
+            "Description 3",
+            "http://example.com/3",
+            datetime.fromisoformat("2023-03-01T12:00:00"),
         ),
     ]
-    mock_session.query().order_by().offset().limit().all.return_value = mock_news_list
+    mock_session.query().order_by().offset().limit().all.return_value = mock_rows
 
     # Return the mocked session
     return mock_session
@@ -98,8 +120,7 @@ def test_get_all_news(client, mock_db_session, cleanup_db):
         assert "published_at" in article
 
 
-@patch("requests.get")
-def test_get_headlines_by_country(mock_get, client):
+def test_get_headlines_by_country(client, news_api):
     # Sample data returned by the mock API call
     token = get_token(client)
     mock_data = {
@@ -125,9 +146,8 @@ def test_get_headlines_by_country(mock_get, client):
         ],
     }
 
-    # Configure the mock response
-    mock_get.return_value.status_code = 200
-    mock_get.return_value.json.return_value = mock_data
+    # Configure the stub upstream
+    news_api.payload = mock_data
 
     # Send the GET request to the API
     response = client.get(
@@ -154,13 +174,9 @@ def test_get_headlines_by_country(mock_get, client):
     assert body["data"]["articles"][1]["title"] == "Headline 2"
 
 
-@patch("requests.get")
-def test_get_headlines_by_country_error(mock_get, client):
-    # Mocking an error response from the News API
-    mock_get.return_value.status_code = 500
-    mock_get.return_value.raise_for_status.side_effect = (
-        requests.exceptions.RequestException("API error")
-    )
+def test_get_headlines_by_country_error(client, news_api):
+    # Error response from the News API
+    news_api.status_code = 500
 
     # Send the GET request to the API
     response = client.get(
@@ -176,8 +192,7 @@ def test_get_headlines_by_country_error(mock_get, client):
     assert body["code"] == "HEADLINES_FETCH_FAILED"
 
 
-@patch("requests.get")
-def test_get_headlines_by_source_success(mock_get, client):
+def test_get_headlines_by_source_success(client, news_api):
     token = get_token(client)
     mock_response_data = {
         "status": "ok",
@@ -202,8 +217,7 @@ def test_get_headlines_by_source_success(mock_get, client):
         ],
     }
 
-    mock_get.return_value.status_code = 200
-    mock_get.return_value.json.return_value = mock_response_data
+    news_api.payload = mock_response_data
 
     response = client.get(
         "news/headlines/source/bbc-news", headers={"Authorization": f"Bearer {token}"}
@@ -219,9 +233,8 @@ def test_get_headlines_by_source_success(mock_get, client):
     assert body["data"]["articles"][0]["title"] == "Sample Headline 1"
 
 
-@patch("requests.get")
-def test_get_headlines_by_source_api_failure(mock_get, client):
-    mock_get.side_effect = requests.exceptions.RequestException("API error")
+def test_get_headlines_by_source_api_failure(client, news_api):
+    news_api.error = httpx.ConnectError("API error")
 
     response = client.get(
         "news/headlines/source/bbc-news",
@@ -235,9 +248,8 @@ def test_get_headlines_by_source_api_failure(mock_get, client):
     assert body["code"] == "HEADLINES_FETCH_FAILED"
 
 
-@patch("requests.get")
-def test_get_headlines_by_source_exception(mock_get, client):
-    mock_get.side_effect = Exception("Some unexpected error")
+def test_get_headlines_by_source_exception(client, news_api):
+    news_api.error = Exception("Some unexpected error")
 
     response = client.get(
         "news/headlines/source/bbc-news",
@@ -251,8 +263,7 @@ def test_get_headlines_by_source_exception(mock_get, client):
     assert body["code"] == "UNEXPECTED_ERROR"
 
 
-@patch("requests.get")
-def test_get_headlines_filter_success(mock_get, client):
+def test_get_headlines_filter_success(client, news_api):
     mock_response_data = {
         "status": "ok",
         "totalResults": 1,
@@ -268,8 +279,7 @@ def test_get_headlines_filter_success(mock_get, client):
         ],
     }
 
-    mock_get.return_value.status_code = 200
-    mock_get.return_value.json.return_value = mock_response_data
+    news_api.payload = mock_response_data
 
     response = client.get(
         "news/headlines/filter?source=bbc-news&country=us",
@@ -286,9 +296,8 @@ def test_get_headlines_filter_success(mock_get, client):
     assert "us" in body["message"]
 
 
-@patch("requests.get")
-def test_get_headlines_filter_api_error(mock_get, client):
-    mock_get.side_effect = requests.exceptions.RequestException("Timeout")
+def test_get_headlines_filter_api_error(client, news_api):
+    news_api.error = httpx.ReadTimeout("Timeout")
 
     response = client.get(
         "news/headlines/filter?source=bbc-news&country=us",
@@ -302,9 +311,8 @@ def test_get_headlines_filter_api_error(mock_get, client):
     assert body["code"] == "HEADLINES_FETCH_FAILED"
 
 
-@patch("requests.get")
-def test_get_headlines_filter_unexpected_error(mock_get, client):
-    mock_get.side_effect = Exception("Boom")
+def test_get_headlines_filter_unexpected_error(client, news_api):
+    news_api.error = Exception("Boom")
 
     response = client.get(
         "news/headlines/filter?source=bbc-news&country=us",
@@ -318,12 +326,6 @@ def test_get_headlines_filter_unexpected_error(mock_get, client):
     assert body["code"] == "UNEXPECTED_ERROR"
 
 
-def create_token(exp_delta_minutes=15):
-    expire = datetime.now(timezone.utc) + timedelta(minutes=exp_delta_minutes)
-    payload = {"sub": settings.CLIENT_ID, "exp": expire}
-    return jwt.encode(payload, settings.SECRET_KEY, algorithm="HS256")
-
-
 def test_protected_news_route_with_valid_token(client):
     token = create_token()
     response = client.get(
@@ -355,3 +357,635 @@ def test_protected_news_route_with_invalid_token(client):
     assert response.status_code == 401
     body = response.json()
     assert body["detail"] == "Invalid token"
+
+
+def test_headlines_are_served_from_cache(client, news_api):
+    token = create_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    news_api.payload = {"status": "ok", "totalResults": 0, "articles": []}
+
+    first = client.get("/news/headlines/country/US", headers=headers)
+    second = client.get("/news/headlines/country/us", headers=headers)
+
+    assert first.json() == second.json()
+    assert news_api.hits == 1
+
+    stats = client.get("/news/cache/stats", headers=headers).json()
+    assert stats["code"] == "CACHE_STATS_FETCHED"
+    assert stats["data"]["hits"] == 1
+    assert stats["data"]["misses"] == 1
+
+
+def test_upstream_errors_are_not_cached(client, news_api):
+    headers = {"Authorization": f"Bearer {create_token()}"}
+    news_api.status_code = 500
+    client.get("/news/?q=tesla", headers=headers)
+    news_api.status_code = 200
+    response = client.get("/news/?q=tesla", headers=headers)
+
+    assert response.json()["code"] == "NEWS_FETCHED"
+    assert news_api.hits == 2
+
+
+def fire_concurrently(path, count, token):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            return await asyncio.gather(
+                *[
+                    ac.get(path, headers={"Authorization": f"Bearer {token}"})
+                    for _ in range(count)
+                ]
+            )
+
+    return asyncio.run(run())
+
+
+def test_concurrent_identical_requests_share_one_upstream_call(client, news_api):
+    news_api.latency = 0.05
+    news_api.payload = {"status": "ok", "totalResults": 0, "articles": []}
+
+    responses = fire_concurrently("/news/headlines/country/us", 50, create_token())
+
+    assert all(r.status_code == 200 for r in responses)
+    assert all(r.json()["data"]["status"] == "ok" for r in responses)
+    assert news_api.hits == 1
+
+
+def test_concurrent_identical_requests_share_upstream_error(client, news_api):
+    news_api.latency = 0.05
+    news_api.status_code = 503
+
+    responses = fire_concurrently("/news/?q=apple", 20, create_token())
+
+    assert all(r.json()["code"] == "NEWS_FETCH_FAILED" for r in responses)
+    assert news_api.hits == 1
+
+
+def test_distinct_params_are_not_coalesced(client, news_api):
+    news_api.latency = 0.02
+    token = create_token()
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            headers = {"Authorization": f"Bearer {token}"}
+            return await asyncio.gather(
+                ac.get("/news/headlines/country/us", headers=headers),
+                ac.get("/news/headlines/country/gb", headers=headers),
+            )
+
+    asyncio.run(run())
+    assert news_api.hits == 2
+
+
+def test_get_all_news_cursor_pagination(client, db_session):
+    seed_news(db_session, 25)
+    headers = {"Authorization": f"Bearer {create_token()}"}
+
+    seen, cursor, pages = [], "", 0
+    while cursor is not None:
+        body = client.get(
+            "/news/all", params={"cursor": cursor, "page_size": 10}, headers=headers
+        ).json()
+        assert body["code"] == "ALL_NEWS_FETCHED"
+        assert "total" not in body["data"]
+        seen.extend(a["id"] for a in body["data"]["articles"])
+        cursor = body["data"]["next_cursor"]
+        pages += 1
+
+    assert pages == 3
+    assert len(seen) == len(set(seen)) == 25
+
+    offset_ids = []
+    for page in range(1, 4):
+        body = client.get(
+            "/news/all", params={"page": page, "page_size": 10}, headers=headers
+        ).json()
+        offset_ids.extend(a["id"] for a in body["data"]["articles"])
+    assert seen == offset_ids
+
+
+def test_get_all_news_fields_projection(client, db_session):
+    seed_news(db_session, 5)
+    headers = {"Authorization": f"Bearer {create_token()}"}
+
+    offset = client.get("/news/all?page_size=3&fields=url,id", headers=headers).json()
+    keyset = client.get("/news/all?cursor=&page_size=3&fields=title", headers=headers)
+
+    assert [list(a) for a in offset["data"]["articles"]] == [["url", "id"]] * 3
+    assert [list(a) for a in keyset.json()["data"]["articles"]] == [["title"]] * 3
+    # The cursor still works without id and published_at in the output
+    rest = client.get(
+        "/news/all",
+        params={"cursor": keyset.json()["data"]["next_cursor"], "fields": "title"},
+        headers=headers,
+    ).json()
+    assert len(rest["data"]["articles"]) == 2
+
+
+def test_get_all_news_unknown_field(client, db_session):
+    response = client.get(
+        "/news/all?fields=id,secret",
+        headers={"Authorization": f"Bearer {create_token()}"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["code"] == "INVALID_FIELDS"
+    assert "secret" in response.json()["message"]
+
+
+def test_get_all_news_invalid_cursor(client, db_session):
+    response = client.get(
+        "/news/all?cursor=not-a-cursor",
+        headers={"Authorization": f"Bearer {create_token()}"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["code"] == "INVALID_CURSOR"
+
+
+def test_get_all_news_rejects_invalid_page_size(client, db_session):
+    headers = {"Authorization": f"Bearer {create_token()}"}
+
+    for query in ("cursor=&page_size=0", "page_size=101", "page=0"):
+        assert client.get(f"/news/all?{query}", headers=headers).status_code == 422
+
+
+def test_save_latest_news_with_query_and_batch_size(client, news_api, db_session):
+    news_api.payload = {
+        "status": "ok",
+        "totalResults": 10,
+        "articles": [
+            {
+                "title": f"Tesla {i}",
+                "description": None,
+                "url": f"http://example.com/tesla/{i}",
+                "publishedAt": "2024-02-01T10:00:00Z",
+            }
+            for i in range(10)
+        ],
+    }
+
+    response = client.post(
+        "/news/save-latest?q=tesla&batch_size=5",
+        headers={"Authorization": f"Bearer {create_token()}"},
+    )
+
+    body = response.json()
+    assert body["message"] == "Top 5 articles saved successfully"
+    assert len(body["data"]) == 5
+    params = news_api.requests[0].url.params
+    assert params["q"] == "tesla"
+    assert params["pageSize"] == "5"
+
+
+RAW_UPSTREAM_BODY = (
+    b'{"status": "ok",  "totalResults": 1, "articles": [{"title": "Caf\xc3\xa9 \\u2603",'
+    b' "url": "http://example.com/raw", "score": 1.50}]}'
+)
+
+
+def test_upstream_body_is_passed_through_verbatim(client, news_api):
+    news_api.body = RAW_UPSTREAM_BODY
+
+    response = client.get(
+        "/news/headlines/source/bbc-news",
+        headers={"Authorization": f"Bearer {create_token()}"},
+    )
+
+    assert response.status_code == 200
+    assert response.content == (
+        b'{"message":"Top headlines for source: bbc-news","error":false,'
+        b'"code":"TOP_HEADLINES_FETCHED","data":' + RAW_UPSTREAM_BODY + b"}"
+    )
+    assert response.json()["data"]["articles"][0]["title"] == "Caf\u00e9 \u2603"
+
+
+def test_upstream_body_is_streamed_when_not_cached(client, news_api, monkeypatch):
+    monkeypatch.setitem(upstream.CACHE_TTLS, NEWS_API_TOP_HEADLINES, 0)
+    news_api.body = RAW_UPSTREAM_BODY
+    headers = {"Authorization": f"Bearer {create_token()}"}
+
+    with client.stream("GET", "/news/headlines/country/us", headers=headers) as r:
+        assert r.status_code == 200
+        assert r.headers["access-control-allow-origin"] == "*"
+        body = r.read()
+
+    assert body.endswith(b'"data":' + RAW_UPSTREAM_BODY + b"}")
+    assert client.get("/news/headlines/country/us", headers=headers).content == body
+    assert news_api.hits == 2
+
+
+def test_streamed_upstream_error_keeps_error_envelope(client, news_api, monkeypatch):
+    monkeypatch.setitem(upstream.CACHE_TTLS, NEWS_API_TOP_HEADLINES, 0)
+    news_api.status_code = 502
+
+    response = client.get(
+        "/news/headlines/country/us",
+        headers={"Authorization": f"Bearer {create_token()}"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["code"] == "HEADLINES_FETCH_FAILED"
+
+
+def test_non_json_upstream_body_is_rejected(client, news_api, monkeypatch):
+    async def html(request):
+        return httpx.Response(200, content=b"<html>maintenance</html>")
+
+    monkeypatch.setattr(
+        upstream, "_client", upstream.create_client(httpx.MockTransport(html))
+    )
+
+    response = client.get(
+        "/news/?q=apple", headers={"Authorization": f"Bearer {create_token()}"}
+    )
+
+    assert response.json()["code"] == "NEWS_FETCH_FAILED"
+
+
+def add_articles(db, rows):
+    db.add_all(
+        News(
+            title=title,
+            description=description,
+            url=f"http://example.com/search/{i}",
+            published_at=datetime(2024, 1, 1) + timedelta(hours=i),
+        )
+        for i, (title, description) in enumerate(rows)
+    )
+    db.commit()
+
+
+def test_search_ranks_by_relevance(client, db_session):
+    add_articles(
+        db_session,
+        [
+            ("Markets rally", "Stocks close higher on tech earnings"),
+            ("Apple unveils new iPhone", "Apple announced the iPhone at an Apple event"),
+            ("Fruit prices", "Apple and banana prices rise"),
+        ],
+    )
+
+    body = client.get(
+        "/news/search?q=apple",
+        headers={"Authorization": f"Bearer {create_token()}"},
+    ).json()
+
+    assert body["code"] == "SEARCH_RESULTS_FETCHED"
+    titles = [a["title"] for a in body["data"]["articles"]]
+    assert titles == ["Apple unveils new iPhone", "Fruit prices"]
+    scores = [a["score"] for a in body["data"]["articles"]]
+    assert scores == sorted(scores, reverse=True)
+    assert body["data"]["next_cursor"] is None
+
+
+def test_search_cursor_pagination(client, db_session):
+    add_articles(db_session, [(f"Election update {i}", "Results") for i in range(7)])
+    headers = {"Authorization": f"Bearer {create_token()}"}
+
+    seen, cursor = [], ""
+    while cursor is not None:
+        data = client.get(
+            "/news/search",
+            params={"q": "election", "page_size": 3, "cursor": cursor},
+            headers=headers,
+        ).json()["data"]
+        seen.extend(a["id"] for a in data["articles"])
+        cursor = data["next_cursor"]
+
+    assert len(seen) == len(set(seen)) == 7
+
+
+def test_search_rejects_blank_query(client, db_session):
+    response = client.get(
+        "/news/search",
+        params={"q": "   "},
+        headers={"Authorization": f"Bearer {create_token()}"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["code"] == "INVALID_QUERY"
+
+
+def test_search_on_async_session(client, db_session, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    pytest.importorskip("greenlet")
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    add_articles(db_session, [("Apple unveils new iPhone", "Apple event")])
+    # No pooling: the connection must not outlive the test client's event loop
+    async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+
+    async def async_db():
+        async with AsyncSession(async_engine) as db:
+            yield db
+
+    monkeypatch.setitem(app.dependency_overrides, get_read_db, async_db)
+    body = client.get(
+        "/news/search?q=apple", headers={"Authorization": f"Bearer {create_token()}"}
+    ).json()
+
+    assert body["code"] == "SEARCH_RESULTS_FETCHED"
+    assert [a["title"] for a in body["data"]["articles"]] == ["Apple unveils new iPhone"]
+
+
+def test_search_index_follows_inserts_updates_and_deletes(client, db_session):
+    headers = {"Authorization": f"Bearer {create_token()}"}
+    add_articles(db_session, [("Quantum computing milestone", "Qubits")])
+
+    def search(term):
+        response = client.get("/news/search", params={"q": term}, headers=headers)
+        return [a["title"] for a in response.json()["data"]["articles"]]
+
+    assert search("quantum") == ["Quantum computing milestone"]
+
+    news = db_session.query(News).one()
+    news.title = "Fusion energy milestone"
+    db_session.commit()
+    assert search("quantum") == []
+    assert search("fusion") == ["Fusion energy milestone"]
+
+    db_session.delete(news)
+    db_session.commit()
+    assert search("fusion") == []
+
+
+def test_search_query_syntax_is_escaped(client, db_session):
+    add_articles(db_session, [('Apple "AI" push', "NEAR OR AND")])
+
+    response = client.get(
+        "/news/search",
+        params={"q": 'apple "AI" OR NEAR('},
+        headers={"Authorization": f"Bearer {create_token()}"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["code"] == "SEARCH_RESULTS_FETCHED"
+
+
+def articles_for_day(request):
+    day = request.url.params["from"]
+    return {
+        "status": "ok",
+        "totalResults": 2,
+        "articles": [
+            {
+                "title": f"{day} story {i}",
+                "description": None,
+                "url": f"http://example.com/{day}/{i}",
+                "publishedAt": f"{day}T1{i}:00:00Z",
+            }
+            for i in range(2)
+        ],
+    }
+
+
+def test_read_through_serves_ingested_days_from_database(client, news_api, db_session):
+    news_api.payload = articles_for_day
+    headers = {"Authorization": f"Bearer {create_token()}"}
+    url = "/news/?q=Apple&from=2024-01-01&to=2024-01-03&read_through=true"
+
+    first = client.get(url, headers=headers).json()
+    assert first["code"] == "NEWS_FETCHED"
+    assert first["data"]["sources"] == {
+        "database": [],
+        "upstream": ["2024-01-01", "2024-01-02", "2024-01-03"],
+    }
+    assert news_api.hits == 3
+
+    upstream.response_cache.clear()
+    second = client.get(url.replace("Apple", "apple"), headers=headers).json()
+    assert second["data"]["sources"] == {
+        "database": ["2024-01-01", "2024-01-02", "2024-01-03"],
+        "upstream": [],
+    }
+    assert news_api.hits == 3
+    assert second["data"]["articles"] == first["data"]["articles"]
+    assert second["data"]["totalResults"] == 6
+    assert second["data"]["articles"][0]["url"] == "http://example.com/2024-01-03/1"
+
+
+def test_read_through_fetches_only_missing_days(client, news_api, db_session):
+    news_api.payload = articles_for_day
+    headers = {"Authorization": f"Bearer {create_token()}"}
+    client.get(
+        "/news/?q=apple&from=2024-01-02&to=2024-01-02&read_through=true",
+        headers=headers,
+    )
+
+    body = client.get(
+        "/news/?q=apple&from=2024-01-01&to=2024-01-03&read_through=true",
+        headers=headers,
+    ).json()
+
+    assert body["data"]["sources"] == {
+        "database": ["2024-01-02"],
+        "upstream": ["2024-01-01", "2024-01-03"],
+    }
+    fetched_days = [r.url.params["from"] for r in news_api.requests]
+    assert sorted(fetched_days) == ["2024-01-01", "2024-01-02", "2024-01-03"]
+
+
+def test_read_through_never_records_today(client, news_api, db_session):
+    news_api.payload = articles_for_day
+    headers = {"Authorization": f"Bearer {create_token()}"}
+    today = datetime.now(timezone.utc).date().isoformat()
+    url = f"/news/?q=apple&from={today}&to={today}&read_through=true"
+
+    client.get(url, headers=headers)
+    upstream.response_cache.clear()
+    body = client.get(url, headers=headers).json()
+
+    assert body["data"]["sources"]["upstream"] == [today]
+    assert news_api.hits == 2
+
+
+def test_read_through_pages_and_records_only_complete_days(
+    client, news_api, db_session, monkeypatch
+):
+    monkeypatch.setattr(settings, "NEWS_READ_THROUGH_PAGE_SIZE", 2)
+    monkeypatch.setattr(settings, "NEWS_READ_THROUGH_MAX_PAGES", 2)
+
+    def paged(request):
+        day, page = request.url.params["from"], int(request.url.params.get("page", 1))
+        # 2024-01-01 has 3 results, 2024-01-02 has 5: more than two pages of 2
+        total = 3 if day == "2024-01-01" else 5
+        return {
+            "status": "ok",
+            "totalResults": total,
+            "articles": [
+                {
+                    "title": f"{day} story {i}",
+                    "description": None,
+                    "url": f"http://example.com/{day}/{i}",
+                    "publishedAt": f"{day}T1{i}:00:00Z",
+                }
+                for i in range((page - 1) * 2, min(page * 2, total))
+            ],
+        }
+
+    news_api.payload = paged
+    headers = {"Authorization": f"Bearer {create_token()}"}
+    url = "/news/?q=apple&from=2024-01-01&to=2024-01-02&read_through=true"
+
+    first = client.get(url, headers=headers).json()["data"]
+    assert first["totalResults"] == 8
+    assert len(first["articles"]) == 7
+
+    upstream.response_cache.clear()
+    second = client.get(url, headers=headers).json()["data"]
+    # The truncated day is not answered from the database
+    assert second["sources"] == {"database": ["2024-01-01"], "upstream": ["2024-01-02"]}
+    assert second["totalResults"] == 8
+
+
+def test_get_news_opens_a_session_only_for_read_through(
+    client, news_api, db_session, monkeypatch
+):
+    session_factory = sessionmaker(bind=db_session.get_bind())
+    opened = []
+
+    async def counting_factory():
+        def factory():
+            opened.append(1)
+            return session_factory()
+
+        return factory
+
+    monkeypatch.setitem(app.dependency_overrides, get_session_factory, counting_factory)
+    headers = {"Authorization": f"Bearer {create_token()}"}
+
+    client.get("/news/?q=apple", headers=headers)
+    assert opened == []
+    client.get(
+        "/news/?q=apple&from=2024-01-01&to=2024-01-01&read_through=true", headers=headers
+    )
+    assert opened == [1]
+
+
+def test_read_through_rejects_oversized_ranges(client, news_api, db_session):
+    response = client.get(
+        "/news/?q=apple&from=2024-01-01&to=2024-06-01&read_through=true",
+        headers={"Authorization": f"Bearer {create_token()}"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["code"] == "INVALID_DATE_RANGE"
+    assert news_api.hits == 0
+
+
+def test_get_all_news_conditional_get(client, db_session):
+    seed_news(db_session, 3)
+    headers = {"Authorization": f"Bearer {create_token()}"}
+
+    first = client.get("/news/all?page=1&page_size=2", headers=headers)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    cached = client.get(
+        "/news/all?page=1&page_size=2", headers={**headers, "If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    other_page = client.get("/news/all?page=2&page_size=2", headers=headers)
+    assert other_page.headers["etag"] != etag
+
+    late = News(
+        title="Late backfill",
+        url="http://example.com/late",
+        published_at=datetime(2020, 1, 1),
+    )
+    db_session.add(late)
+    db_session.commit()
+    changed = client.get(
+        "/news/all?page=1&page_size=2", headers={**headers, "If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_headlines_conditional_get(client, news_api):
+    headers = {"Authorization": f"Bearer {create_token()}"}
+    news_api.payload = {"status": "ok", "totalResults": 0, "articles": []}
+
+    first = client.get("/news/headlines/country/us", headers=headers)
+    etag = first.headers["etag"]
+    ttl = int(settings.NEWS_CACHE_TTL_HEADLINES)
+    assert first.headers["cache-control"] == f"private, max-age={ttl}"
+
+    cached = client.get(
+        "/news/headlines/country/us",
+        headers={**headers, "If-None-Match": f'W/{etag}, "other"'},
+    )
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert news_api.hits == 1
+
+    upstream.response_cache.clear()
+    news_api.payload = {"status": "ok", "totalResults": 1, "articles": []}
+    changed = client.get(
+        "/news/headlines/country/us", headers={**headers, "If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_export_streams_ndjson(client, db_session, monkeypatch):
+    seed_news(db_session, 25)
+    monkeypatch.setattr(settings, "NEWS_EXPORT_BATCH_SIZE", 10)
+
+    response = client.get(
+        "/news/export", headers={"Authorization": f"Bearer {create_token()}"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 25
+    assert set(rows[0]) == {"id", "title", "description", "url", "published_at"}
+    assert [r["published_at"] for r in rows] == sorted(r["published_at"] for r in rows)
+
+
+def test_export_csv_with_published_at_range(client, db_session):
+    seed_news(db_session, 10)
+
+    response = client.get(
+        "/news/export",
+        params={
+            "format": "csv",
+            "from": "2024-01-01T12:01:00",
+            "to": "2024-01-01T12:03:00",
+        },
+        headers={"Authorization": f"Bearer {create_token()}"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "title", "description", "url", "published_at"]
+    assert [r[4] for r in rows[1:]] == ["2024-01-01T12:01:00"] * 2 + [
+        "2024-01-01T12:02:00"
+    ] * 2
+
+
+def test_export_uses_row_tuples_and_closes_cursor_on_disconnect(db_session):
+    seed_news(db_session, 30)
+    chunks = open_export(db_session, "ndjson", batch_size=10)
+
+    async def read_one_then_disconnect():
+        stream = iterate_export(chunks)
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    first = asyncio.run(read_one_then_disconnect())
+
+    assert len(first.splitlines()) == 10
+    assert len(db_session.identity_map) == 0
+    # Closing the stream finished the generator, which closed its result
+    assert chunks.gi_frame is None
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import pytest
+from app.news import cache, quota, upstream
+from app.news.quota import INGESTION, INTERACTIVE, WARMUP, QuotaManager
+from helpers import create_token
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock(quota)
+
+
+def drain(manager, priority):
+    granted = 0
+    while manager.try_acquire(priority) == 0:
+        granted += 1
+    return granted
+
+
+def test_lower_priorities_leave_a_reserve(clock):
+    manager = QuotaManager([(10, 100)], {INTERACTIVE: 0.2, WARMUP: 0.5})
+
+    assert drain(manager, WARMUP) == 5
+    assert drain(manager, INTERACTIVE) == 3
+    assert drain(manager, INGESTION) == 2
+    assert manager.stats()["denied"] == {WARMUP: 1, INTERACTIVE: 1, INGESTION: 1}
+
+
+def test_buckets_refill_over_their_window(clock):
+    manager = QuotaManager([(10, 100), (2, 10)], {})
+
+    assert drain(manager, INGESTION) == 2
+    wait = manager.try_acquire(INGESTION)
+    assert wait == pytest.approx(5)
+    clock.now += wait
+    assert manager.try_acquire(INGESTION) == 0
+
+
+def test_parse_retry_after():
+    assert quota.parse_retry_after("120") == 120
+    assert quota.parse_retry_after(None) == quota.DEFAULT_RETRY_AFTER
+    assert quota.parse_retry_after("soon") == quota.DEFAULT_RETRY_AFTER
+    later = datetime.now(timezone.utc) + timedelta(seconds=300)
+    assert 290 < quota.parse_retry_after(format_datetime(later, usegmt=True)) <= 300
+
+
+def test_upstream_429_blocks_calls_until_retry_after(client, news_api):
+    headers = {"Authorization": f"Bearer {create_token()}"}
+    news_api.status_code = 429
+
+    first = client.get("/news/headlines/country/us", headers=headers)
+    news_api.status_code = 200
+    second = client.get("/news/headlines/country/gb", headers=headers)
+
+    for response in (first, second):
+        assert response.status_code == 429
+        assert response.json()["code"] == "NEWS_QUOTA_EXCEEDED"
+        assert int(response.headers["retry-after"]) > 0
+    assert news_api.hits == 1
+
+
+def test_expired_entry_is_served_when_budget_is_spent(client, news_api, fake_clock):
+    headers = {"Authorization": f"Bearer {create_token()}"}
+    news_api.payload = {"status": "ok", "totalResults": 1, "articles": [{"title": "Old"}]}
+    client.get("/news/headlines/country/us", headers=headers)
+
+    # Past the stale window and out of budget
+    fake_clock(cache, now=cache.monotonic() + 10_000)
+    upstream.quota.block(60)
+    response = client.get("/news/headlines/country/us", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["data"]["articles"] == [{"title": "Old"}]
+    assert news_api.hits == 1
+
+
+def test_interactive_burst_does_not_starve_ingestion(client, news_api, monkeypatch):
+    monkeypatch.setattr(
+        upstream, "quota", QuotaManager([(5, 86400)], {INTERACTIVE: 0.4})
+    )
+    headers = {"Authorization": f"Bearer {create_token()}"}
+
+    statuses = [
+        client.get(f"/news/headlines/country/c{i}", headers=headers).status_code
+        for i in range(5)
+    ]
+    saved = client.post("/news/save-latest", headers=headers)
+
+    assert statuses == [200, 200, 200, 429, 429]
+    assert saved.status_code != 429
+    assert upstream.quota.stats()["granted"] == {INTERACTIVE: 3, INGESTION: 1}
@@ -0,0 +1,143 @@
+import asyncio
+from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+from app.constants import NEWS_API_URL_EVERYTHING, NEWS_API_TOP_HEADLINES
+from app.models import FeedWatermark, News
+from app.news.scheduler import Feed, IngestScheduler
+
+
+def article(i, published_at):
+    return {
+        "title": f"Title {i}",
+        "description": None,
+        "url": f"http://example.com/feed/{i}",
+        "publishedAt": published_at,
+    }
+
+
+def make_scheduler(db_session, feeds, **kwargs):
+    session_factory = sessionmaker(bind=db_session.get_bind())
+    return IngestScheduler(feeds, session_factory, **kwargs)
+
+
+def test_ingest_feed_advances_watermark(client, news_api, db_session):
+    feed = Feed("q:apple", NEWS_API_URL_EVERYTHING, {"q": "apple"})
+    scheduler = make_scheduler(db_session, [feed])
+    news_api.payload = {
+        "status": "ok",
+        "articles": [
+            article(1, "2024-01-01T10:00:00Z"),
+            article(2, "2024-01-01T11:00:00Z"),
+        ],
+    }
+
+    assert asyncio.run(scheduler.ingest_feed(feed)) == 2
+    assert "from" not in news_api.requests[0].url.params
+    watermark = db_session.get(FeedWatermark, "q:apple")
+    assert watermark.published_at == datetime(2024, 1, 1, 11, 0, 0)
+
+    news_api.payload["articles"].append(article(3, "2024-01-01T12:00:00Z"))
+    assert asyncio.run(scheduler.ingest_feed(feed)) == 1
+    assert news_api.requests[1].url.params["from"] == "2024-01-01T11:00:00"
+    assert db_session.scalar(select(func.count()).select_from(News)) == 3
+
+
+def test_headline_feeds_filter_older_articles_locally(client, news_api, db_session):
+    feed = Feed("country:us", NEWS_API_TOP_HEADLINES, {"country": "us"})
+    scheduler = make_scheduler(db_session, [feed])
+    news_api.payload = {"status": "ok", "articles": [article(1, "2024-01-02T10:00:00Z")]}
+    asyncio.run(scheduler.ingest_feed(feed))
+
+    news_api.payload["articles"] = [
+        article(2, "2024-01-01T10:00:00Z"),
+        article(3, "2024-01-03T10:00:00Z"),
+    ]
+    assert asyncio.run(scheduler.ingest_feed(feed)) == 1
+    assert "from" not in news_api.requests[1].url.params
+    urls = set(db_session.scalars(select(News.url)))
+    assert "http://example.com/feed/2" not in urls
+
+
+def test_scheduler_runs_feeds_and_stops_cleanly(client, news_api, db_session):
+    feeds = [
+        Feed(f"q:{q}", NEWS_API_URL_EVERYTHING, {"q": q}) for q in ("a", "b", "c")
+    ]
+    scheduler = make_scheduler(
+        db_session, feeds, interval=0.01, jitter=0.01, concurrency=1
+    )
+
+    async def run():
+        scheduler.start()
+        await asyncio.sleep(0.2)
+        tasks = list(scheduler._tasks)
+        await scheduler.stop()
+        return tasks
+
+    tasks = asyncio.run(run())
+    assert all(task.done() for task in tasks)
+    queried = {r.url.params["q"] for r in news_api.requests}
+    assert queried == {"a", "b", "c"}
+
+
+def test_ingest_feed_pages_back_to_the_watermark(client, news_api, db_session):
+    feed = Feed("q:apple", NEWS_API_URL_EVERYTHING, {"q": "apple"})
+    scheduler = make_scheduler(db_session, [feed], page_size=2)
+    news_api.payload = {"status": "ok", "articles": [article(0, "2024-01-01T10:00:00Z")]}
+    asyncio.run(scheduler.ingest_feed(feed))
+
+    # Five articles arrived since the last cycle, more than one page holds
+    newest_first = [article(i, f"2024-01-01T1{i}:00:00Z") for i in range(5, -1, -1)]
+
+    def payload(request):
+        page = int(request.url.params.get("page", 1))
+        return {"status": "ok", "articles": newest_first[(page - 1) * 2:page * 2]}
+
+    news_api.payload = payload
+    assert asyncio.run(scheduler.ingest_feed(feed)) == 5
+    assert [r.url.params.get("page") for r in news_api.requests[1:]] == [None, "2", "3"]
+    assert db_session.scalar(select(func.count()).select_from(News)) == 6
+    watermark = db_session.get(FeedWatermark, "q:apple")
+    assert watermark.published_at == datetime(2024, 1, 1, 15, 0, 0)
+
+
+def test_ingest_feed_resumes_a_gap_left_when_pages_run_out(client, news_api, db_session):
+    feed = Feed("q:apple", NEWS_API_URL_EVERYTHING, {"q": "apple"})
+    scheduler = make_scheduler(db_session, [feed], page_size=2, max_pages=2)
+    news_api.payload = {"status": "ok", "articles": [article(0, "2024-01-01T10:00:00Z")]}
+    asyncio.run(scheduler.ingest_feed(feed))
+
+    # Six new articles, more than two pages of two reach back to
+    newest_first = [article(i, f"2024-01-01T1{i}:00:00Z") for i in range(6, -1, -1)]
+
+    def payload(request):
+        params = request.url.params
+        until = params.get("to", "9999")
+        matching = [
+            a for a in newest_first
+            if params["from"] <= a["publishedAt"][:19] <= until
+        ]
+        page = int(params.get("page", 1))
+        return {"status": "ok", "articles": matching[(page - 1) * 2:page * 2]}
+
+    news_api.payload = payload
+    assert asyncio.run(scheduler.ingest_feed(feed)) == 4
+    mark = db_session.get(FeedWatermark, "q:apple")
+    assert mark.published_at == datetime(2024, 1, 1, 16, 0, 0)
+    assert (mark.gap_from, mark.gap_to) == (
+        datetime(2024, 1, 1, 10, 0, 0),
+        datetime(2024, 1, 1, 13, 0, 0),
+    )
+
+    # The next cycle finds nothing newer, then fills the gap from its oldest end
+    assert asyncio.run(scheduler.ingest_feed(feed)) == 2
+    gap_params = news_api.requests[-1].url.params
+    assert (gap_params["from"], gap_params["to"]) == (
+        "2024-01-01T10:00:00",
+        "2024-01-01T13:00:00",
+    )
+    assert db_session.scalar(select(func.count()).select_from(News)) == 7
+    db_session.expire_all()
+    mark = db_session.get(FeedWatermark, "q:apple")
+    assert mark.published_at == datetime(2024, 1, 1, 16, 0, 0)
+    assert (mark.gap_from, mark.gap_to) == (None, None)
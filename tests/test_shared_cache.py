@@ -0,0 +1,185 @@
+import asyncio
+import pytest
+from app.news import cache as cache_module, shared_cache
+from app.news.cache import ResponseCache, make_key
+from app.news.shared_cache import RedisBackend, SharedCache, SQLiteBackend
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the subset of redis.asyncio the backend uses.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.data = {}
+
+    def _live(self, key):
+        item = self.data.get(key)
+        if item is not None and item[1] <= self.clock():
+            del self.data[key]
+            item = None
+        return item
+
+    async def get(self, key):
+        item = self._live(key)
+        return None if item is None else item[0]
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and self._live(key) is not None:
+            return None
+        self.data[key] = (value, self.clock() + px / 1000)
+        return True
+
+    async def exists(self, key):
+        return int(self._live(key) is not None)
+
+    async def delete(self, key):
+        return int(self.data.pop(key, None) is not None)
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def clock(fake_clock, monkeypatch):
+    clock = fake_clock(shared_cache, "time", now=1_700_000_000.0)
+    # ResponseCache checks the expiry of shared entries on the same wall clock
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def new_backend(request, tmp_path, clock):
+    """
+    Returns a factory; every backend it makes sees the same store, like the
+    workers of one deployment.
+    """
+    redis = FakeRedis(clock)
+    backends = []
+
+    def make(max_bytes=1 << 20):
+        if request.param == "sqlite":
+            backend = SQLiteBackend(str(tmp_path / "cache.db"), max_bytes)
+        else:
+            backend = RedisBackend(redis)
+        backends.append(backend)
+        return backend
+
+    yield make
+    for backend in backends:
+        asyncio.run(backend.close())
+
+
+def worker(backend, stale_ttl=60, retain=300):
+    return SharedCache(backend, stale_ttl=stale_ttl, retain=retain, lease_seconds=2)
+
+
+def test_get_or_set_is_atomic(new_backend, clock):
+    first, second = new_backend(), new_backend()
+
+    async def run():
+        claimed = await first.get_or_set("lease", b"a", 10)
+        taken = await second.get_or_set("lease", b"b", 10)
+        clock.now += 11
+        reclaimed = await second.get_or_set("lease", b"b", 10)
+        return claimed, taken, reclaimed
+
+    assert asyncio.run(run()) == (b"a", b"a", b"b")
+
+
+def test_workers_fetch_a_key_once(new_backend):
+    a, b = worker(new_backend()), worker(new_backend())
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return b"payload"
+
+    async def run():
+        return await asyncio.gather(
+            a.get_or_fetch("k", 30, fetch), b.get_or_fetch("k", 30, fetch)
+        )
+
+    first, second = asyncio.run(run())
+    assert first.value == second.value == b"payload"
+    assert len(calls) == 1
+    assert a.waits + b.waits == 1
+
+
+def test_ttl_stale_and_retention(new_backend, clock):
+    cache = worker(new_backend(), stale_ttl=60, retain=300)
+
+    async def run():
+        await cache.store("k", b"v", 30)
+        states = [(await cache.lookup("k")).is_fresh(clock.now)]
+        clock.now += 45
+        entry = await cache.lookup("k")
+        states.append((entry.is_fresh(clock.now), entry.is_usable(clock.now)))
+        clock.now += 100
+        states.append(await cache.peek("k"))
+        clock.now += 300
+        states.append(await cache.peek("k"))
+        return states
+
+    assert asyncio.run(run()) == [True, (False, True), b"v", None]
+
+
+def test_sqlite_evicts_soonest_expiring_over_budget(tmp_path, clock):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"), max_bytes=250)
+    cache = worker(backend)
+
+    async def run():
+        for key, ttl in (("short", 10), ("long", 100), ("medium", 50)):
+            await cache.store(key, b"x" * 100, ttl)
+        values = [await cache.peek(key) for key in ("short", "medium", "long")]
+        await backend.close()
+        return values
+
+    assert asyncio.run(run()) == [None, b"x" * 100, b"x" * 100]
+    assert backend.evictions == 1
+
+
+def test_backend_errors_fall_back_to_fetching():
+    class BrokenBackend:
+        evictions = 0
+
+        async def _fail(self, *args):
+            raise ConnectionError("cache down")
+
+        get = set = get_or_set = exists = delete = _fail
+
+    cache = worker(BrokenBackend())
+
+    async def fetch():
+        return b"fresh"
+
+    entry = asyncio.run(cache.get_or_fetch("k", 30, fetch))
+    assert entry.value == b"fresh"
+    assert cache.errors == 3
+
+
+def test_response_caches_share_entries(new_backend):
+    key = make_key("/everything", {"q": "apple"})
+    workers = [
+        ResponseCache(max_entries=10, stale_ttl=60, shared=worker(new_backend()))
+        for _ in range(2)
+    ]
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return b"payload"
+
+    async def run():
+        first = await workers[0].get_or_fetch(key, 30, fetch)
+        second = await workers[1].get_or_fetch(key, 30, fetch)
+        # Copied into the second worker's memory as well
+        local = workers[1].get(key)
+        workers[1].clear()
+        return first, second, local, await workers[1].peek_shared(key)
+
+    assert asyncio.run(run()) == (b"payload", b"payload", (b"payload", False), b"payload")
+    assert len(calls) == 1
+    assert workers[1].shared.hits == 1
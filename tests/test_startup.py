@@ -0,0 +1,46 @@
+import logging
+import os
+import subprocess
+import sys
+from app import startup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_the_app_has_no_side_effects(tmp_path):
+    db_path = tmp_path / "untouched.db"
+    env = dict(os.environ, DATABASE_URL_OVERRIDE=f"sqlite:///{db_path}")
+    code = (
+        "import sys, app.main; "
+        "print(sorted({'jwt', 'jose', 'cryptography'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+    # SQLite creates the file on the first connection
+    assert not db_path.exists()
+
+
+def test_startup_phases_are_recorded(client):
+    assert {"import", "upstream_client"} <= set(startup.phases)
+    # conftest creates the schema itself
+    assert "create_tables" not in startup.phases
+
+    response = client.get("/metrics")
+    assert 'app_startup_phase_seconds{phase="import"}' in response.text
+
+
+def test_report_warns_over_budget(monkeypatch, caplog):
+    monkeypatch.setattr(startup, "phases", {"import": 0.4, "scheduler": 0.2})
+
+    with caplog.at_level(logging.INFO, logger="news-api"):
+        startup.log_report(budget_ms=1000)
+        startup.log_report(budget_ms=500)
+
+    first, second = caplog.records
+    assert first.levelno == logging.INFO
+    assert second.levelno == logging.WARNING
+    assert "600 ms" in second.getMessage() and "500 ms budget" in second.getMessage()